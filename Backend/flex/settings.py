@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+import json
 import os
 # from dotenv import load_dotenv
 # load_dotenv()
@@ -131,6 +132,20 @@ except Exception:
 
 
 
+# Cache
+# Cached rankings and dashboards are keyed by version stamps kept in the
+# database (flexapp/data_versions.py), so a per-process cache never serves
+# stale data; a shared backend (e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache) only saves
+# each process building its own copy.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'flex-default'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -175,6 +190,52 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Background report jobs (run `python manage.py run_report_worker`).
+# Outputs live outside MEDIA_ROOT so they are only reachable through the
+# authenticated download endpoint.
+REPORT_JOB_ROOT = os.getenv('REPORT_JOB_ROOT', os.path.join(BASE_DIR, 'report_jobs'))
+REPORT_JOB_CONCURRENCY = int(os.getenv('REPORT_JOB_CONCURRENCY', 2))
+# Running jobs whose worker has not sent a heartbeat for this many seconds
+# are requeued, or failed once they have been claimed MAX_ATTEMPTS times
+REPORT_JOB_STALE_AFTER = int(os.getenv('REPORT_JOB_STALE_AFTER', 300))
+REPORT_JOB_MAX_ATTEMPTS = int(os.getenv('REPORT_JOB_MAX_ATTEMPTS', 3))
+
+# Seconds `?since=` export watermarks trail the clock. Rows are stamped when
+# saved, not when committed, so a transaction that commits more than this long
+# after saving a row is missed by incremental exports; raise it if writes can
+# stay open that long.
+EXPORT_WATERMARK_LAG = int(os.getenv('EXPORT_WATERMARK_LAG', 5))
+
+# Processes computing NAAC sheets in parallel in the report worker (0 = one
+# per CPU, 1 = serial); web requests always compute them serially
+NAAC_REPORT_WORKERS = int(os.getenv('NAAC_REPORT_WORKERS', 1))
+
+# Processes rendering portfolio PDFs in background portfolio jobs and the
+# generate_portfolios command (0 = one per CPU, 1 = serial); batch downloads
+# requested from the web are queued as portfolio jobs
+PORTFOLIO_PDF_WORKERS = int(os.getenv('PORTFOLIO_PDF_WORKERS', 1))
+
+# Rendered student portfolios (page context and PDF), kept per student data version
+PORTFOLIO_CACHE_ROOT = os.getenv('PORTFOLIO_CACHE_ROOT', os.path.join(BASE_DIR, 'portfolio_cache'))
+PORTFOLIO_CACHE_MAX_BYTES = int(os.getenv('PORTFOLIO_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Generated NAAC/compliance files, reused until the underlying data changes.
+# The data version is kept in the DataVersion table, so web and worker
+# processes agree on it whatever CACHES backend is configured.
+REPORT_CACHE_ROOT = os.getenv('REPORT_CACHE_ROOT', os.path.join(BASE_DIR, 'report_cache'))
+REPORT_CACHE_MAX_BYTES = int(os.getenv('REPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Per-outcome overrides of the NBA attainment criteria in flexapp/nba_outcomes.py,
+# e.g. {'research_skills': {'research_achievements': 2}}
+NBA_OUTCOME_THRESHOLDS = json.loads(os.getenv('NBA_OUTCOME_THRESHOLDS', '{}'))
+
+# Flexon translations kept in memory per process, in front of the FlexonQuery table
+FLEXON_TRANSLATION_CACHE_SIZE = int(os.getenv('FLEXON_TRANSLATION_CACHE_SIZE', 256))
+
+# Bounds on a Flexon query plan's result and run time (see flexapp/flexon_plan.py)
+FLEXON_QUERY_MAX_ROWS = int(os.getenv('FLEXON_QUERY_MAX_ROWS', 50))
+FLEXON_QUERY_TIMEOUT_MS = int(os.getenv('FLEXON_QUERY_TIMEOUT_MS', 2000))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,109 @@
+"""
+Activity time-series service
+
+Buckets student activity (certificates, achievements, placement offers) by
+calendar month. Each source costs one TruncMonth-grouped query regardless
+of how many students are in scope; months without activity are zero-filled.
+
+A scope is any of:
+  - a student instance            -> that student's activity
+  - a student queryset            -> activity of those students
+  - a dict of student field values, e.g. {'dept': 'CSE', 'section': 'A'}
+  - None                          -> all students
+"""
+from datetime import date, datetime, time
+
+from django.db import models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Achievement, Certificate, PlacementOffer, student
+
+
+# Source name -> (model, FK to student, date field)
+ACTIVITY_SOURCES = {
+    'certificates': (Certificate, 'rollno', 'uploaded_at'),
+    'achievements': (Achievement, 'student', 'submission_date'),
+    'placements': (PlacementOffer, 'student', 'offer_date'),
+}
+
+DEFAULT_SOURCES = ('certificates', 'achievements')
+
+
+def month_starts(months=12, end=None):
+    """First day of each of the last `months` months, newest first"""
+    end = timezone.localtime(end or timezone.now())
+    year, month = end.year, end.month
+    starts = []
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        month -= 1
+        if month == 0:
+            month, year = 12, year - 1
+    return starts
+
+
+def _next_month(day):
+    return date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+
+
+def scope_filter(owner_field, scope):
+    if scope is None:
+        return {}
+    if isinstance(scope, student):
+        return {owner_field: scope}
+    if isinstance(scope, models.QuerySet):
+        return {f'{owner_field}__in': scope}
+    return {f'{owner_field}__{field}': value for field, value in scope.items()}
+
+
+def _boundary(model, date_field, day):
+    # DateTimeFields are compared against midnight in the current timezone
+    if isinstance(model._meta.get_field(date_field), models.DateTimeField):
+        return timezone.make_aware(datetime.combine(day, time.min))
+    return day
+
+
+def count_by_month(source, scope=None, months=12, end=None):
+    """Return {month_start: count} for one activity source using one query"""
+    model, owner_field, date_field = ACTIVITY_SOURCES[source]
+    starts = month_starts(months, end)
+
+    rows = (
+        model.objects.filter(**scope_filter(owner_field, scope))
+        .filter(**{
+            f'{date_field}__gte': _boundary(model, date_field, starts[-1]),
+            f'{date_field}__lt': _boundary(model, date_field, _next_month(starts[0])),
+        })
+        .annotate(month=TruncMonth(date_field))
+        .order_by()
+        .values('month')
+        .annotate(count=Count('pk'))
+        .values_list('month', 'count')
+    )
+
+    counts = dict.fromkeys(starts, 0)
+    for month, count in rows:
+        if isinstance(month, datetime):
+            month = timezone.localtime(month).date() if timezone.is_aware(month) else month.date()
+        counts[month.replace(day=1)] = counts.get(month.replace(day=1), 0) + count
+    return counts
+
+
+def get_activity_series(scope=None, sources=DEFAULT_SOURCES, months=12, end=None):
+    """
+    Monthly activity series for a scope, newest month first:
+
+        [{'month': 'Mar 2025', 'certificates': 2, 'achievements': 1, 'total': 3}, ...]
+    """
+    per_source = {source: count_by_month(source, scope, months, end) for source in sources}
+
+    series = []
+    for start in month_starts(months, end):
+        entry = {'month': start.strftime('%b %Y')}
+        for source in sources:
+            entry[source] = per_source[source].get(start, 0)
+        entry['total'] = sum(entry[source] for source in sources)
+        series.append(entry)
+    return series
@@ -1,5 +1,8 @@
+from django import forms
 from django.contrib import admin
 from .models import *
+from .flexon_cache import clear_translation_cache, normalize_query
+from .flexon_plan import QueryPlanError, compile_plan
 
 admin.site.register(student)
 admin.site.register(LeetCode)
@@ -31,3 +34,44 @@ class CoordinatorRoleAdmin(admin.ModelAdmin):
     )
 
 admin.site.register(Provider)
+
+
+class FlexonQueryForm(forms.ModelForm):
+    class Meta:
+        model = FlexonQuery
+        fields = '__all__'
+
+    def clean_plan(self):
+        plan = self.cleaned_data['plan']
+        if plan is not None:
+            try:
+                compile_plan(plan)
+            except QueryPlanError as e:
+                raise forms.ValidationError(str(e))
+        return plan
+
+
+@admin.register(FlexonQuery)
+class FlexonQueryAdmin(admin.ModelAdmin):
+    form = FlexonQueryForm
+    list_display = ('query', 'hit_count', 'last_used_at', 'created_at')
+    search_fields = ('query', 'normalized_query')
+    readonly_fields = ('normalized_query', 'hit_count', 'created_at', 'last_used_at')
+
+    # clear_translation_cache() only clears this process's LRU. Other
+    # processes stop serving a deleted or retired plan on their next hit, but
+    # keep serving an edited one until it falls out of their LRU.
+
+    def save_model(self, request, obj, form, change):
+        # Canned queries are matched the same way as asked ones
+        obj.normalized_query = normalize_query(obj.query)
+        super().save_model(request, obj, form, change)
+        clear_translation_cache()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        clear_translation_cache()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        clear_translation_cache()
@@ -0,0 +1,83 @@
+"""
+Synthetic college for the benchmark commands
+
+seed_college() bulk-creates students with certificates, projects,
+achievements, LeetCode totals and placement offers. The benchmarks call it
+inside a transaction that they roll back, so nothing is left behind.
+"""
+import datetime
+
+from .models import (
+    Achievement, AchievementCategory, Certificate, LeetCode, PlacementOffer, Projects, Technology, student,
+)
+
+
+PROVIDERS = ['NPTEL', 'Coursera', 'Udemy', 'edX', 'Infosys Springboard', 'Cisco', 'AWS', 'Google']
+DOMAINS = ['AI/ML', 'Web Development', 'Cloud', 'Data Science', 'Cyber Security', 'IoT', 'Blockchain']
+TECHNOLOGIES = ['Python', 'Django', 'React', 'Java', 'Spring', 'Flutter', 'Node.js', 'TensorFlow', 'Go', 'Rust']
+COMPANIES = ['TCS', 'Infosys', 'Wipro', 'Accenture', 'Cognizant', 'Amazon', 'Zoho']
+
+
+def seed_college(rng, count):
+    """Bulk-create `count` synthetic students (usernames bench-N) with certificates, projects and more"""
+    today = datetime.date.today()
+    technologies = [Technology.objects.create(name=f'bench-{name}') for name in TECHNOLOGIES]
+    category = AchievementCategory.objects.create(name='bench-Hackathon')
+
+    student.objects.bulk_create([
+        student(
+            username=f'bench-{n}', roll_no=f'BENCH{n:06d}', first_name=f'Student {n}', last_name='Bench',
+            password='!', dept=rng.choice(student.DEPT_CHOICES)[0], year=rng.randint(1, 4),
+            section=rng.choice('ABCD'), current_cgpa=round(rng.uniform(5, 10), 2),
+        )
+        for n in range(count)
+    ], batch_size=1000)
+    students = list(student.objects.filter(username__startswith='bench-'))
+
+    LeetCode.objects.bulk_create([
+        LeetCode(rollno=owner, TotalProblems=rng.randint(0, 800)) for owner in students
+    ], batch_size=1000)
+
+    Certificate.objects.bulk_create([
+        Certificate(
+            rollno=owner, title=f'Benchmark certificate {n}', source=rng.choice(PROVIDERS),
+            domain=rng.choice(DOMAINS), category=rng.choice(Certificate.CATEGORY_CHOICES)[0],
+            year_and_sem='III-I',
+        )
+        for owner in students for n in range(rng.randint(0, 5))
+    ], batch_size=1000)
+
+    projects = Projects.objects.bulk_create([
+        Projects(
+            title=f'Benchmark project {n}', description='Synthetic project ' * rng.randint(1, 12),
+            status=rng.choice(Projects.status_choices)[0], year_and_sem='III-II',
+        )
+        for n in range(count // 2)
+    ], batch_size=1000)
+    contributors = Projects.contributors.through
+    contributors.objects.bulk_create([
+        contributors(projects_id=project.pk, student_id=member.pk)
+        for project in projects for member in rng.sample(students, rng.randint(1, 3))
+    ], batch_size=1000, ignore_conflicts=True)
+    used = Projects.technologies.through
+    used.objects.bulk_create([
+        used(projects_id=project.pk, technology_id=technology.pk)
+        for project in projects for technology in rng.sample(technologies, rng.randint(1, 3))
+    ], batch_size=1000, ignore_conflicts=True)
+
+    Achievement.objects.bulk_create([
+        Achievement(
+            student=owner, submitted_by=owner, category=category, title='Benchmark achievement',
+            description='Synthetic achievement', achievement_date=today,
+            status=rng.choice(Achievement.STATUS_CHOICES)[0], points_awarded=rng.randint(0, 50),
+        )
+        for owner in students for _ in range(rng.randint(0, 2))
+    ], batch_size=1000)
+
+    PlacementOffer.objects.bulk_create([
+        PlacementOffer(
+            student=owner, company=rng.choice(COMPANIES), package=round(rng.uniform(3, 30), 2),
+            offer_date=today, placement_type='Full-time',
+        )
+        for owner in students if rng.random() < 0.3
+    ], batch_size=1000)
@@ -0,0 +1,237 @@
+"""
+Compliance snapshot service
+
+The NAAC compliance page reports participation, quality and co-curricular
+metrics per admission year. Instead of recomputing them from the student,
+achievement, certificate, project and placement tables on every view, the
+additive counts behind them are stored in ComplianceSnapshot, one row per
+(admission year, department), and the page sums the rows of a year.
+
+Snapshots are built with a fixed number of grouped queries for any number
+of scopes: by the `refresh_compliance_snapshots` command, on demand from
+the compliance page, and by the report worker. Signal handlers never
+compute anything in the request that made the change: once its transaction
+commits they mark the affected scope stale, and the report worker (or
+`refresh_compliance_snapshots --stale`) refreshes stale scopes in the
+background. A refresh only clears marks made before it read the data, so a
+change landing mid-refresh is picked up by the next one. Snapshots are
+upserted, never deleted and recreated, so concurrent refreshes of a scope
+cannot collide.
+
+Co-curricular events are matched by category id, resolved once from the
+small AchievementCategory table, rather than with `icontains` over
+Achievement.
+"""
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Achievement, AchievementCategory, Certificate, ComplianceSnapshot, PlacementOffer, Projects, student
+from .report_cache import bump_report_data_version
+
+
+# Co-curricular event kinds, matched against achievement category names
+EVENT_KINDS = ('technical', 'cultural', 'sports')
+
+SNAPSHOT_METRICS = (
+    'total_students', 'current_students', 'students_with_achievements', 'students_with_certifications',
+    'students_with_projects', 'placed_students', 'cgpa_total', 'cgpa_count', 'students_above_8_cgpa',
+    *(f'{kind}_events' for kind in EVENT_KINDS),
+)
+
+
+def _scoped_students(admission_years=None, depts=None):
+    students = student.objects.filter(admission_year__isnull=False)
+    if admission_years is not None:
+        students = students.filter(admission_year__in=admission_years)
+    if depts is not None:
+        students = students.filter(dept__in=depts)
+    return students
+
+
+def _students_per_scope(queryset, path, students):
+    """{(admission year, dept): distinct students} of `queryset` rows belonging to `students`"""
+    rows = (
+        queryset.filter(**{f'{path}__in': students})
+        .values_list(f'{path}__admission_year', f'{path}__dept')
+        .annotate(n=Count(path, distinct=True))
+        .order_by()
+    )
+    return {(year, dept): n for year, dept, n in rows}
+
+
+def compute_compliance_metrics(admission_years=None, depts=None):
+    """{(admission year, dept): metrics} for every scope with students"""
+    students = _scoped_students(admission_years, depts)
+    metrics = {}
+    rows = (
+        students.values_list('admission_year', 'dept')
+        .annotate(
+            total_students=Count('pk'),
+            current_students=Count('pk', filter=Q(graduation_status='current')),
+            cgpa_total=Sum('current_cgpa'),
+            cgpa_count=Count('current_cgpa'),
+            students_above_8_cgpa=Count('pk', filter=Q(current_cgpa__gte=8)),
+        )
+        .order_by()
+    )
+    for year, dept, total, current, cgpa_total, cgpa_count, above_8 in rows:
+        metrics[year, dept] = dict.fromkeys(SNAPSHOT_METRICS, 0) | {
+            'total_students': total,
+            'current_students': current,
+            'cgpa_total': float(cgpa_total or 0),
+            'cgpa_count': cgpa_count,
+            'students_above_8_cgpa': above_8,
+        }
+
+    participation = {
+        'students_with_achievements': (Achievement.objects.filter(status='approved'), 'student'),
+        'students_with_certifications': (Certificate.objects.all(), 'rollno'),
+        'students_with_projects': (Projects.contributors.through.objects.all(), 'student'),
+        'placed_students': (PlacementOffer.objects.all(), 'student'),
+    }
+    for name, (queryset, path) in participation.items():
+        for scope, n in _students_per_scope(queryset, path, students).items():
+            metrics[scope][name] = n
+
+    kinds_of = {}
+    for pk, name in AchievementCategory.objects.values_list('pk', 'name'):
+        kinds = [kind for kind in EVENT_KINDS if kind in name.lower()]
+        if kinds:
+            kinds_of[pk] = kinds
+    if kinds_of:
+        events = (
+            Achievement.objects.filter(student__in=students, category_id__in=kinds_of)
+            .values_list('student__admission_year', 'student__dept', 'category_id')
+            .annotate(n=Count('pk'))
+            .order_by()
+        )
+        for year, dept, category_id, n in events:
+            for kind in kinds_of[category_id]:
+                metrics[year, dept][f'{kind}_events'] += n
+    return metrics
+
+
+def _scope_snapshots(admission_years=None, depts=None):
+    snapshots = ComplianceSnapshot.objects.all()
+    if admission_years is not None:
+        snapshots = snapshots.filter(admission_year__in=admission_years)
+    if depts is not None:
+        snapshots = snapshots.filter(dept__in=depts)
+    return snapshots
+
+
+def refresh_compliance_snapshots(admission_years=None, depts=None):
+    """Recompute the snapshots of the given years/departments (all by default); returns rows written"""
+    computed_at = timezone.now()
+    metrics = compute_compliance_metrics(admission_years, depts)
+
+    ComplianceSnapshot.objects.bulk_create(
+        [
+            ComplianceSnapshot(admission_year=year, dept=dept, metrics=values, computed_at=computed_at)
+            for (year, dept), values in metrics.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['admission_year', 'dept'],
+        update_fields=['metrics', 'computed_at'],
+    )
+    # Marks made after the counts were read stay for the next refresh
+    settled = _scope_snapshots(admission_years, depts).filter(
+        Q(stale_since__isnull=True) | Q(stale_since__lte=computed_at)
+    )
+    empty = [
+        pk for pk, year, dept in settled.values_list('pk', 'admission_year', 'dept')
+        if (year, dept) not in metrics
+    ]
+    ComplianceSnapshot.objects.filter(pk__in=empty).delete()
+    settled.exclude(stale_since__isnull=True).update(stale_since=None)
+
+    # Cached compliance files were built from the old snapshots
+    bump_report_data_version()
+    return len(metrics)
+
+
+def refresh_stale_compliance_snapshots():
+    """Refresh the scopes marked stale since their last refresh; returns rows written"""
+    scopes = set(
+        ComplianceSnapshot.objects.filter(stale_since__isnull=False).values_list('admission_year', 'dept')
+    )
+    if not scopes:
+        return 0
+    return refresh_compliance_snapshots({year for year, _ in scopes}, {dept for _, dept in scopes})
+
+
+def _mark_stale(admission_year, dept):
+    now = timezone.now()
+    ComplianceSnapshot.objects.bulk_create(
+        [ComplianceSnapshot(admission_year=admission_year, dept=dept, stale_since=now)],
+        update_conflicts=True,
+        unique_fields=['admission_year', 'dept'],
+        update_fields=['stale_since'],
+    )
+
+
+def mark_compliance_stale(admission_year, dept):
+    """Mark one scope's snapshot for the next background refresh once the current transaction commits"""
+    if admission_year is None:
+        return
+    transaction.on_commit(lambda: _mark_stale(admission_year, dept))
+
+
+def student_compliance_changed(student_id):
+    scope = student.objects.filter(pk=student_id).values_list('admission_year', 'dept').first()
+    if scope:
+        mark_compliance_stale(*scope)
+
+
+def _percent(part, whole):
+    return part / whole * 100 if whole > 0 else 0
+
+
+def _report(metrics):
+    total = metrics['total_students']
+    return {
+        'participation_metrics': {
+            'total_students': total,
+            'students_with_achievements': metrics['students_with_achievements'],
+            'students_with_certifications': metrics['students_with_certifications'],
+            'students_with_projects': metrics['students_with_projects'],
+            'achievement_participation_rate': _percent(metrics['students_with_achievements'], total),
+            'certification_participation_rate': _percent(metrics['students_with_certifications'], total),
+        },
+        'quality_metrics': {
+            'avg_cgpa': metrics['cgpa_total'] / metrics['cgpa_count'] if metrics['cgpa_count'] else 0,
+            'students_above_8_cgpa': metrics['students_above_8_cgpa'],
+            'placement_rate': _percent(metrics['placed_students'], metrics['current_students']),
+        },
+        'cocurricular_metrics': {f'{kind}_events': metrics[f'{kind}_events'] for kind in EVENT_KINDS},
+    }
+
+
+def compliance_summary(admission_year):
+    """
+    NAAC compliance metrics of an admission year from its snapshots, computing
+    them first if the year has none, with a per-department breakdown, the
+    time the oldest snapshot was computed and whether any awaits a refresh.
+    """
+    snapshots = list(ComplianceSnapshot.objects.filter(admission_year=admission_year))
+    if not any(snapshot.computed_at for snapshot in snapshots):
+        refresh_compliance_snapshots([admission_year])
+        snapshots = list(ComplianceSnapshot.objects.filter(admission_year=admission_year))
+
+    totals = dict.fromkeys(SNAPSHOT_METRICS, 0)
+    for snapshot in snapshots:
+        for name in SNAPSHOT_METRICS:
+            totals[name] += snapshot.metrics.get(name, 0)
+
+    return {
+        **_report(totals),
+        'departments': {
+            # A scope marked stale before its first refresh has no metrics yet
+            snapshot.dept: _report(dict.fromkeys(SNAPSHOT_METRICS, 0) | snapshot.metrics)
+            for snapshot in snapshots
+        },
+        'computed_at': min((snapshot.computed_at for snapshot in snapshots if snapshot.computed_at), default=None),
+        'stale': any(snapshot.stale_since for snapshot in snapshots),
+        'year': admission_year,
+    }
@@ -0,0 +1,77 @@
+"""
+Student dashboard cache
+
+The expensive part of the dashboard (serialized certificate, project and
+achievement lists, summaries and chart series) is cached server-side per
+student under a data version stamp. Signal handlers bump a student's
+version whenever one of their certificates, projects, achievements, LeetCode
+stats, placement offers, approvals or academic records change, so repeat
+views are served from cache and a stale payload is never returned. The
+version is kept in the database (see data_versions), so every process
+agrees on it.
+
+The dashboard page itself is a shell that fetches DASHBOARD_SECTIONS as
+separate JSON documents; the same version stamp doubles as their ETag.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .data_versions import bump_version, bump_versions, get_version, get_versions
+
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+DASHBOARD_SECTIONS = ('analytics', 'certificates', 'projects', 'achievements', 'notifications')
+
+
+def _version_key(student_id):
+    return f"student:{student_id}"
+
+
+def get_student_data_version(student_id):
+    return get_version(_version_key(student_id))
+
+
+def get_student_data_versions(student_ids):
+    """{student id: data version} for many students at once"""
+    versions = get_versions(_version_key(student_id) for student_id in student_ids)
+    return {student_id: versions[_version_key(student_id)] for student_id in student_ids}
+
+
+def bump_student_data_version(student_id):
+    """Invalidate every cached dashboard fragment of one student, once the transaction commits"""
+    if student_id:
+        bump_version(_version_key(student_id))
+
+
+def bump_student_data_versions(student_ids):
+    """Bulk form of bump_student_data_version for commands that rewrite many students"""
+    bump_versions(_version_key(student_id) for student_id in student_ids)
+
+
+def _current_month():
+    # Monthly series roll over with the calendar even when no data changes
+    return timezone.localtime(timezone.now()).strftime('%Y%m')
+
+
+def dashboard_etag(student_obj, *parts):
+    """ETag for a dashboard fragment of a student; extra parts narrow it further"""
+    version = get_student_data_version(student_obj.pk)
+    raw = ':'.join(str(part) for part in (student_obj.pk, version, _current_month(), *parts))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_dashboard_payload(student_obj, build):
+    """
+    Return the cached dashboard payload for a student, calling
+    build(student_obj) on a miss. The payload must be picklable.
+    """
+    version = get_student_data_version(student_obj.pk)
+    key = f"dashboard:payload:{student_obj.pk}:{version}:{_current_month()}"
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = build(student_obj)
+        cache.set(key, payload, DASHBOARD_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,71 @@
+"""
+Shared data version stamps
+
+Cached dashboards, cohort rankings, generated reports and portfolios are
+keyed by a version stamp that signal handlers bump whenever the data behind
+them changes. The stamps live in the DataVersion table rather than in
+CACHES, so every web and worker process sees the same value whatever cache
+backend is configured.
+
+A bump is applied once the surrounding transaction commits (straight away
+outside one): until then other processes cannot see the new data, and a
+build that reads it mid-transaction must not be stored under the new stamp.
+A stamp starts at the current time in nanoseconds, so entries left on disk
+by another database never match.
+"""
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import DataVersion
+
+
+def get_version(key):
+    version = DataVersion.objects.filter(key=key).values_list('version', flat=True).first()
+    if version is None:
+        entry, _ = DataVersion.objects.get_or_create(key=key, defaults={'version': time.time_ns()})
+        version = entry.version
+    return version
+
+
+def get_versions(keys, batch_size=500):
+    """{key: version} for many keys, in a query or two per batch of keys"""
+    keys = list(keys)
+    versions = {}
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        versions.update(DataVersion.objects.filter(key__in=batch).values_list('key', 'version'))
+        missing = [key for key in batch if key not in versions]
+        if missing:
+            DataVersion.objects.bulk_create(
+                [DataVersion(key=key, version=time.time_ns()) for key in missing], ignore_conflicts=True
+            )
+            versions.update(DataVersion.objects.filter(key__in=missing).values_list('key', 'version'))
+    return versions
+
+
+def _increment(key):
+    if DataVersion.objects.filter(key=key).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            DataVersion.objects.create(key=key, version=time.time_ns())
+    except IntegrityError:
+        # Created concurrently
+        DataVersion.objects.filter(key=key).update(version=F('version') + 1)
+
+
+def bump_version(key):
+    """Advance a stamp once the current transaction commits"""
+    transaction.on_commit(lambda: _increment(key))
+
+
+def bump_versions(keys):
+    """Advance many stamps with one UPDATE once the current transaction commits"""
+    keys = list(keys)
+    if keys:
+        # A stamp nobody has read yet has no cache entries to invalidate
+        transaction.on_commit(
+            lambda: DataVersion.objects.filter(key__in=keys).update(version=F('version') + 1)
+        )
@@ -0,0 +1,271 @@
+"""
+In-process bitmap facet index for the faculty grid
+
+Keeps one bitset per facet value (certificate provider, domain and category,
+project technology and status, plus the student's dept, year, section and
+mentor). Bit n is set when the student with primary key n has that value, so
+an AND/OR filter combination is a handful of bitwise operations on Python
+ints and a facet count is a popcount.
+
+The index is built in bulk on first use (five queries) and patched per
+student afterwards. Each process holds its own copy: when a student's facets
+change, the model signals append a FacetIndexChange row once the transaction
+commits, and every process replays the rows it has not seen yet (five
+queries for any number of students) before answering. Only a long absence or
+a burst of changes larger than MAX_PATCHED_STUDENTS costs a full rebuild.
+
+Change rows are written in their own autocommit statement, so one can only
+become visible after a row with a higher id for the few milliseconds its
+insert takes. Rows younger than CHANGE_LAG are therefore kept pending and
+looked at again on the next sync instead of moving the cursor past them;
+replaying a student twice is harmless.
+"""
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Certificate, FacetIndexChange, Projects, student
+
+
+# Facet name -> student field, for facets stored on the student row
+STUDENT_FACETS = {
+    'dept': 'dept',
+    'year': 'year',
+    'section': 'section',
+    'mentor': 'mentor__first_name',
+}
+
+# Facet name -> certificate field
+CERTIFICATE_FACETS = {
+    'provider': 'source',
+    'domain': 'domain',
+    'category': 'category',
+}
+
+FACETS = (*STUDENT_FACETS, *CERTIFICATE_FACETS, 'technology', 'status')
+
+CHANGE_LAG = timedelta(seconds=5)
+# Change rows are pruned after this long; an index not synced for as long rebuilds
+CHANGE_RETENTION = timedelta(days=1)
+PRUNE_INTERVAL = timedelta(hours=1)
+# More changed students than this since the last sync are cheaper to rebuild
+MAX_PATCHED_STUDENTS = 500
+
+
+def iter_bits(mask):
+    """Yield the positions of the set bits of `mask`, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_of(student_ids):
+    mask = 0
+    for student_id in student_ids:
+        mask |= 1 << student_id
+    return mask
+
+
+def _facet_rows(student_ids=None):
+    """
+    Yield (student_id, facet, value) for every facet value of the given
+    students (all non-superusers when None). Five queries in total.
+    """
+    students = student.objects.filter(is_superuser=False)
+    if student_ids is not None:
+        students = students.filter(pk__in=student_ids)
+    owners = students.values('pk')
+
+    for row in students.values('pk', *STUDENT_FACETS.values()):
+        student_id = row.pop('pk')
+        yield student_id, None, None
+        for facet, field in STUDENT_FACETS.items():
+            yield student_id, facet, row[field]
+
+    certificates = Certificate.objects.filter(rollno__in=owners).values_list(
+        'rollno_id', *CERTIFICATE_FACETS.values()
+    )
+    for student_id, *values in certificates:
+        for facet, value in zip(CERTIFICATE_FACETS, values):
+            yield student_id, facet, value
+
+    contributions = Projects.contributors.through.objects.filter(student__in=owners)
+    for student_id, status in contributions.values_list('student_id', 'projects__status'):
+        yield student_id, 'status', status
+
+    technologies = Projects.technologies.through.objects.filter(
+        projects__contributors__in=owners
+    ).values_list('projects__contributors', 'technology__name')
+    for student_id, name in technologies:
+        yield student_id, 'technology', name
+
+
+class FacetIndex:
+    """Bitsets of student ids keyed by (facet, value)"""
+
+    def __init__(self):
+        self.bitmaps = {facet: defaultdict(int) for facet in FACETS}
+        self.universe = 0
+        # Every FacetIndexChange up to cursor is applied, as are the ids in _applied above it
+        self.cursor = 0
+        self._applied = set()
+        self.synced_at = None
+        self._pruned_at = None
+        # student id -> {(facet, value)}, so a student's bits can be cleared
+        self._entries = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def _add(self, rows):
+        for student_id, facet, value in rows:
+            bit = 1 << student_id
+            if facet is None:
+                self.universe |= bit
+            elif value not in (None, ''):
+                self.bitmaps[facet][value] |= bit
+                self._entries[student_id].add((facet, value))
+
+    def _discard(self, student_id):
+        bit = 1 << student_id
+        self.universe &= ~bit
+        for facet, value in self._entries.pop(student_id, ()):
+            bitmap = self.bitmaps[facet][value] & ~bit
+            if bitmap:
+                self.bitmaps[facet][value] = bitmap
+            else:
+                del self.bitmaps[facet][value]
+
+    def _patch(self, student_ids):
+        # Re-read the students' facet values; deleted students drop out
+        for student_id in student_ids:
+            self._discard(student_id)
+        self._add(_facet_rows(student_ids))
+
+    def _prune(self, now):
+        FacetIndexChange.objects.filter(changed_at__lt=now - CHANGE_RETENTION).delete()
+        self._pruned_at = now
+
+    def build(self):
+        """(Re)build the whole index from the database"""
+        with self._lock:
+            now = timezone.now()
+            # Changes from here on are replayed by the next sync
+            self.cursor = FacetIndexChange.objects.filter(
+                changed_at__lt=now - CHANGE_LAG
+            ).aggregate(cursor=Max('pk'))['cursor'] or 0
+            self._applied = set()
+            self.bitmaps = {facet: defaultdict(int) for facet in FACETS}
+            self.universe = 0
+            self._entries = defaultdict(set)
+            self._add(_facet_rows())
+            self.synced_at = now
+            if self._pruned_at is None or now - self._pruned_at > PRUNE_INTERVAL:
+                self._prune(now)
+        return self
+
+    def sync(self):
+        """Replay the changes other processes made since the last sync"""
+        with self._lock:
+            now = timezone.now()
+            if self.synced_at is None or now - self.synced_at > CHANGE_RETENTION - CHANGE_LAG:
+                # Changes this old may already be pruned
+                return self.build()
+
+            changes = list(
+                FacetIndexChange.objects.filter(pk__gt=self.cursor)
+                .order_by('pk').values_list('pk', 'student_id', 'changed_at')
+            )
+            student_ids = {student_id for pk, student_id, _ in changes if pk not in self._applied}
+            if len(student_ids) > MAX_PATCHED_STUDENTS:
+                return self.build()
+            if student_ids:
+                self._patch(student_ids)
+
+            settled = [pk for pk, _, changed_at in changes if changed_at < now - CHANGE_LAG]
+            self.cursor = max(settled, default=self.cursor)
+            self._applied = {pk for pk, _, _ in changes if pk > self.cursor}
+            self.synced_at = now
+            if now - self._pruned_at > PRUNE_INTERVAL:
+                self._prune(now)
+        return self
+
+    def refresh_student(self, student_id, change_id=None):
+        """Re-read one student's facet values, marking its change row applied"""
+        with self._lock:
+            self._patch([student_id])
+            if change_id is not None and change_id > self.cursor:
+                self._applied.add(change_id)
+
+    def match(self, filters):
+        """
+        Bitset of students matching `filters` ({facet: [values]}): values of
+        one facet are ORed, facets are ANDed. Empty filters match everyone.
+        """
+        with self._lock:
+            mask = self.universe
+            for facet, values in filters.items():
+                if not values:
+                    continue
+                bitmaps = self.bitmaps[facet]
+                any_of = 0
+                for value in values:
+                    any_of |= bitmaps.get(self._coerce(facet, value), 0)
+                mask &= any_of
+            return mask
+
+    def facet_counts(self, mask):
+        """{facet: [(value, students in mask), ...]} most common first"""
+        with self._lock:
+            counts = {}
+            for facet, bitmaps in self.bitmaps.items():
+                ranked = [
+                    (value, (bitmap & mask).bit_count())
+                    for value, bitmap in bitmaps.items()
+                ]
+                counts[facet] = sorted(
+                    ((value, n) for value, n in ranked if n),
+                    key=lambda item: (-item[1], str(item[0])),
+                )
+            return counts
+
+    @staticmethod
+    def _coerce(facet, value):
+        # Query parameters arrive as strings; years are stored as ints
+        if facet == 'year':
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return value
+        return value
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_facet_index():
+    """The process-wide index, brought up to date with other processes' changes"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FacetIndex().build()
+        else:
+            _index.sync()
+        return _index
+
+
+def refresh_student_facets(student_id):
+    """Signal hook: once committed, log the change for every process and patch the local index"""
+    if not student_id:
+        return
+
+    def record():
+        change = FacetIndexChange.objects.create(student_id=student_id)
+        if _index is not None:
+            _index.refresh_student(student_id, change.pk)
+
+    transaction.on_commit(record)
@@ -0,0 +1,114 @@
+"""
+Flexon translation cache
+
+Translating a natural-language question into a query plan is a multi-second
+round trip to Gemini, yet coordinators ask the same few questions every day.
+Translations are keyed by the normalized question (lower case, punctuation
+and filler words dropped, whitespace collapsed) and stored in the
+FlexonQuery table along with their hit counts, so the most asked questions
+double as a list of canned queries. Each process keeps a small LRU of
+recent translations in front of the table.
+
+Only validated translations are stored; the caller decides what that means
+and simply does not call store_translation otherwise. A deleted or retired
+(plan set to null) row stops being served by the process that next hits
+it; an edited one reaches other processes once it falls out of their LRU.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import FlexonQuery
+
+
+# Words that do not change what is asked. Negations, conjunctions and
+# comparisons are deliberately kept.
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'please', 'me', 'us', 'i', 'we', 'can', 'could', 'would', 'you',
+    'show', 'list', 'find', 'get', 'give', 'display', 'fetch', 'tell', 'what', 'which', 'who',
+    'whose', 'that', 'is', 'are', 'was', 'were', 'be', 'do', 'does', 'there', 'have', 'has',
+    'having', 'with', 'of', 'all',
+})
+
+# Words, numbers and tech names such as c++, c# or node.js; comparisons kept as their own tokens
+_TOKEN = re.compile(r"[a-z0-9_][a-z0-9_.+#]*|[<>]=?|!?=")
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def normalize_query(query):
+    """Cache key of a question; '' when nothing meaningful is left"""
+    tokens = (token.rstrip('.') for token in _TOKEN.findall(query.lower()))
+    return ' '.join(token for token in tokens if token and token not in STOP_WORDS)
+
+
+def _remember(key, pk, plan):
+    with _lru_lock:
+        _lru[key] = (pk, plan)
+        _lru.move_to_end(key)
+        while len(_lru) > settings.FLEXON_TRANSLATION_CACHE_SIZE:
+            _lru.popitem(last=False)
+
+
+def _forget(key):
+    with _lru_lock:
+        _lru.pop(key, None)
+
+
+def cached_translation(query):
+    """The stored query plan for `query`, counting the hit, or None"""
+    key = normalize_query(query)
+    if not key:
+        return None
+
+    with _lru_lock:
+        entry = _lru.get(key)
+        if entry:
+            _lru.move_to_end(key)
+
+    if entry:
+        pk, plan = entry
+        updated = FlexonQuery.objects.filter(pk=pk, plan__isnull=False).update(
+            hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+        )
+        if updated:
+            return plan
+        # Deleted or retired since it was cached here
+        _forget(key)
+        return None
+
+    row = FlexonQuery.objects.filter(normalized_query=key, plan__isnull=False).values_list('pk', 'plan').first()
+    if row is None:
+        return None
+    FlexonQuery.objects.filter(pk=row[0]).update(hit_count=F('hit_count') + 1, last_used_at=timezone.now())
+    _remember(key, *row)
+    return row[1]
+
+
+def store_translation(query, plan):
+    """Store a validated plan for `query`; the first wording asked is kept for display"""
+    key = normalize_query(query)
+    if not key or len(key) > FlexonQuery._meta.get_field('normalized_query').max_length:
+        return
+    entry, _ = FlexonQuery.objects.update_or_create(
+        normalized_query=key,
+        defaults={'plan': plan, 'hit_count': F('hit_count') + 1, 'last_used_at': timezone.now()},
+        create_defaults={'query': query.strip(), 'plan': plan, 'hit_count': 1, 'last_used_at': timezone.now()},
+    )
+    _remember(key, entry.pk, plan)
+
+
+def popular_queries(limit=8):
+    """Most asked questions, for the dashboard's canned query list"""
+    return list(FlexonQuery.objects.order_by('-hit_count', 'query').values('query', 'hit_count')[:limit])
+
+
+def clear_translation_cache():
+    """Drop this process's LRU; the table is left alone"""
+    with _lru_lock:
+        _lru.clear()
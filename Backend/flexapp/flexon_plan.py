@@ -0,0 +1,351 @@
+"""
+Flexon query plans
+
+Flexon questions are translated into a small JSON query plan rather than
+Python code:
+
+    {
+        "model": "student",
+        "filters": {"dept": "CSE", "completed_projects__gt": 0},
+        "exclude": {"graduation_status": "graduated"},
+        "any": [{"title__icontains": "cloud"}, {"domain__icontains": "cloud"}],
+        "group_by": ["dept"],
+        "annotations": {"completed_projects": {"function": "count", "field": "projects", "distinct": true,
+                                               "filter": {"projects__status": "Completed"}}},
+        "columns": ["roll_no", "first_name", "completed_projects"],
+        "ordering": ["-completed_projects"],
+        "limit": 10
+    }
+
+Everything but "model" is optional. compile_plan checks every field path
+against FLEXON_SCHEMA and every lookup against LOOKUPS, so a plan can only
+read whitelisted columns, and lets an annotation follow at most one to-many
+relation, so aggregates are not multiplied by join fan-out. It then builds
+the QuerySet: filters that refer to an annotation are applied after it, the
+selected columns are projected with values() (the dict-returning
+counterpart of only()), and the row count is capped at
+FLEXON_QUERY_MAX_ROWS. Compiled plans are memoized by their JSON. run_plan executes one under
+FLEXON_QUERY_TIMEOUT_MS on SQLite and PostgreSQL.
+"""
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldError
+from django.db import OperationalError, connection, transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+
+from .models import Certificate, Faculty, LeetCode, Placement, PlacementOffer, Projects, Technology, student
+
+
+# Plan model name -> (model, {field: plan model it leads to, or None}, default columns)
+FLEXON_SCHEMA = {
+    'student': (student, {
+        'id': None, 'roll_no': None, 'first_name': None, 'last_name': None, 'email': None, 'dept': None,
+        'year': None, 'section': None, 'admission_year': None, 'current_cgpa': None, 'total_credits': None,
+        'graduation_status': None, 'is_active_student': None, 'mentor': 'Faculty', 'projects': 'Projects',
+        'certificates': 'Certificate', 'studentrollno': 'LeetCode', 'placement_offers': 'PlacementOffer',
+        'placement_status': 'Placement',
+    }, ('roll_no', 'first_name', 'last_name', 'dept', 'year', 'section', 'current_cgpa')),
+    'Faculty': (Faculty, {
+        'id': None, 'first_name': None, 'last_name': None, 'email': None, 'dept': None,
+    }, ('first_name', 'last_name', 'email', 'dept')),
+    'Projects': (Projects, {
+        'id': None, 'title': None, 'status': None, 'year_and_sem': None, 'approval_status': None,
+        'github_link': None, 'contributors': 'student', 'technologies': 'Technology',
+    }, ('title', 'status', 'year_and_sem', 'github_link')),
+    'Certificate': (Certificate, {
+        'id': None, 'title': None, 'source': None, 'domain': None, 'category': None, 'year_and_sem': None,
+        'is_verified': None, 'approval_status': None, 'uploaded_at': None, 'rollno': 'student',
+    }, ('rollno__roll_no', 'title', 'source', 'domain', 'category', 'year_and_sem')),
+    'LeetCode': (LeetCode, {
+        'id': None, 'TotalProblems': None, 'easy': None, 'medium': None, 'hard': None, 'rollno': 'student',
+    }, ('rollno__roll_no', 'rollno__first_name', 'rollno__last_name', 'TotalProblems', 'easy', 'medium', 'hard')),
+    'Placement': (Placement, {
+        'id': None, 'is_placed': None, 'student': 'student',
+    }, ('student__roll_no', 'student__first_name', 'is_placed')),
+    'PlacementOffer': (PlacementOffer, {
+        'id': None, 'company': None, 'package': None, 'offer_date': None, 'placement_year': None,
+        'placement_type': None, 'accepted': None, 'student': 'student',
+    }, ('student__roll_no', 'student__first_name', 'company', 'package', 'offer_date', 'placement_type')),
+    'Technology': (Technology, {
+        'id': None, 'name': None, 'projects': 'Projects',
+    }, ('name',)),
+}
+
+LOOKUPS = frozenset({
+    'exact', 'iexact', 'contains', 'icontains', 'startswith', 'istartswith', 'endswith', 'iendswith',
+    'in', 'range', 'gt', 'gte', 'lt', 'lte', 'isnull',
+})
+
+AGGREGATES = {'count': Count, 'sum': Sum, 'avg': Avg, 'max': Max, 'min': Min}
+
+PLAN_KEYS = frozenset({'model', 'filters', 'exclude', 'any', 'group_by', 'annotations', 'columns', 'ordering', 'limit'})
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class QueryPlanError(ValueError):
+    """A plan that is malformed or reaches outside the whitelist; the message is shown to the user"""
+
+
+@dataclass(frozen=True)
+class CompiledPlan:
+    queryset: object
+    columns: tuple
+
+
+def _plan_model(name):
+    """Schema entry of a model name, forgiving case and plurals ('Students', 'leetcode')"""
+    wanted = str(name).lower()
+    for plan_model in FLEXON_SCHEMA:
+        candidate = plan_model.lower()
+        if wanted in (candidate, candidate + 's', candidate.rstrip('s')):
+            return plan_model
+    raise QueryPlanError(f"Unknown model '{name}'.")
+
+
+def _field_path(plan_model, path, aliases=(), lookups=False, single_valued=False, max_to_many=None):
+    """
+    Check a '__' path from `plan_model`: whitelisted fields, then (when
+    `lookups`) at most one lookup. `single_valued` rejects hops through
+    to-many relations, which would repeat rows, and `max_to_many` caps how
+    many of them the path may cross. Returns whether the path ends on a
+    relation.
+    """
+    parts = str(path).split('__')
+    if parts[0] in aliases:
+        rest = parts[1:]
+        if rest and not (lookups and len(rest) == 1 and rest[0] in LOOKUPS):
+            raise QueryPlanError(f"Unsupported lookup in '{path}'.")
+        return False
+
+    current = plan_model
+    to_many = 0
+    for index, part in enumerate(parts):
+        model, fields, _ = FLEXON_SCHEMA[current]
+        if part not in fields:
+            if lookups and index == len(parts) - 1 and index > 0 and part in LOOKUPS:
+                return True
+            raise QueryPlanError(f"Field '{part}' is not available on {current}.")
+        if fields[part]:
+            field = model._meta.get_field(part)
+            if field.many_to_many or field.one_to_many:
+                if single_valued:
+                    raise QueryPlanError(f"'{path}' can match several rows; aggregate it instead.")
+                to_many += 1
+                if max_to_many is not None and to_many > max_to_many:
+                    raise QueryPlanError(
+                        f"'{path}' follows {to_many} to-many relations; at most {max_to_many} can be aggregated over."
+                    )
+        if fields[part] is None and index < len(parts) - 1:
+            if lookups and index == len(parts) - 2 and parts[-1] in LOOKUPS:
+                return False
+            raise QueryPlanError(f"Unsupported lookup in '{path}'.")
+        current = fields[part] or current
+    return fields[part] is not None
+
+
+def _conditions(plan_model, conditions, aliases=(), max_to_many=None):
+    if not isinstance(conditions, dict):
+        raise QueryPlanError('Filters must be an object of field lookups.')
+    for path, value in conditions.items():
+        _field_path(plan_model, path, aliases, lookups=True, max_to_many=max_to_many)
+        lookup = path.rsplit('__', 1)[-1]
+        if lookup in ('in', 'range'):
+            if not isinstance(value, list) or not all(isinstance(item, _SCALARS) for item in value):
+                raise QueryPlanError(f"'{path}' needs a list of values.")
+            if lookup == 'range' and len(value) != 2:
+                raise QueryPlanError(f"'{path}' needs exactly two values.")
+        elif lookup == 'isnull' and not isinstance(value, bool):
+            raise QueryPlanError(f"'{path}' needs true or false.")
+        elif not isinstance(value, _SCALARS):
+            raise QueryPlanError(f"'{path}' needs a single value.")
+    return conditions
+
+
+def _split(conditions, aliases):
+    """(conditions on model fields, conditions on annotations)"""
+    on_aliases = {path: value for path, value in conditions.items() if path.split('__')[0] in aliases}
+    return {path: value for path, value in conditions.items() if path not in on_aliases}, on_aliases
+
+
+def _annotations(plan_model, annotations):
+    if not isinstance(annotations, dict):
+        raise QueryPlanError('Annotations must be an object.')
+    compiled = {}
+    for alias, spec in annotations.items():
+        if not str(alias).isidentifier() or alias in FLEXON_SCHEMA[plan_model][1]:
+            raise QueryPlanError(f"'{alias}' cannot be used as an annotation name.")
+        if not isinstance(spec, dict) or spec.get('function') not in AGGREGATES:
+            raise QueryPlanError(f"Annotation '{alias}' needs a function: {', '.join(AGGREGATES)}.")
+        field = spec.get('field', 'id')
+        # Each further to-many join would multiply the rows being aggregated
+        if _field_path(plan_model, field, max_to_many=1) and spec['function'] != 'count':
+            raise QueryPlanError(f"Annotation '{alias}' can only count '{field}'.")
+        options = {}
+        if spec.get('distinct'):
+            options['distinct'] = True
+        if spec.get('filter'):
+            options['filter'] = Q(**_conditions(plan_model, spec['filter'], max_to_many=1))
+        compiled[alias] = AGGREGATES[spec['function']](field, **options)
+    return compiled
+
+
+def _columns(plan_model, plan, group_by, aliases):
+    columns = plan.get('columns') or (
+        [*group_by, *aliases] if group_by else [*FLEXON_SCHEMA[plan_model][2], *aliases]
+    )
+    if not isinstance(columns, (list, tuple)):
+        raise QueryPlanError('Columns must be a list.')
+    for column in columns:
+        if group_by:
+            if column not in group_by and column not in aliases:
+                raise QueryPlanError(f"Column '{column}' must be grouped or aggregated.")
+        else:
+            _field_path(plan_model, column, aliases, single_valued=True)
+    return tuple(columns)
+
+
+def _ordering(plan_model, plan, group_by, aliases):
+    ordering = plan.get('ordering') or []
+    if not isinstance(ordering, list):
+        raise QueryPlanError('Ordering must be a list.')
+    for entry in ordering:
+        path = str(entry).lstrip('-')
+        if group_by:
+            if path not in group_by and path not in aliases:
+                raise QueryPlanError(f"Ordering by '{path}' needs it grouped or aggregated.")
+        else:
+            _field_path(plan_model, path, aliases, single_valued=True)
+    if group_by:
+        return ordering or list(group_by)
+    # A stable order, so the LIMIT keeps the same rows
+    return [*ordering, 'pk']
+
+
+def max_rows():
+    return settings.FLEXON_QUERY_MAX_ROWS
+
+
+def _limit(plan):
+    limit = plan.get('limit')
+    if limit is None:
+        limit = max_rows()
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        raise QueryPlanError('Limit must be a positive number.')
+    return min(limit, max_rows())
+
+
+@lru_cache(maxsize=256)
+def _compile(canonical):
+    plan = json.loads(canonical)
+    if not isinstance(plan, dict) or 'model' not in plan:
+        raise QueryPlanError('A query plan needs a model.')
+    unknown = set(plan) - PLAN_KEYS
+    if unknown:
+        raise QueryPlanError(f"Unknown plan keys: {', '.join(sorted(unknown))}.")
+
+    plan_model = _plan_model(plan['model'])
+    annotations = _annotations(plan_model, plan.get('annotations') or {})
+    aliases = tuple(annotations)
+    filters, alias_filters = _split(_conditions(plan_model, plan.get('filters') or {}, aliases), aliases)
+    exclude, alias_exclude = _split(_conditions(plan_model, plan.get('exclude') or {}, aliases), aliases)
+    any_of = plan.get('any') or []
+    if not isinstance(any_of, list):
+        raise QueryPlanError("'any' must be a list of filter objects.")
+    any_q = Q()
+    for conditions in any_of:
+        any_q |= Q(**_conditions(plan_model, conditions))
+
+    group_by = plan.get('group_by') or []
+    if not isinstance(group_by, list):
+        raise QueryPlanError('Group by must be a list.')
+    for path in group_by:
+        _field_path(plan_model, path, single_valued=True)
+
+    columns = _columns(plan_model, plan, group_by, aliases)
+    ordering = _ordering(plan_model, plan, group_by, aliases)
+    limit = _limit(plan)
+
+    try:
+        queryset = FLEXON_SCHEMA[plan_model][0].objects.filter(any_q, **filters).exclude(**exclude)
+        if group_by:
+            queryset = queryset.values(*group_by)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        if alias_filters:
+            queryset = queryset.filter(**alias_filters)
+        if alias_exclude:
+            queryset = queryset.exclude(**alias_exclude)
+        queryset = queryset.order_by(*ordering).values(*columns)
+        if not group_by:
+            # Rows joined through to-many filters appear once; the pk tiebreak keeps distinct rows apart
+            queryset = queryset.distinct()
+        queryset = queryset[:limit]
+    except (FieldError, TypeError, ValueError) as e:
+        raise QueryPlanError(f'The query plan cannot be run: {e}')
+    return CompiledPlan(queryset, columns)
+
+
+def compile_plan(plan):
+    """Validate a plan (a dict, or its JSON) and build its QuerySet; QueryPlanError explains a rejection"""
+    if isinstance(plan, str):
+        try:
+            plan = json.loads(plan)
+        except ValueError:
+            raise QueryPlanError('The query plan is not valid JSON.')
+    try:
+        # Key order is kept: it is the order of the annotation columns
+        canonical = json.dumps(plan)
+    except (TypeError, ValueError):
+        raise QueryPlanError('The query plan is not valid JSON.')
+    compiled = _compile(canonical)
+    # A fresh clone, so the memoized QuerySet is never evaluated
+    return CompiledPlan(compiled.queryset.all(), compiled.columns)
+
+
+@contextmanager
+def _statement_timeout(milliseconds):
+    """Abort queries running longer than `milliseconds` (SQLite and PostgreSQL)"""
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout = %s', [int(milliseconds)])
+            yield
+    elif connection.vendor == 'sqlite':
+        connection.ensure_connection()
+        deadline = time.monotonic() + milliseconds / 1000
+        connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+        try:
+            yield
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+    else:
+        # Bounded by the LIMIT alone
+        yield
+
+
+def run_plan(compiled, timeout_ms=None):
+    """Rows of a compiled plan as dicts, within FLEXON_QUERY_TIMEOUT_MS"""
+    timeout_ms = timeout_ms or settings.FLEXON_QUERY_TIMEOUT_MS
+    try:
+        with _statement_timeout(timeout_ms):
+            return list(compiled.queryset)
+    except OperationalError as e:
+        if 'interrupt' in str(e).lower() or 'timeout' in str(e).lower():
+            raise QueryPlanError('The query took too long; try narrowing it down.')
+        raise
+
+
+def describe_schema():
+    """Whitelist of models, fields and relations, for the translation prompt"""
+    lines = []
+    for plan_model, (_, fields, _columns) in FLEXON_SCHEMA.items():
+        plain = ', '.join(name for name, target in fields.items() if target is None)
+        relations = ', '.join(f'{name} -> {target}' for name, target in fields.items() if target)
+        lines.append(f"- {plan_model}: {plain}" + (f"; relations: {relations}" if relations else ''))
+    return '\n'.join(lines)
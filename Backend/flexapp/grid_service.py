@@ -0,0 +1,366 @@
+"""
+Faculty student grid builder
+
+Builds one row per student with the fields the faculty grid filters on
+(certificate providers, domains and categories, project technologies and
+statuses, LeetCode total, mentor). The grid costs a fixed five queries for
+any number of students: one for the students themselves and one per related
+table, with per-student sets assembled in memory in a single pass.
+
+The same rows feed the faculty dashboard and the NAAC report; the faculty
+selection download is batched the same way by iter_selection_rows. The
+faculty dashboard API additionally filters, sorts and keyset-paginates
+students in SQL and reports facet counts for the filters.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import defaultdict
+
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .facet_index import iter_bits
+from .models import Certificate, LeetCode, Projects, student
+
+
+GRID_STUDENT_FIELDS = ('roll_no', 'first_name', 'dept', 'year', 'section', 'mentor__first_name')
+
+
+def build_student_grid(students=None, with_ids=False):
+    """
+    Return a list of grid rows, one per student in `students` (a student
+    queryset; defaults to every non-superuser):
+
+        {'roll_no', 'first_name', 'dept', 'year', 'section', 'mentor__first_name',
+         'studentrollno__TotalProblems', 'project_count', 'certificate_count',
+         'certificate_providers', 'domains', 'certificate_categories',
+         'technologies', 'project_statuses'}
+
+    with_ids adds the student's primary key as 'id'.
+    """
+    if students is None:
+        students = student.objects.filter(is_superuser=False)
+    student_ids = students.values('pk')
+
+    rows = {
+        row.pop('pk'): row
+        for row in students.values('pk', *GRID_STUDENT_FIELDS)
+    }
+
+    leetcode_totals = {}
+    leetcode_rows = LeetCode.objects.filter(rollno__in=student_ids).values_list('rollno_id', 'TotalProblems')
+    for student_id, total in leetcode_rows:
+        leetcode_totals[student_id] = max(total, leetcode_totals.get(student_id, total))
+
+    certificate_counts = defaultdict(int)
+    providers = defaultdict(set)
+    domains = defaultdict(set)
+    categories = defaultdict(set)
+    certificates = Certificate.objects.filter(rollno__in=student_ids).values_list(
+        'rollno_id', 'source', 'domain', 'category'
+    )
+    for student_id, source, domain, category in certificates:
+        certificate_counts[student_id] += 1
+        if source:
+            providers[student_id].add(source)
+        if domain:
+            domains[student_id].add(domain)
+        categories[student_id].add(category)
+
+    student_projects = defaultdict(set)
+    statuses = defaultdict(set)
+    contributions = Projects.contributors.through.objects.filter(student__in=student_ids)
+    contribution_rows = contributions.values_list('student_id', 'projects_id', 'projects__status')
+    for student_id, project_id, status in contribution_rows:
+        student_projects[student_id].add(project_id)
+        statuses[student_id].add(status)
+
+    project_technologies = defaultdict(set)
+    technology_rows = Projects.technologies.through.objects.filter(
+        projects__in=contributions.values('projects_id')
+    ).values_list('projects_id', 'technology__name')
+    for project_id, name in technology_rows:
+        project_technologies[project_id].add(name)
+
+    grid = []
+    for student_id, row in rows.items():
+        technologies = set()
+        for project_id in student_projects[student_id]:
+            technologies |= project_technologies[project_id]
+
+        if with_ids:
+            row['id'] = student_id
+        row.update({
+            'studentrollno__TotalProblems': leetcode_totals.get(student_id),
+            'project_count': len(student_projects[student_id]),
+            'certificate_count': certificate_counts[student_id],
+            'certificate_providers': sorted(providers[student_id]),
+            'domains': sorted(domains[student_id]),
+            'certificate_categories': sorted(categories[student_id]),
+            'technologies': sorted(technologies),
+            'project_statuses': sorted(statuses[student_id]),
+        })
+        grid.append(row)
+    return grid
+
+
+SELECTION_EXPORT_HEADERS = [
+    'Roll No', 'Student Name', 'Department', 'Section', 'Year', 'Total Count',
+    'Projects', 'Foreign Languages', 'Technical Certificates',
+]
+
+
+def iter_selection_rows(students):
+    """
+    Yield one SELECTION_EXPORT_HEADERS row per student in `students`, by
+    roll number. Four queries in total: students, LeetCode totals,
+    technical and foreign language certificate titles, and project titles.
+    """
+    student_ids = students.values('pk')
+
+    leetcode_totals = {}
+    leetcode_rows = LeetCode.objects.filter(rollno__in=student_ids).values_list('rollno_id', 'TotalProblems')
+    for student_id, total in leetcode_rows:
+        leetcode_totals[student_id] = max(total, leetcode_totals.get(student_id, total))
+
+    certificate_titles = defaultdict(lambda: defaultdict(list))
+    certificates = Certificate.objects.filter(
+        rollno__in=student_ids, category__in=('technical', 'foreign_language')
+    ).order_by('pk').values_list('rollno_id', 'category', 'title')
+    for student_id, category, title in certificates:
+        certificate_titles[student_id][category].append(title)
+
+    project_titles = defaultdict(list)
+    contributions = Projects.contributors.through.objects.filter(student__in=student_ids)
+    for student_id, title in contributions.order_by('projects_id').values_list('student_id', 'projects__title'):
+        project_titles[student_id].append(title)
+
+    rows = students.order_by('roll_no').values_list('pk', 'roll_no', 'first_name', 'dept', 'section', 'year')
+    for student_id, roll_no, first_name, dept, section, year in rows.iterator():
+        titles = certificate_titles[student_id]
+        yield [
+            roll_no, first_name, dept, section, year,
+            leetcode_totals.get(student_id),
+            ",".join(project_titles[student_id]),
+            ",".join(titles['foreign_language']),
+            ",".join(titles['technical']),
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Server-side filtering, sorting, keyset pagination and facets
+# ---------------------------------------------------------------------------
+
+# Request parameter -> student lookup; repeated parameters are ORed
+GRID_FIELD_FILTERS = {
+    'dept': 'dept__in',
+    'year': 'year__in',
+    'section': 'section__in',
+    'mentor': 'mentor__first_name__in',
+}
+
+# Request parameter -> (related queryset builder, lookup on it); matched with EXISTS
+GRID_RELATED_FILTERS = {
+    'provider': (lambda: Certificate.objects.filter(rollno=OuterRef('pk')), 'source__in'),
+    'domain': (lambda: Certificate.objects.filter(rollno=OuterRef('pk')), 'domain__in'),
+    'category': (lambda: Certificate.objects.filter(rollno=OuterRef('pk')), 'category__in'),
+    'technology': (
+        lambda: Projects.technologies.through.objects.filter(projects__contributors=OuterRef('pk')),
+        'technology__name__in',
+    ),
+    'status': (
+        lambda: Projects.contributors.through.objects.filter(student=OuterRef('pk')),
+        'projects__status__in',
+    ),
+}
+
+# Request parameter -> computed column it bounds from below
+GRID_MINIMUM_FILTERS = {
+    'min_leetcode': 'leetcode_total',
+    'min_projects': 'project_total',
+    'min_certificates': 'certificate_total',
+}
+
+# Sort key -> column; prefix with '-' for descending
+GRID_SORT_FIELDS = {
+    'roll_no': 'roll_no',
+    'name': 'first_name',
+    'year': 'year',
+    'section': 'section',
+    'dept': 'dept',
+    'leetcode': 'leetcode_total',
+    'projects': 'project_total',
+    'certificates': 'certificate_total',
+}
+
+GRID_FACETS = ('dept', 'year', 'section', 'mentor', 'provider', 'domain', 'technology', 'category', 'status')
+GRID_PAGE_SIZE = 50
+GRID_MAX_PAGE_SIZE = 500
+# Largest facet index match passed to SQL as a primary key list (kept well
+# under the database's parameter limit); larger ones are filtered in SQL
+GRID_ID_FILTER_LIMIT = 500
+
+
+def _computed_columns():
+    def count_of(queryset, key):
+        return Coalesce(
+            Subquery(queryset.order_by().values(key).annotate(n=Count('pk')).values('n')[:1]),
+            0,
+        )
+
+    return {
+        'leetcode_total': Coalesce(
+            Subquery(
+                LeetCode.objects.filter(rollno=OuterRef('pk'))
+                .order_by('-TotalProblems').values('TotalProblems')[:1]
+            ),
+            0,
+        ),
+        'project_total': count_of(
+            Projects.contributors.through.objects.filter(student=OuterRef('pk')), 'student'
+        ),
+        'certificate_total': count_of(Certificate.objects.filter(rollno=OuterRef('pk')), 'rollno'),
+    }
+
+
+def _param_values(params, name):
+    if hasattr(params, 'getlist'):
+        values = params.getlist(name)
+    else:
+        values = params.get(name) or []
+        values = values if isinstance(values, (list, tuple)) else [values]
+    return [value for value in values if value not in ('', None)]
+
+
+def grid_facet_filters(params):
+    """{facet: [values]} of the facet filters in `params`"""
+    return {facet: _param_values(params, facet) for facet in GRID_FACETS}
+
+
+def has_sql_only_filters(params):
+    """Whether `params` filter on anything a facet index cannot answer"""
+    if (params.get('q') or '').strip():
+        return True
+    return any(params.get(name) not in (None, '') for name in GRID_MINIMUM_FILTERS)
+
+
+def filter_grid_students(params, students=None, facet_index=None):
+    """
+    Apply grid filters from `params` (a QueryDict or dict) in SQL. With a
+    facet_index, facet filters matching few enough students are resolved
+    from its bitsets into a primary key list instead.
+    """
+    if students is None:
+        students = student.objects.filter(is_superuser=False)
+
+    facet_filters = grid_facet_filters(params)
+    mask = None
+    if facet_index is not None and any(facet_filters.values()):
+        mask = facet_index.match(facet_filters)
+
+    if mask is not None and mask.bit_count() <= GRID_ID_FILTER_LIMIT:
+        students = students.filter(pk__in=list(iter_bits(mask)))
+    else:
+        for name, lookup in GRID_FIELD_FILTERS.items():
+            values = facet_filters[name]
+            if values:
+                students = students.filter(**{lookup: values})
+
+        for name, (related, lookup) in GRID_RELATED_FILTERS.items():
+            values = facet_filters[name]
+            if values:
+                students = students.filter(Exists(related().filter(**{lookup: values})))
+
+    search = (params.get('q') or '').strip()
+    if search:
+        students = students.filter(Q(roll_no__icontains=search) | Q(first_name__icontains=search))
+
+    columns = _computed_columns()
+    for name, column in GRID_MINIMUM_FILTERS.items():
+        minimum = params.get(name)
+        if minimum not in (None, ''):
+            students = students.alias(**{column: columns[column]}).filter(**{f'{column}__gte': int(minimum)})
+
+    return students
+
+
+def encode_cursor(value, pk):
+    return urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    value, pk = json.loads(urlsafe_b64decode(cursor.encode()))
+    return value, pk
+
+
+def grid_page(students, sort='roll_no', cursor=None, limit=GRID_PAGE_SIZE):
+    """
+    One keyset-paginated page of grid rows.
+
+    Rows are ordered by the sort column with the primary key as tie breaker,
+    and the cursor holds the last row's (value, pk), so each page is a range
+    scan no matter how deep it is. Returns (rows, next_cursor).
+    """
+    descending = sort.startswith('-')
+    column = GRID_SORT_FIELDS.get(sort.lstrip('-'), 'roll_no')
+    columns = _computed_columns()
+    if column in columns:
+        students = students.annotate(**{column: columns[column]})
+
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        after = 'lt' if descending else 'gt'
+        students = students.filter(
+            Q(**{f'{column}__{after}': value}) | Q(**{column: value, f'pk__{after}': pk})
+        )
+
+    direction = '-' if descending else ''
+    page = list(
+        students.order_by(f'{direction}{column}', f'{direction}pk').values_list('pk', column)[:limit + 1]
+    )
+    next_cursor = encode_cursor(page[limit - 1][1], page[limit - 1][0]) if len(page) > limit else None
+    page_ids = [pk for pk, _ in page[:limit]]
+
+    rows = build_student_grid(student.objects.filter(pk__in=page_ids), with_ids=True)
+    position = {pk: index for index, pk in enumerate(page_ids)}
+    rows.sort(key=lambda row: position[row['id']])
+    return rows, next_cursor
+
+
+def grid_facets(students):
+    """
+    Count matching students per facet value: {facet: [(value, count), ...]},
+    most common first. One grouped query per facet; FacetIndex.facet_counts
+    answers the same question from bitsets.
+    """
+    student_ids = students.values('pk')
+
+    def ranked(queryset, key, counted):
+        rows = (
+            queryset.exclude(**{f'{key}__isnull': True})
+            .values(key)
+            .annotate(n=Count(counted, distinct=True))
+            .order_by('-n', key)
+            .values_list(key, 'n')
+        )
+        return [(value, count) for value, count in rows if value != '']
+
+    certificates = Certificate.objects.filter(rollno__in=student_ids)
+    base = student.objects.filter(pk__in=student_ids)
+    return {
+        'dept': ranked(base, 'dept', 'pk'),
+        'year': ranked(base, 'year', 'pk'),
+        'section': ranked(base, 'section', 'pk'),
+        'mentor': ranked(base, 'mentor__first_name', 'pk'),
+        'provider': ranked(certificates, 'source', 'rollno'),
+        'domain': ranked(certificates, 'domain', 'rollno'),
+        'category': ranked(certificates, 'category', 'rollno'),
+        'technology': ranked(
+            Projects.technologies.through.objects.filter(projects__contributors__in=student_ids),
+            'technology__name', 'projects__contributors',
+        ),
+        'status': ranked(
+            Projects.contributors.through.objects.filter(student__in=student_ids),
+            'projects__status', 'student',
+        ),
+    }
@@ -0,0 +1,97 @@
+"""
+Management command to benchmark the bitmap facet index against the ORM
+
+Seeds a synthetic college (see benchmark_seed) inside a transaction that
+is rolled back at the end, then answers the same random AND/OR filter
+combinations (matching students plus facet counts) through grid_service's
+SQL path and through FacetIndex, checking that both agree.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from flexapp.benchmark_seed import DOMAINS, PROVIDERS, TECHNOLOGIES, seed_college
+from flexapp.facet_index import FACETS, FacetIndex, mask_of
+from flexapp.grid_service import filter_grid_students, grid_facets
+from flexapp.models import Certificate, Projects, student
+
+
+class Command(BaseCommand):
+    help = 'Compare faculty grid filtering through the bitmap facet index with the ORM path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000, help='Synthetic students to seed (default: 10000)')
+        parser.add_argument('--queries', type=int, default=50, help='Random filter combinations (default: 50)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['students']} students...")
+            seed_college(rng, options['students'])
+
+            started = time.perf_counter()
+            index = FacetIndex().build()
+            build_time = time.perf_counter() - started
+
+            combinations = [self._random_filters(rng) for _ in range(options['queries'])]
+            orm_times, index_times = [], []
+            for filters in combinations:
+                started = time.perf_counter()
+                students = filter_grid_students(filters)
+                orm_ids = set(students.values_list('pk', flat=True))
+                orm_facets = grid_facets(students)
+                orm_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                mask = index.match(filters)
+                index_facets = index.facet_counts(mask)
+                index_times.append(time.perf_counter() - started)
+
+                if mask != mask_of(orm_ids) or not self._same_facets(orm_facets, index_facets):
+                    self.stdout.write(self.style.ERROR(f'Mismatch for filters {filters}'))
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Index build: {build_time * 1000:.1f} ms')
+        self._report('ORM', orm_times)
+        self._report('Facet index', index_times)
+        self.stdout.write(self.style.SUCCESS(
+            f'Speed-up (median): {statistics.median(orm_times) / statistics.median(index_times):.0f}x'
+        ))
+
+    def _random_filters(self, rng):
+        choices = {
+            'dept': [dept for dept, _ in student.DEPT_CHOICES],
+            'year': ['1', '2', '3', '4'],
+            'section': list('ABCD'),
+            'provider': PROVIDERS,
+            'domain': DOMAINS,
+            'category': [category for category, _ in Certificate.CATEGORY_CHOICES],
+            # As named by seed_college
+            'technology': [f'bench-{name}' for name in TECHNOLOGIES],
+            'status': [status for status, _ in Projects.status_choices],
+        }
+        filters = {}
+        for facet in rng.sample(sorted(choices), rng.randint(1, 4)):
+            filters[facet] = rng.sample(choices[facet], rng.randint(1, 2))
+        return filters
+
+    @staticmethod
+    def _same_facets(orm_facets, index_facets):
+        return all(
+            {str(value): n for value, n in orm_facets[facet]} == {str(value): n for value, n in index_facets[facet]}
+            for facet in FACETS
+        )
+
+    def _report(self, label, timings):
+        timings_ms = sorted(t * 1000 for t in timings)
+        p95 = timings_ms[int(len(timings_ms) * 0.95) - 1] if len(timings_ms) > 1 else timings_ms[0]
+        self.stdout.write(
+            f'{label:>12}: median {statistics.median(timings_ms):8.3f} ms, '
+            f'p95 {p95:8.3f} ms, total {sum(timings_ms):9.1f} ms'
+        )
@@ -0,0 +1,77 @@
+"""
+Management command to benchmark serial against parallel NAAC sheet generation
+
+Seeds a synthetic college inside a transaction that is rolled back at the
+end, collects the NAAC snapshot once, then times computing the sheets
+alone and building the whole workbook with one worker and with a pool,
+checking that both produce the same rows.
+"""
+import os
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from flexapp.benchmark_seed import seed_college
+from flexapp.models import student
+from flexapp.naac_report import collect_naac_data, compute_naac_sheets, naac_report_workers, write_naac_workbook
+
+
+class Command(BaseCommand):
+    help = 'Compare serial and parallel NAAC workbook generation on a seeded dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000, help='Synthetic students to seed (default: 5000)')
+        parser.add_argument('--workers', type=int, help='Parallel workers (default: NAAC_REPORT_WORKERS or CPUs, at least 2)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per mode (default: 3)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Compare against a pool even on a single-CPU host
+        workers = options['workers'] or max(2, naac_report_workers())
+
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['students']} students...")
+            seed_college(rng, options['students'])
+
+            started = time.perf_counter()
+            data = collect_naac_data(student.objects.filter(username__startswith='bench-'))
+            collect_time = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        serial_rows = self._rows(data, 1)
+        if serial_rows != self._rows(data, workers):
+            self.stdout.write(self.style.ERROR('Serial and parallel sheets differ'))
+
+        self.stdout.write(f'Data collection: {collect_time * 1000:.1f} ms')
+        results = {}
+        for label, run in (
+            ('sheets', lambda n: self._rows(data, n)),
+            ('workbook', lambda n: write_naac_workbook(data, n).save().close()),
+        ):
+            for mode, n in (('serial', 1), ('parallel', workers)):
+                results[label, mode] = self._time(f'{label}, {mode}', run, n, options['repeat'])
+
+        self.stdout.write(f'{workers} workers, {os.cpu_count()} CPUs')
+        for label in ('sheets', 'workbook'):
+            self.stdout.write(self.style.SUCCESS(
+                f"Speed-up, {label} (median): {results[label, 'serial'] / results[label, 'parallel']:.2f}x"
+            ))
+
+    @staticmethod
+    def _rows(data, workers):
+        return [(label, rows and rows.rows) for label, rows in compute_naac_sheets(data, workers)]
+
+    def _time(self, label, run, workers, repeat):
+        timings_ms = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(workers)
+            timings_ms.append((time.perf_counter() - started) * 1000)
+        median = statistics.median(timings_ms)
+        self.stdout.write(f'{label:>22}: median {median:9.1f} ms, best {min(timings_ms):9.1f} ms')
+        return median
@@ -0,0 +1,72 @@
+"""
+Management command to benchmark batch portfolio PDF rendering
+
+Seeds a synthetic college inside a transaction that is rolled back at the
+end, collects the portfolio data once, then times rendering every PDF and
+building the whole ZIP serially and with a process pool, reporting
+throughput in PDFs per second and per second per core.
+"""
+import os
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from flexapp.benchmark_seed import seed_college
+from flexapp.models import student
+from flexapp.portfolio_service import collect_portfolio_data, iter_portfolio_zip, portfolio_workers, render_portfolios
+
+
+class Command(BaseCommand):
+    help = 'Measure serial and pooled portfolio PDF throughput on a seeded dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300, help='Synthetic students to seed (default: 300)')
+        parser.add_argument('--workers', type=int, help='Pool workers (default: PORTFOLIO_PDF_WORKERS or CPUs, at least 2)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per mode (default: 3)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    def handle(self, *args, **options):
+        # Compare against a pool even on a single-CPU host
+        workers = options['workers'] or max(2, portfolio_workers())
+
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['students']} students...")
+            seed_college(random.Random(options['seed']), options['students'])
+
+            started = time.perf_counter()
+            portfolios = collect_portfolio_data(student.objects.filter(username__startswith='bench-').order_by('roll_no'))
+            collect_time = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Data collection: {collect_time * 1000:.1f} ms for {len(portfolios)} portfolios')
+        results = {}
+        for label, run in (
+            ('render', lambda n: sum(1 for _ in render_portfolios(portfolios, n))),
+            ('zip', lambda n: sum(len(chunk) for chunk in iter_portfolio_zip(portfolios, n))),
+        ):
+            for mode, n in (('serial', 1), ('pool', workers)):
+                results[label, mode] = self._time(f'{label}, {mode}', run, n, len(portfolios), options['repeat'])
+
+        self.stdout.write(f'{workers} workers, {os.cpu_count()} CPUs')
+        cores = min(workers, os.cpu_count() or 1)
+        for label in ('render', 'zip'):
+            serial, pooled = results[label, 'serial'], results[label, 'pool']
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: {serial:.1f} PDFs/s serial, {pooled:.1f} PDFs/s pooled '
+                f'({pooled / cores:.1f} per core), speed-up {pooled / serial:.2f}x'
+            ))
+
+    def _time(self, label, run, workers, count, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(workers)
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        rate = count / median
+        self.stdout.write(f'{label:>14}: median {median * 1000:9.1f} ms, {rate:7.1f} PDFs/s')
+        return rate
@@ -0,0 +1,52 @@
+"""
+Management command that writes the portfolio PDFs of a dept/year/section selection to one ZIP
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flexapp.portfolio_service import collect_portfolio_data, iter_portfolio_zip, portfolio_students, portfolio_workers
+
+
+class Command(BaseCommand):
+    help = 'Render portfolio PDFs for a selection of students in a process pool and package them as a ZIP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dept', type=str, help='Only students of this department')
+        parser.add_argument('--year', type=int, help='Only students of this year')
+        parser.add_argument('--section', type=str, help='Only students of this section')
+        parser.add_argument('--output', type=str, help='ZIP file to write (default: portfolios_<selection>.zip)')
+        parser.add_argument('--workers', type=int, help='Rendering processes (default: PORTFOLIO_PDF_WORKERS or CPUs)')
+
+    def handle(self, *args, **options):
+        selection = [str(options[name]) for name in ('dept', 'year', 'section') if options.get(name)]
+        output = options.get('output') or f"portfolios_{'_'.join(selection) or 'all'}.zip"
+        workers = options.get('workers') or portfolio_workers()
+
+        started = time.perf_counter()
+        portfolios = collect_portfolio_data(portfolio_students(options.get('dept'), options.get('year'), options.get('section')))
+        if not portfolios:
+            raise CommandError('No students match the selection')
+        collected = time.perf_counter()
+        self.stdout.write(
+            f'Collected {len(portfolios)} portfolios in {collected - started:.2f}s; rendering with {workers} worker(s)...'
+        )
+
+        reported = [0]
+
+        def progress(percent):
+            # Every tenth of the way
+            if percent // 10 > reported[0] // 10:
+                reported[0] = percent
+                self.stdout.write(f'  {percent:5.1f}%')
+
+        with open(output, 'wb') as archive:
+            for chunk in iter_portfolio_zip(portfolios, workers, progress):
+                archive.write(chunk)
+
+        elapsed = time.perf_counter() - collected
+        rate = len(portfolios) / elapsed
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(portfolios)} portfolios to {output} in {elapsed:.2f}s '
+            f'({rate:.1f} PDFs/s, {rate / workers:.1f} PDFs/s per worker)'
+        ))
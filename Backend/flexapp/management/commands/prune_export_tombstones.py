@@ -0,0 +1,26 @@
+"""
+Management command that deletes export tombstones older than every consumer's watermark
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from flexapp.models import ExportTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete export tombstones older than the given number of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Keep tombstones this recent; consumers must sync at least this often (default: 90)',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = ExportTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} export tombstone(s) older than {cutoff:%Y-%m-%d}'))
@@ -0,0 +1,39 @@
+"""
+Management command to rebuild the precomputed StudentMetrics table
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from flexapp.metrics_service import rebuild_all_metrics
+from flexapp.models import student
+
+
+class Command(BaseCommand):
+    help = 'Rebuild dashboard metrics for all students (or a dept/year subset) in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dept', type=str, help='Only rebuild students of this department')
+        parser.add_argument('--year', type=int, help='Only rebuild students of this year')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Students per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = student.objects.filter(is_superuser=False)
+        if options.get('dept'):
+            queryset = queryset.filter(dept=options['dept'])
+        if options.get('year'):
+            queryset = queryset.filter(year=options['year'])
+
+        self.stdout.write('Rebuilding student metrics...')
+        started = time.monotonic()
+        written = rebuild_all_metrics(queryset, batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt metrics for {written} students in {elapsed:.2f}s')
+        )
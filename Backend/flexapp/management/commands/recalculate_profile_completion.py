@@ -0,0 +1,25 @@
+"""
+Management command to recalculate profile completion for all students
+"""
+from django.core.management.base import BaseCommand
+
+from flexapp.metrics_service import recalculate_profile_completion
+from flexapp.models import student
+
+
+class Command(BaseCommand):
+    help = 'Recalculate profile completion for all students (or a dept/year subset) in one UPDATE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dept', type=str, help='Only recalculate students of this department')
+        parser.add_argument('--year', type=int, help='Only recalculate students of this year')
+
+    def handle(self, *args, **options):
+        queryset = student.objects.all()
+        if options.get('dept'):
+            queryset = queryset.filter(dept=options['dept'])
+        if options.get('year'):
+            queryset = queryset.filter(year=options['year'])
+
+        updated = recalculate_profile_completion(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Recalculated profile completion for {updated} students'))
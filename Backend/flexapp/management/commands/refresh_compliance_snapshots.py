@@ -0,0 +1,39 @@
+"""
+Management command to rebuild the precomputed ComplianceSnapshot table
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from flexapp.compliance_service import refresh_compliance_snapshots, refresh_stale_compliance_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Recompute NAAC compliance snapshots for all admission years (or a year/dept subset)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year', type=int, action='append', dest='years',
+            help='Only this admission year (repeatable)',
+        )
+        parser.add_argument(
+            '--dept', type=str, action='append', dest='depts',
+            help='Only this department (repeatable)',
+        )
+        parser.add_argument(
+            '--stale', action='store_true',
+            help='Only the scopes whose data changed since their last refresh',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Refreshing compliance snapshots...')
+        started = time.monotonic()
+        if options['stale']:
+            written = refresh_stale_compliance_snapshots()
+        else:
+            written = refresh_compliance_snapshots(options['years'], options['depts'])
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {written} compliance snapshots in {elapsed:.2f}s')
+        )
@@ -0,0 +1,75 @@
+"""
+Management command that builds queued ReportJob rows in the background and
+refreshes the compliance snapshots marked stale by the web processes
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from flexapp.compliance_service import refresh_stale_compliance_snapshots
+from flexapp.report_jobs import claim_job, requeue_stale_jobs, run_job, send_heartbeat, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Run queued report jobs (NAAC workbooks, compliance reports, bulk exports) and refresh stale compliance snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.REPORT_JOB_CONCURRENCY,
+            help=f'Jobs run at once by this worker (default: REPORT_JOB_CONCURRENCY={settings.REPORT_JOB_CONCURRENCY})',
+        )
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue polls (default: 2)')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty instead of polling')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        name = worker_name()
+        self.stdout.write(f'Report worker {name} running up to {concurrency} job(s) at a time')
+
+        running = set()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            try:
+                while True:
+                    running = {future for future in running if not future.done()}
+                    if running:
+                        send_heartbeat(name)
+                    requeue_stale_jobs()
+                    self._refresh_compliance()
+                    while len(running) < concurrency:
+                        job = claim_job(name)
+                        if job is None:
+                            break
+                        self.stdout.write(f'Started {job}')
+                        running.add(pool.submit(self._run, job))
+
+                    if options['once'] and not running:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping; waiting for running jobs to finish...')
+
+        connection.close()
+        self.stdout.write(self.style.SUCCESS('Report worker stopped'))
+
+    def _refresh_compliance(self):
+        # Compliance snapshots marked stale by the web processes are rebuilt here
+        try:
+            refresh_stale_compliance_snapshots()
+        except Exception:
+            logging.exception("Could not refresh stale compliance snapshots")
+
+    def _run(self, job):
+        try:
+            if run_job(job):
+                self.stdout.write(self.style.SUCCESS(f'Finished report job {job.pk}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Report job {job.pk} failed'))
+        finally:
+            # Each pool thread has its own database connection
+            connection.close()
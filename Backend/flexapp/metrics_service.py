@@ -0,0 +1,241 @@
+"""
+Student metrics service
+
+Computes the per-student dashboard counters stored in StudentMetrics. Every
+metric group is computed with one grouped query for any number of students,
+so the same code serves the incremental signal handlers (one student) and
+the bulk rebuild command (thousands of students per batch).
+"""
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+
+from .dashboard_service import bump_student_data_versions
+
+from .models import (
+    Achievement, ApprovalWorkflow, Certificate, PlacementOffer, Projects,
+    StudentMetrics, student
+)
+
+
+PENDING_APPROVAL_STATUSES = ['pending', 'under_review']
+
+
+def _certificate_metrics(student_ids):
+    rows = (
+        Certificate.objects.filter(rollno_id__in=student_ids)
+        .values('rollno_id')
+        .annotate(
+            total_certificates=Count('id'),
+            technical_certificates=Count('id', filter=Q(category='technical')),
+            foreign_language_certificates=Count('id', filter=Q(category='foreign_language')),
+            co_curricular_certificates=Count('id', filter=Q(category='co_curricular')),
+            extra_curricular_certificates=Count('id', filter=Q(category='extra_curricular')),
+        )
+    )
+    return {row.pop('rollno_id'): row for row in rows}
+
+
+def _achievement_metrics(student_ids):
+    rows = (
+        Achievement.objects.filter(student_id__in=student_ids)
+        .values('student_id')
+        .annotate(
+            total_achievements=Count('id'),
+            approved_achievements=Count('id', filter=Q(status='approved')),
+            pending_achievements=Count('id', filter=Q(status='pending')),
+            rejected_achievements=Count('id', filter=Q(status='rejected')),
+            achievement_points=Sum('points_awarded', filter=Q(status='approved')),
+        )
+    )
+    metrics = {}
+    for row in rows:
+        row['achievement_points'] = row['achievement_points'] or 0
+        metrics[row.pop('student_id')] = row
+    return metrics
+
+
+def _project_metrics(student_ids):
+    through = Projects.contributors.through
+    rows = (
+        through.objects.filter(student_id__in=student_ids)
+        .values('student_id')
+        .annotate(
+            total_projects=Count('projects_id', distinct=True),
+            completed_projects=Count('projects_id', distinct=True, filter=Q(projects__status='Completed')),
+            in_progress_projects=Count('projects_id', distinct=True, filter=Q(projects__status='In_progress')),
+            initialized_projects=Count('projects_id', distinct=True, filter=Q(projects__status='Initialized')),
+        )
+    )
+    return {row.pop('student_id'): row for row in rows}
+
+
+def _placement_metrics(student_ids):
+    rows = (
+        PlacementOffer.objects.filter(student_id__in=student_ids)
+        .values('student_id')
+        .annotate(placement_offers=Count('id'))
+    )
+    return {row.pop('student_id'): row for row in rows}
+
+
+def _approval_metrics(student_ids):
+    rows = (
+        ApprovalWorkflow.objects.filter(
+            student_id__in=student_ids,
+            current_status__in=PENDING_APPROVAL_STATUSES
+        )
+        .values('student_id')
+        .annotate(pending_approvals=Count('id'))
+    )
+    return {row.pop('student_id'): row for row in rows}
+
+
+# Metric group name -> (grouped query, fields it fills)
+METRIC_GROUPS = {
+    'certificates': (_certificate_metrics, [
+        'total_certificates', 'technical_certificates', 'foreign_language_certificates',
+        'co_curricular_certificates', 'extra_curricular_certificates',
+    ]),
+    'achievements': (_achievement_metrics, [
+        'total_achievements', 'approved_achievements', 'pending_achievements',
+        'rejected_achievements', 'achievement_points',
+    ]),
+    'projects': (_project_metrics, [
+        'total_projects', 'completed_projects', 'in_progress_projects', 'initialized_projects',
+    ]),
+    'placements': (_placement_metrics, ['placement_offers']),
+    'approvals': (_approval_metrics, ['pending_approvals']),
+}
+
+METRIC_FIELDS = [field for _, fields in METRIC_GROUPS.values() for field in fields]
+
+
+def compute_metrics(student_ids, groups=None):
+    """Return {student_id: {field: value}} for the requested metric groups"""
+    student_ids = list(student_ids)
+    groups = groups or list(METRIC_GROUPS)
+    result = {student_id: {} for student_id in student_ids}
+
+    for group in groups:
+        query, fields = METRIC_GROUPS[group]
+        rows = query(student_ids)
+        for student_id in student_ids:
+            values = rows.get(student_id, {})
+            for field in fields:
+                result[student_id][field] = values.get(field, 0)
+
+    return result
+
+
+def refresh_student_metrics(student_id, *groups):
+    """
+    Recompute the given metric groups for one student and write them to the
+    existing StudentMetrics row. Rows are created lazily on first dashboard
+    view or by the rebuild command, so this never inserts.
+    """
+    if not student_id:
+        return
+    fields = compute_metrics([student_id], groups or None)[student_id]
+    StudentMetrics.objects.filter(student_id=student_id).update(**fields)
+
+
+def sync_profile_completion(student_obj):
+    """Copy the student's stored profile completion onto the metrics row"""
+    StudentMetrics.objects.filter(student_id=student_obj.pk).exclude(
+        profile_completion=student_obj.profile_completion_percentage
+    ).update(profile_completion=student_obj.profile_completion_percentage)
+
+
+def create_student_metrics(student_obj):
+    """Create the metrics row for a newly registered student"""
+    fields = compute_metrics([student_obj.pk])[student_obj.pk]
+    fields['profile_completion'] = student_obj.profile_completion_percentage
+    StudentMetrics.objects.update_or_create(student=student_obj, defaults=fields)
+
+
+def get_student_metrics(student_obj):
+    """
+    Return the StudentMetrics row for a student. Students that predate the
+    table get an unsaved row computed on the fly, so reads never write;
+    rebuild_student_metrics persists them.
+    """
+    try:
+        return StudentMetrics.objects.get(student=student_obj)
+    except StudentMetrics.DoesNotExist:
+        fields = compute_metrics([student_obj.pk])[student_obj.pk]
+        fields['profile_completion'] = student_obj.profile_completion_percentage
+        return StudentMetrics(student=student_obj, **fields)
+
+
+def recalculate_profile_completion(queryset=None):
+    """
+    Recompute profile completion for every student whose stored value is
+    stale with one UPDATE, then copy it onto the metrics rows with a second.
+    Returns the number of students updated.
+    """
+    if queryset is None:
+        queryset = student.objects.all()
+
+    stale_ids = list(
+        queryset.order_by()
+        .alias(completion=student.profile_completion_expression())
+        .exclude(profile_completion_percentage=F('completion'))
+        .values_list('pk', flat=True)
+    )
+    if not stale_ids:
+        return 0
+
+    updated = student.objects.filter(pk__in=stale_ids).update(
+        profile_completion_percentage=student.profile_completion_expression()
+    )
+    StudentMetrics.objects.filter(student_id__in=stale_ids).update(
+        profile_completion=Subquery(
+            student.objects.filter(pk=OuterRef('student_id')).values('profile_completion_percentage')[:1]
+        )
+    )
+    # Completion shows on the cached dashboards; UPDATE sends no signals
+    bump_student_data_versions(stale_ids)
+    return updated
+
+
+def rebuild_all_metrics(queryset=None, batch_size=500):
+    """
+    Rebuild StudentMetrics for every student in bulk.
+
+    Each batch costs one grouped query per metric group plus one upsert,
+    independent of how many certificates or projects the students have.
+    Stale profile completion is written back to the student rows as well.
+    Returns the number of rows written.
+    """
+    if queryset is None:
+        queryset = student.objects.filter(is_superuser=False)
+
+    student_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    written = 0
+
+    for start in range(0, len(student_ids), batch_size):
+        batch_ids = student_ids[start:start + batch_size]
+        computed = compute_metrics(batch_ids)
+
+        rows = []
+        stale = []
+        for student_obj in student.objects.filter(pk__in=batch_ids):
+            stored = student_obj.profile_completion_percentage
+            fields = computed[student_obj.pk]
+            fields['profile_completion'] = student_obj.calculate_profile_completion()
+            rows.append(StudentMetrics(student=student_obj, **fields))
+            if student_obj.profile_completion_percentage != stored:
+                stale.append(student_obj)
+
+        if stale:
+            student.objects.bulk_update(stale, ['profile_completion_percentage'])
+            bump_student_data_versions(student_obj.pk for student_obj in stale)
+
+        StudentMetrics.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=METRIC_FIELDS + ['profile_completion', 'updated_at'],
+        )
+        written += len(rows)
+
+    return written
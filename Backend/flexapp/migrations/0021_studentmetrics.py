@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flexapp', '0020_certificate_approval_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('technical_certificates', models.IntegerField(default=0)),
+                ('foreign_language_certificates', models.IntegerField(default=0)),
+                ('co_curricular_certificates', models.IntegerField(default=0)),
+                ('extra_curricular_certificates', models.IntegerField(default=0)),
+                ('total_certificates', models.IntegerField(default=0)),
+                ('total_achievements', models.IntegerField(default=0)),
+                ('approved_achievements', models.IntegerField(default=0)),
+                ('pending_achievements', models.IntegerField(default=0)),
+                ('rejected_achievements', models.IntegerField(default=0)),
+                ('achievement_points', models.IntegerField(default=0)),
+                ('total_projects', models.IntegerField(default=0)),
+                ('completed_projects', models.IntegerField(default=0)),
+                ('in_progress_projects', models.IntegerField(default=0)),
+                ('initialized_projects', models.IntegerField(default=0)),
+                ('placement_offers', models.IntegerField(default=0)),
+                ('pending_approvals', models.IntegerField(default=0)),
+                ('profile_completion', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='flexapp.student')),
+            ],
+            options={
+                'verbose_name_plural': 'Student Metrics',
+            },
+        ),
+    ]
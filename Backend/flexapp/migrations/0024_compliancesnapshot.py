@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flexapp', '0023_export_watermarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplianceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('admission_year', models.IntegerField()),
+                ('dept', models.CharField(max_length=20)),
+                ('metrics', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['admission_year', 'dept'],
+                'unique_together': {('admission_year', 'dept')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flexapp', '0024_compliancesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlexonQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized_query', models.CharField(max_length=255, unique=True)),
+                ('query', models.TextField()),
+                ('orm', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Flexon queries',
+                'indexes': [models.Index(fields=['-hit_count'], name='flexapp_fle_hit_cou_a0d9ad_idx')],
+            },
+        ),
+    ]
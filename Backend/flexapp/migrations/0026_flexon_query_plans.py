@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flexapp', '0025_flexon_translation_cache'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='flexonquery',
+            name='orm',
+        ),
+        migrations.AddField(
+            model_name='flexonquery',
+            name='plan',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
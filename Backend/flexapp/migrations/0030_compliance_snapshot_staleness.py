@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flexapp', '0029_report_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compliancesnapshot',
+            name='stale_since',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='compliancesnapshot',
+            name='computed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -347,39 +347,57 @@ class student(AbstractUser):
     def type(self):
         return "student"
     
+    # Fields counted towards profile completion, with placeholder values that do not count
+    PROFILE_COMPLETION_FIELDS = (
+        # Mandatory fields
+        'first_name', 'last_name', 'email', 'phone', 'dept', 'year', 'section',
+        # Optional fields
+        'personal_email', 'date_of_birth', 'guardian_name', 'guardian_phone', 'address',
+        'admission_year', 'career_interests', 'technical_skills', 'soft_skills',
+        'linkedin_url', 'githublink', 'leetcode_user', 'portfolio_url',
+    )
+    PROFILE_PLACEHOLDERS = {'leetcode_user': 'Username'}
+
+    def save(self, *args, **kwargs):
+        # A partial save of any counted field must also write the recalculated completion
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not set(update_fields).isdisjoint(self.PROFILE_COMPLETION_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'profile_completion_percentage'}
+        super().save(*args, **kwargs)
+
     def calculate_profile_completion(self):
         """Calculate profile completion percentage"""
-        total_fields = 20  # Adjust based on required fields
         completed_fields = 0
-        
-        # Check mandatory fields
-        if self.first_name: completed_fields += 1
-        if self.last_name: completed_fields += 1
-        if self.email: completed_fields += 1
-        if self.phone: completed_fields += 1
-        if self.dept: completed_fields += 1
-        if self.year: completed_fields += 1
-        if self.section: completed_fields += 1
-        
-        # Check optional fields
-        if self.personal_email: completed_fields += 1
-        if self.date_of_birth: completed_fields += 1
-        if self.guardian_name: completed_fields += 1
-        if self.guardian_phone: completed_fields += 1
-        if self.address: completed_fields += 1
-        if self.admission_year: completed_fields += 1
-        if self.career_interests: completed_fields += 1
-        if self.technical_skills: completed_fields += 1
-        if self.soft_skills: completed_fields += 1
-        if self.linkedin_url: completed_fields += 1
-        if self.githublink: completed_fields += 1
-        if self.leetcode_user and self.leetcode_user != "Username": completed_fields += 1
-        if self.portfolio_url: completed_fields += 1
-        
-        percentage = (completed_fields / total_fields) * 100
+        for name in self.PROFILE_COMPLETION_FIELDS:
+            value = getattr(self, name)
+            if value and value != self.PROFILE_PLACEHOLDERS.get(name):
+                completed_fields += 1
+
+        percentage = completed_fields * 100 // len(self.PROFILE_COMPLETION_FIELDS)
         self.profile_completion_percentage = percentage
         return percentage
 
+    @classmethod
+    def profile_completion_expression(cls):
+        """
+        Database expression equivalent to calculate_profile_completion(), so
+        every student can be recalculated with a single UPDATE.
+        """
+        completed_fields = models.Value(0)
+        for name in cls.PROFILE_COMPLETION_FIELDS:
+            field = cls._meta.get_field(name)
+            filled = models.Q(**{f'{name}__isnull': False})
+            if isinstance(field, models.IntegerField):
+                filled &= ~models.Q(**{name: 0})
+            elif isinstance(field, (models.CharField, models.TextField)):
+                filled &= ~models.Q(**{name: ''})
+            if name in cls.PROFILE_PLACEHOLDERS:
+                filled &= ~models.Q(**{name: cls.PROFILE_PLACEHOLDERS[name]})
+            completed_fields += models.Case(
+                models.When(filled, then=1), default=0, output_field=models.IntegerField()
+            )
+        return completed_fields * 100 / len(cls.PROFILE_COMPLETION_FIELDS)
+
 
 # Achievement Categories Model
 class AchievementCategory(models.Model):
@@ -417,6 +435,7 @@ class Achievement(models.Model):
     approved_by = models.ForeignKey('Faculty', on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_achievements')
     submission_date = models.DateTimeField(auto_now_add=True)
     review_date = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     approval_date = models.DateTimeField(null=True, blank=True)
     
     # Comments and feedback
@@ -550,6 +569,7 @@ class Certificate(models.Model):
 
     course_link = models.URLField(blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     # Extended fields for better categorization
     domain = models.CharField(max_length=100, blank=True, help_text="e.g., Machine Learning, Web Development")
@@ -1003,6 +1023,7 @@ class Projects(models.Model):
     approved_by = models.ForeignKey('Faculty', on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_projects')
     approval_date = models.DateTimeField(null=True, blank=True)
     faculty_comments = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
@@ -1116,6 +1137,7 @@ class PlacementOffer(models.Model):
     placement_type = models.CharField(max_length=50, blank=True, null=True, help_text="Type of placement (e.g., Internship, Full-time)")
     accepted = models.BooleanField(default=False, help_text="Whether the student accepted this offer")
     remarks = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         status = "Accepted" if self.accepted else "Offered"
@@ -1132,3 +1154,182 @@ class Placement(models.Model):
 
     def offer_count(self):
         return self.student.placement_offers.count()
+
+
+# Precomputed per-student dashboard metrics
+class StudentMetrics(models.Model):
+    """Denormalized counters for the student dashboard, kept current by signals"""
+    student = models.OneToOneField('student', on_delete=models.CASCADE, related_name='metrics')
+
+    # Certificates by category
+    technical_certificates = models.IntegerField(default=0)
+    foreign_language_certificates = models.IntegerField(default=0)
+    co_curricular_certificates = models.IntegerField(default=0)
+    extra_curricular_certificates = models.IntegerField(default=0)
+    total_certificates = models.IntegerField(default=0)
+
+    # Achievements by status
+    total_achievements = models.IntegerField(default=0)
+    approved_achievements = models.IntegerField(default=0)
+    pending_achievements = models.IntegerField(default=0)
+    rejected_achievements = models.IntegerField(default=0)
+    achievement_points = models.IntegerField(default=0)
+
+    # Projects by status
+    total_projects = models.IntegerField(default=0)
+    completed_projects = models.IntegerField(default=0)
+    in_progress_projects = models.IntegerField(default=0)
+    initialized_projects = models.IntegerField(default=0)
+
+    placement_offers = models.IntegerField(default=0)
+    pending_approvals = models.IntegerField(default=0)
+    profile_completion = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Student Metrics"
+
+    def __str__(self):
+        return f"Metrics for {self.student.roll_no}"
+
+    def certificates_by_category(self):
+        """Certificate counts keyed by Certificate.CATEGORY_CHOICES value"""
+        return {
+            'technical': self.technical_certificates,
+            'foreign_language': self.foreign_language_certificates,
+            'co_curricular': self.co_curricular_certificates,
+            'extra_curricular': self.extra_curricular_certificates,
+        }
+
+    def achievements_summary(self):
+        return {
+            'total': self.total_achievements,
+            'approved': self.approved_achievements,
+            'pending': self.pending_achievements,
+            'rejected': self.rejected_achievements,
+        }
+
+    def projects_summary(self):
+        return {
+            'total': self.total_projects,
+            'completed': self.completed_projects,
+            'in_progress': self.in_progress_projects,
+            'initialized': self.initialized_projects,
+        }
+
+
+# Background report generation
+class ReportJob(models.Model):
+    """A report built by the `run_report_worker` command instead of a web request"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    report_type = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    # "<user model>:<pk>" of the requester; faculty and students live in separate tables
+    owner = models.CharField(max_length=100, db_index=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    output_path = models.CharField(max_length=500, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    # Times claimed; a job whose worker died is requeued until it runs out of attempts
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while it runs the job
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} #{self.pk} ({self.status})"
+
+
+# Cache invalidation
+class DataVersion(models.Model):
+    """Version stamp of a cached data scope, shared by all processes, see data_versions"""
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key} @ {self.version}"
+
+
+class FacetIndexChange(models.Model):
+    """A student whose grid facets changed, replayed by every process's facet index"""
+    student_id = models.IntegerField()
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"student #{self.student_id} changed {self.changed_at}"
+
+
+# Incremental exports
+class ExportTombstone(models.Model):
+    """A deleted exportable row, reported to `?since=` exports so consumers can drop it"""
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at}"
+
+
+# Compliance reporting
+class ComplianceSnapshot(models.Model):
+    """Compliance metric counts for one admission year and department, see compliance_service"""
+    admission_year = models.IntegerField()
+    dept = models.CharField(max_length=20)
+    metrics = models.JSONField(default=dict)
+    # Null until first computed; a scope marked stale before it has a snapshot gets an empty row
+    computed_at = models.DateTimeField(null=True, blank=True)
+    # Set when the scope's data changes, cleared by the refresh that covers the change
+    stale_since = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        unique_together = ('admission_year', 'dept')
+        ordering = ['admission_year', 'dept']
+
+    def __str__(self):
+        computed = f"{self.computed_at:%Y-%m-%d %H:%M}" if self.computed_at else "not computed"
+        return f"{self.admission_year} {self.dept} ({computed})"
+
+
+# Flexon
+class FlexonQuery(models.Model):
+    """A validated query plan for a Flexon question, keyed by its normalized text, see flexon_cache"""
+    normalized_query = models.CharField(max_length=255, unique=True)
+    query = models.TextField()
+    # Null once a plan is retired; the question stays listed and is translated again when asked
+    plan = models.JSONField(null=True, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'Flexon queries'
+        indexes = [
+            models.Index(fields=['-hit_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.query} ({self.hit_count} hits)"
@@ -0,0 +1,499 @@
+"""
+NAAC workbook
+
+The report is built in two stages. collect_naac_data() loads everything the
+sheets need for a set of students - the students with their mentors and
+LeetCode totals, certificates, projects with technologies and contributors,
+achievements with categories and placement offers, and the skills_service
+technology and domain rankings - in a fixed ten queries, into a NaacSnapshot
+of plain rows. Each sheet builder then renders
+from the snapshot alone and runs no queries of its own, so the report costs
+the same handful of queries for ten students or a whole college.
+
+The sheets are independent once the data is in memory, so the background
+report worker computes their rows concurrently in a pool of
+NAAC_REPORT_WORKERS spawned processes (see process_pool), and a single
+writer appends them to the workbook in a fixed order as they finish. Web
+requests compute them one at a time rather than start a pool.
+"""
+import logging
+import os
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import Achievement, Certificate, LeetCode, PlacementOffer, Projects
+from .process_pool import process_pool
+from .skills_service import domain_counts, technology_counts
+from .xlsx_export import SheetRows, XlsxReport
+
+
+NAAC_STUDENT_FIELDS = (
+    'pk', 'roll_no', 'first_name', 'last_name', 'dept', 'year', 'section', 'email',
+    'current_cgpa', 'phone', 'githublink', 'mentor__first_name', 'mentor__last_name',
+)
+
+
+class NaacSnapshot:
+    """
+    Plain-row tables for one NAAC report:
+
+        students      {'pk', 'roll_no', 'name', ..., 'project_count',
+                       'certificate_count', 'achievement_count',
+                       'placement_count', 'leetcode'} in primary key order
+        certificates  certificate rows with the owner's roll_no and name
+        projects      projects with 'contributor_count', 'technologies'
+                      and 'departments' over all of their contributors
+        achievements  achievement rows with the owner's roll_no and name
+        placements    placement offer rows with the student's details
+        technology_usage / domain_usage   [(name, count)] from skills_service,
+                      most used first
+    """
+
+    def __init__(self, students, certificates, projects, achievements, placements,
+                 technology_usage, domain_usage):
+        self.students = students
+        self.certificates = certificates
+        self.projects = projects
+        self.achievements = achievements
+        self.placements = placements
+        self.technology_usage = technology_usage
+        self.domain_usage = domain_usage
+
+
+def _full_name(first_name, last_name):
+    return f"{first_name or ''} {last_name or ''}".strip()
+
+
+def collect_naac_data(students_queryset):
+    """Load every table the NAAC sheets use for `students_queryset` (ten queries)"""
+    student_ids = students_queryset.values('pk')
+
+    students = {}
+    for row in students_queryset.order_by('pk').values(*NAAC_STUDENT_FIELDS):
+        row.update({
+            'name': _full_name(row['first_name'], row['last_name']),
+            'mentor': _full_name(row.pop('mentor__first_name'), row.pop('mentor__last_name')),
+            'project_count': 0,
+            'certificate_count': 0,
+            'achievement_count': 0,
+            'placement_count': 0,
+            'leetcode': 0,
+        })
+        students[row['pk']] = row
+
+    for student_id, total in LeetCode.objects.filter(rollno__in=student_ids).values_list('rollno_id', 'TotalProblems'):
+        students[student_id]['leetcode'] = max(students[student_id]['leetcode'], total or 0)
+
+    certificates = []
+    certificate_rows = Certificate.objects.filter(rollno__in=student_ids).order_by('pk').values(
+        'rollno_id', 'title', 'category', 'source', 'domain', 'year_and_sem', 'validity_period'
+    )
+    for row in certificate_rows:
+        owner = students[row.pop('rollno_id')]
+        owner['certificate_count'] += 1
+        certificates.append({**row, 'roll_no': owner['roll_no'], 'name': owner['name']})
+
+    # Every contributor of every project that has a contributor in scope
+    through = Projects.contributors.through.objects
+    project_ids = through.filter(student__in=student_ids).values('projects_id')
+    contributors = defaultdict(list)
+    departments = defaultdict(set)
+    for project_id, student_id, dept in through.filter(projects__in=project_ids).values_list(
+        'projects_id', 'student_id', 'student__dept'
+    ):
+        contributors[project_id].append(student_id)
+        departments[project_id].add(dept)
+
+    technologies = defaultdict(list)
+    for project_id, name in Projects.technologies.through.objects.filter(
+        projects__in=project_ids
+    ).order_by('pk').values_list('projects_id', 'technology__name'):
+        technologies[project_id].append(name)
+
+    projects = []
+    project_rows = Projects.objects.filter(pk__in=project_ids).order_by('pk').values(
+        'pk', 'title', 'description', 'status', 'year_and_sem', 'github_link'
+    )
+    for row in project_rows:
+        project_id = row['pk']
+        for student_id in contributors[project_id]:
+            if student_id in students:
+                students[student_id]['project_count'] += 1
+        projects.append({
+            **row,
+            'contributor_count': len(contributors[project_id]),
+            'technologies': technologies[project_id],
+            'departments': sorted(departments[project_id]),
+        })
+
+    achievements = []
+    achievement_rows = Achievement.objects.filter(student__in=student_ids).values(
+        'student_id', 'title', 'category__name', 'description', 'achievement_date',
+        'status', 'points_awarded', 'verification_method',
+    )
+    for row in achievement_rows:
+        owner = students[row.pop('student_id')]
+        owner['achievement_count'] += 1
+        achievements.append({**row, 'roll_no': owner['roll_no'], 'name': owner['name']})
+
+    placements = []
+    placement_rows = PlacementOffer.objects.filter(student__in=student_ids).order_by('pk').values(
+        'student_id', 'company', 'package', 'placement_type', 'offer_date'
+    )
+    for row in placement_rows:
+        owner = students[row.pop('student_id')]
+        owner['placement_count'] += 1
+        placements.append({
+            **row, 'roll_no': owner['roll_no'], 'name': owner['name'],
+            'dept': owner['dept'], 'year': owner['year'],
+        })
+
+    return NaacSnapshot(
+        students=list(students.values()),
+        certificates=certificates,
+        projects=projects,
+        achievements=achievements,
+        placements=placements,
+        # Ranked as on the dashboard: a technology counts once per project
+        technology_usage=technology_counts(students_queryset),
+        domain_usage=domain_counts(students_queryset),
+    )
+
+
+def _truncate(text, length=100):
+    text = text or ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else 'N/A'
+
+
+def generate_student_summary_sheet(data):
+    """Generate student summary sheet for NAAC report"""
+    ws = SheetRows("Student Summary")
+
+    # Headers
+    headers = [
+        'Roll Number', 'Name', 'Department', 'Year', 'Section', 'Email',
+        'CGPA', 'Projects Count', 'Certificates Count', 'Achievements Count',
+        'LeetCode Problems', 'Mentor', 'Phone', 'GitHub Link'
+    ]
+    ws.append(headers, style='header')
+
+    # Data rows; column widths are sized from the values as they are written
+    for row in data.students:
+        values = [
+            row['roll_no'] or 'N/A',
+            row['name'] or 'N/A',
+            row['dept'],
+            row['year'],
+            row['section'],
+            row['email'],
+            row['current_cgpa'] or 'N/A',
+            row['project_count'],
+            row['certificate_count'],
+            row['achievement_count'],
+            row['leetcode'],
+            row['mentor'] or 'N/A',
+            row['phone'] or 'N/A',
+            row['githublink'] or 'N/A',
+        ]
+        # Numeric columns are centred
+        ws.append([
+            (value, 'cell_center' if col > 7 else 'cell')
+            for col, value in enumerate(values, 1)
+        ])
+    return ws
+
+
+def generate_academic_performance_sheet(data):
+    """Generate academic performance analytics sheet"""
+    ws = SheetRows("Academic Performance")
+
+    # Department statistics, in order of first appearance
+    dept_stats = {}
+    for row in data.students:
+        stats = dept_stats.setdefault(row['dept'], {'count': 0, 'total_cgpa': 0, 'projects': 0, 'certificates': 0})
+        stats['count'] += 1
+        stats['total_cgpa'] += float(row['current_cgpa'] or 0)
+        stats['projects'] += row['project_count']
+        stats['certificates'] += row['certificate_count']
+
+    # Department-wise performance
+    ws.append([("Department-wise Academic Performance", 'title')])
+    ws.blank()
+    headers = ['Department', 'Student Count', 'Average CGPA', 'Projects/Student', 'Certificates/Student']
+    ws.append(headers, style='subheader')
+
+    for dept, stats in dept_stats.items():
+        ws.append([
+            dept,
+            stats['count'],
+            round(stats['total_cgpa'] / stats['count'], 2),
+            round(stats['projects'] / stats['count'], 1),
+            round(stats['certificates'] / stats['count'], 1),
+        ])
+    return ws
+
+
+def generate_projects_sheet(data):
+    """Generate projects analysis sheet"""
+    ws = SheetRows("Projects Analysis")
+
+    headers = [
+        'Project Title', 'Description', 'Status', 'Year/Semester', 'Contributors Count',
+        'Technologies', 'GitHub Link', 'Department'
+    ]
+    ws.append(headers, style='header_green')
+
+    for project in data.projects:
+        ws.append([
+            project['title'],
+            _truncate(project['description']),
+            project['status'],
+            project['year_and_sem'],
+            project['contributor_count'],
+            ', '.join(project['technologies']),
+            project['github_link'] or 'N/A',
+            ', '.join(project['departments']),
+        ])
+    return ws
+
+
+def generate_certifications_sheet(data):
+    """Generate certifications analysis sheet"""
+    ws = SheetRows("Certifications Analysis")
+
+    headers = [
+        'Student Roll No', 'Student Name', 'Certificate Title', 'Category',
+        'Source/Provider', 'Domain', 'Year/Semester', 'Validity Period'
+    ]
+    ws.append(headers, style='header_red')
+
+    categories = dict(Certificate.CATEGORY_CHOICES)
+    for cert in data.certificates:
+        ws.append([
+            cert['roll_no'] or 'N/A',
+            cert['name'] or 'N/A',
+            cert['title'],
+            categories.get(cert['category'], cert['category']),
+            cert['source'] or 'N/A',
+            cert['domain'] or 'N/A',
+            cert['year_and_sem'],
+            cert['validity_period'] or 'N/A',
+        ])
+
+    # If no certificates found
+    if not data.certificates:
+        ws.append(["No certificates found for selected students"])
+    return ws
+
+
+def generate_achievements_sheet(data):
+    """Generate achievements analysis sheet"""
+    ws = SheetRows("Achievements Analysis")
+
+    headers = [
+        'Student Roll No', 'Student Name', 'Achievement Title', 'Category',
+        'Description', 'Achievement Date', 'Status', 'Points Awarded',
+        'Verification Method'
+    ]
+    ws.append(headers, style='header_orange')
+
+    statuses = dict(Achievement.STATUS_CHOICES)
+    for achievement in data.achievements:
+        ws.append([
+            achievement['roll_no'],
+            achievement['name'],
+            achievement['title'],
+            achievement['category__name'] or 'N/A',
+            _truncate(achievement['description']),
+            _date(achievement['achievement_date']),
+            statuses.get(achievement['status'], achievement['status']),
+            achievement['points_awarded'] or 0,
+            achievement['verification_method'] or 'N/A',
+        ])
+    return ws
+
+
+def generate_placement_analytics_sheet(data):
+    """Generate placement analytics sheet"""
+    ws = SheetRows("Placement Analytics")
+
+    headers = [
+        'Student Roll No', 'Student Name', 'Company', 'Package (LPA)',
+        'Position', 'Placement Date', 'Department', 'Year'
+    ]
+    ws.append(headers, style='header_purple')
+
+    for offer in data.placements:
+        ws.append([
+            offer['roll_no'],
+            offer['name'],
+            offer['company'],
+            offer['package'],
+            offer['placement_type'] or 'N/A',
+            _date(offer['offer_date']),
+            offer['dept'],
+            offer['year'],
+        ])
+
+    # If no data, add message
+    if not data.placements:
+        ws.append(["No placement offers found for selected students"])
+    return ws
+
+
+def generate_skills_analytics_sheet(data):
+    """Generate skills and technology analytics sheet"""
+    ws = SheetRows("Skills Analytics")
+
+    # Technology statistics
+    ws.append([("Technology Usage Statistics", 'title')])
+    ws.blank()
+    ws.append(["Technology", "Usage Count"], style='bold')
+    for tech, count in data.technology_usage:
+        ws.append([tech, count])
+
+    # Domain statistics
+    ws.blank(2)
+    ws.append([("Certificate Domain Statistics", 'title')])
+    ws.blank()
+    ws.append(["Domain", "Certificate Count"], style='bold')
+    for domain, count in data.domain_usage:
+        ws.append([domain, count])
+    return ws
+
+
+def generate_naac_metrics_sheet(data):
+    """Generate NAAC-specific metrics sheet"""
+    ws = SheetRows("NAAC Metrics", widths=[35, 25])
+
+    total_students = len(data.students)
+
+    def share(key):
+        count = sum(1 for row in data.students if row[key])
+        return f"{count} ({(count / total_students * 100):.1f}%)" if total_students > 0 else "0"
+
+    def average(total):
+        return f"{(total / total_students if total_students > 0 else 0):.2f}"
+
+    total_projects = len(data.projects)
+    total_certificates = len(data.certificates)
+    total_achievements = len(data.achievements)
+
+    # Create metrics table
+    metrics = [
+        ["NAAC Key Performance Indicators", ""],
+        ["", ""],
+        ["Total Students", total_students],
+        ["Students with Projects", share('project_count')],
+        ["Students with Certificates", share('certificate_count')],
+        ["Students with Achievements", share('achievement_count')],
+        ["Students with Placements", share('placement_count')],
+        ["", ""],
+        ["Total Projects", total_projects],
+        ["Total Certificates", total_certificates],
+        ["Total Achievements", total_achievements],
+        ["", ""],
+        ["Average Projects per Student", average(total_projects)],
+        ["Average Certificates per Student", average(total_certificates)],
+        ["Average Achievements per Student", average(total_achievements)],
+    ]
+
+    for row, (metric, value) in enumerate(metrics, 1):
+        if row == 1:  # Title row
+            ws.append([(metric, 'report_title'), value])
+        elif metric and value != "":  # Data rows
+            ws.append([(metric, 'bold'), value])
+        else:
+            ws.append([metric, value])
+    return ws
+
+
+NAAC_SHEETS = [
+    ('student summary', generate_student_summary_sheet),
+    ('academic performance', generate_academic_performance_sheet),
+    ('projects', generate_projects_sheet),
+    ('certifications', generate_certifications_sheet),
+    ('achievements', generate_achievements_sheet),
+    ('placement analytics', generate_placement_analytics_sheet),
+    ('skills analytics', generate_skills_analytics_sheet),
+    ('NAAC metrics', generate_naac_metrics_sheet),
+]
+
+
+# Snapshot handed to each pool process once, so it is not pickled per sheet
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _build_sheet(index):
+    return NAAC_SHEETS[index][1](_worker_data)
+
+
+def naac_report_workers():
+    """Pool size for sheet computation in the report worker; NAAC_REPORT_WORKERS=0 sizes it to the CPUs"""
+    workers = settings.NAAC_REPORT_WORKERS or os.cpu_count() or 1
+    return min(workers, len(NAAC_SHEETS))
+
+
+def compute_naac_sheets(data, workers=1):
+    """
+    Yield (label, SheetRows) for every NAAC sheet, in NAAC_SHEETS order.
+
+    With more than one worker the sheets are computed concurrently while
+    the caller consumes them; a failing sheet is logged and yields None.
+    """
+    if workers <= 1:
+        for label, sheet_builder in NAAC_SHEETS:
+            try:
+                yield label, sheet_builder(data)
+            except Exception:
+                logging.exception(f"Error generating {label} sheet")
+                yield label, None
+        return
+
+    # Processes sidestep the GIL
+    with process_pool(workers, f'{__name__}._init_worker', (data,)) as pool:
+        futures = [pool.submit(_build_sheet, index) for index in range(len(NAAC_SHEETS))]
+        for (label, _), future in zip(NAAC_SHEETS, futures):
+            try:
+                yield label, future.result()
+            except Exception:
+                logging.exception(f"Error generating {label} sheet")
+                yield label, None
+
+
+def write_naac_workbook(data, workers=1, progress=None, start=0):
+    """Single writer: append the computed sheets to a write-only workbook in order"""
+    report = XlsxReport()
+    for done, (label, sheet_rows) in enumerate(compute_naac_sheets(data, workers), 1):
+        if sheet_rows is not None:
+            report.add_rows(sheet_rows)
+        if progress:
+            progress(start + (100 - start) * done // (len(NAAC_SHEETS) + 1))
+
+    # Ensure we have at least one sheet
+    if not report.sheets:
+        report.sheet("Error").append(["Error: No data could be generated"])
+    return report
+
+
+def build_naac_workbook(students_queryset, progress=None, workers=1):
+    """
+    Collect the NAAC data once, compute the sheets from it (concurrently with
+    more than one worker) and write them into a write-only workbook;
+    progress(percent) is called after each stage.
+    """
+    data = collect_naac_data(students_queryset)
+    start = 100 // (len(NAAC_SHEETS) + 1)
+    if progress:
+        progress(start)
+    return write_naac_workbook(data, workers, progress, start)
@@ -0,0 +1,146 @@
+"""
+NBA program-outcome assessment engine
+
+Pulls one row of feature counts per student - certificates, projects,
+research achievements, placements and so on - with a single annotated
+query (each count is a correlated subquery, so no joins multiply rows),
+loads it into a pandas DataFrame and evaluates every outcome as a vectorized
+comparison over the whole cohort.
+
+An outcome is a mapping of feature -> minimum; a student attains it by
+meeting any one of the minimums. The defaults in NBA_OUTCOME_CRITERIA can be
+overridden per outcome with settings.NBA_OUTCOME_THRESHOLDS or the
+`thresholds` argument, e.g. {'research_skills': {'research_achievements': 2}}.
+"""
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Achievement, Certificate, LeetCode, PlacementOffer, Projects
+
+
+NBA_OUTCOME_CRITERIA = {
+    'engineering_knowledge': {'technical_certificates': 2, 'total_projects': 3},
+    'problem_analysis': {'completed_projects': 2, 'research_achievements': 1},
+    'design_solutions': {'completed_projects': 1},
+    'research_skills': {'research_achievements': 1},
+    'modern_tools': {'project_technologies': 3, 'technical_certificates': 3},
+    'professional_ethics': {'approved_achievements': 1},
+    'communication': {'foreign_language_certificates': 1, 'co_curricular_certificates': 1},
+    'project_management': {'team_projects': 1},
+    'lifelong_learning': {'total_certificates': 3},
+}
+
+
+def _count(queryset, key, counted='pk', distinct=False):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(key)
+            .annotate(n=Count(counted, distinct=distinct)).values('n')[:1]
+        ),
+        0,
+    )
+
+
+def _feature_columns():
+    certificates = Certificate.objects.filter(rollno=OuterRef('pk'))
+    contributions = Projects.contributors.through.objects.filter(student=OuterRef('pk'))
+    achievements = Achievement.objects.filter(student=OuterRef('pk'), status='approved')
+    team_size = _count(Projects.contributors.through.objects.filter(projects=OuterRef('projects')), 'projects')
+    return {
+        'total_certificates': _count(certificates, 'rollno'),
+        'technical_certificates': _count(certificates.filter(category='technical'), 'rollno'),
+        'foreign_language_certificates': _count(certificates.filter(category='foreign_language'), 'rollno'),
+        'co_curricular_certificates': _count(certificates.filter(category='co_curricular'), 'rollno'),
+        'total_projects': _count(contributions, 'student'),
+        'completed_projects': _count(contributions.filter(projects__status='Completed'), 'student'),
+        'team_projects': _count(contributions.annotate(team_size=team_size).filter(team_size__gte=2), 'student'),
+        'project_technologies': _count(
+            Projects.technologies.through.objects.filter(projects__contributors=OuterRef('pk')),
+            'projects__contributors', counted='technology', distinct=True,
+        ),
+        'approved_achievements': _count(achievements, 'student'),
+        'research_achievements': _count(achievements.filter(category__name__icontains='research'), 'student'),
+        'placement_count': _count(PlacementOffer.objects.filter(student=OuterRef('pk')), 'student'),
+        'leetcode_problems': Coalesce(
+            Subquery(
+                LeetCode.objects.filter(rollno=OuterRef('pk'))
+                .order_by('-TotalProblems').values('TotalProblems')[:1]
+            ),
+            0,
+        ),
+    }
+
+
+NBA_FEATURES = tuple(_feature_columns())
+
+
+def outcome_features(students):
+    """DataFrame of NBA_FEATURES plus current_cgpa, one row per student, in one query"""
+    rows = students.order_by().annotate(**_feature_columns()).values_list('pk', 'current_cgpa', *NBA_FEATURES)
+    frame = pd.DataFrame.from_records(list(rows), columns=['id', 'current_cgpa', *NBA_FEATURES], index='id')
+    frame['current_cgpa'] = pd.to_numeric(frame['current_cgpa'], errors='coerce').astype(float)
+    return frame.astype({feature: 'int64' for feature in NBA_FEATURES})
+
+
+def nba_thresholds(overrides=None):
+    """NBA_OUTCOME_CRITERIA with settings.NBA_OUTCOME_THRESHOLDS and `overrides` applied per outcome"""
+    criteria = {
+        **NBA_OUTCOME_CRITERIA,
+        **getattr(settings, 'NBA_OUTCOME_THRESHOLDS', {}),
+        **(overrides or {}),
+    }
+    for outcome, minimums in criteria.items():
+        unknown = set(minimums) - set(NBA_FEATURES)
+        if not minimums or unknown:
+            raise ValueError(f'Invalid criteria for {outcome}: unknown features {sorted(unknown)}')
+    return criteria
+
+
+def attainment(frame, criteria):
+    """Boolean DataFrame: whether each student (row) attains each outcome (column)"""
+    attained = {}
+    for outcome, minimums in criteria.items():
+        values = frame[list(minimums)].to_numpy()
+        attained[outcome] = (values >= np.array(list(minimums.values()))).any(axis=1)
+    return pd.DataFrame(attained, index=frame.index)
+
+
+def _percent(mask):
+    return round(float(mask.mean()) * 100, 2) if len(mask) else 0.0
+
+
+def _mean(series):
+    return round(float(series.mean()), 2) if series.notna().any() else 0.0
+
+
+def assess_cohort(students, thresholds=None):
+    """Program-outcome attainment (% of students) and assessment summaries for a cohort"""
+    frame = outcome_features(students)
+    attained = attainment(frame, nba_thresholds(thresholds))
+
+    return {
+        'students': len(frame),
+        'program_outcomes': {outcome: _percent(attained[outcome]) for outcome in attained},
+        'assessment_data': {
+            'continuous_assessment': {
+                'avg_cgpa': _mean(frame['current_cgpa']),
+                'students_above_8_cgpa': int((frame['current_cgpa'] >= 8).sum()),
+                'avg_certificates': _mean(frame['total_certificates']),
+                'avg_leetcode_problems': _mean(frame['leetcode_problems']),
+            },
+            'project_assessment': {
+                'students_with_projects': int((frame['total_projects'] > 0).sum()),
+                'students_with_completed_projects': int((frame['completed_projects'] > 0).sum()),
+                'avg_projects': _mean(frame['total_projects']),
+                'team_project_rate': _percent(frame['team_projects'] > 0),
+            },
+            'industry_assessment': {
+                'students_placed': int((frame['placement_count'] > 0).sum()),
+                'placement_rate': _percent(frame['placement_count'] > 0),
+                'avg_offers': _mean(frame['placement_count']),
+            },
+        },
+    }
@@ -0,0 +1,89 @@
+"""
+Rendered portfolio cache
+
+A student's portfolio - the web page context and the PDF bytes - is stored
+on disk under PORTFOLIO_CACHE_ROOT/<student id>/<data version>/, using the
+per-student data version that signal handlers bump whenever the student's
+profile or records change (see dashboard_service). Unchanged portfolios
+are served straight from disk - the PDF as a file with the version as its
+ETag - and an edit makes the next request render afresh. Versions are
+shared by every process and only ever grow, so writing a version removes
+the student's lower ones and never another process's newer one; the whole
+cache is kept under PORTFOLIO_CACHE_MAX_BYTES by evicting least recently
+used entries.
+
+The PDF's verification code is derived from the data version, so a cached
+PDF stays valid; the page's generation time and verification code are
+added per request (portfolio_stamp) rather than cached with its context.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+
+from django.conf import settings
+
+from .dashboard_service import get_student_data_version
+from .report_cache import evict_lru
+
+
+# Renamed whenever the PDF or the context's layout changes, so older files are never read
+PDF_FILENAME = 'portfolio-v2.pdf'
+CONTEXT_FILENAME = 'context-v3.pickle'
+
+
+def portfolio_etag(student_obj):
+    return f'"portfolio-{student_obj.pk}-{get_student_data_version(student_obj.pk)}"'
+
+
+def _cached_file(student_id, filename, build):
+    """Path of a cached file of the student's current version, writing build() bytes on a miss"""
+    version = str(get_student_data_version(student_id))
+    student_dir = os.path.join(settings.PORTFOLIO_CACHE_ROOT, str(student_id))
+    directory = os.path.join(student_dir, version)
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        os.utime(directory)
+        return path
+
+    data = build()
+    os.makedirs(directory, exist_ok=True)
+    handle, staging = tempfile.mkstemp(dir=directory, prefix='.staging-')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(data)
+        os.replace(staging, path)
+    except BaseException:
+        os.unlink(staging)
+        raise
+
+    # Lower versions can never be requested again
+    for entry in os.listdir(student_dir):
+        if entry.isdigit() and int(entry) < int(version):
+            shutil.rmtree(os.path.join(student_dir, entry), ignore_errors=True)
+    evict_lru(settings.PORTFOLIO_CACHE_ROOT, settings.PORTFOLIO_CACHE_MAX_BYTES)
+    return path
+
+
+def cached_portfolio_pdf(student_obj, render):
+    """Path of the student's portfolio PDF, calling render() for the bytes on a miss"""
+    return _cached_file(student_obj.pk, PDF_FILENAME, render)
+
+
+def cached_portfolio_context(student_obj, build):
+    """The student's portfolio page context, calling build() on a miss; it must be picklable"""
+    built = []
+
+    def build_pickle():
+        built.append(build())
+        return pickle.dumps(built[0])
+
+    path = _cached_file(student_obj.pk, CONTEXT_FILENAME, build_pickle)
+    if built:
+        return built[0]
+    try:
+        with open(path, 'rb') as cached:
+            return pickle.load(cached)
+    except FileNotFoundError:
+        # Evicted between lookup and read
+        return build()
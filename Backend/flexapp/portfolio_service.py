@@ -0,0 +1,331 @@
+"""
+Portfolio service
+
+assemble_portfolio builds every section of a student's portfolio page from
+one load of their records, so its query count does not grow with them.
+
+Collects the data of any number of student portfolios with a fixed number
+of queries and renders each one as a reportlab PDF. Rendering is pure
+CPU work on plain dicts, so background jobs and the generate_portfolios
+command render batches - whole sections at placement time - in a pool of
+spawned processes (see process_pool) while a single writer packs the PDFs,
+in selection order, into a ZIP that is streamed as it is written. Batches
+requested from the web are queued as report jobs. At most a few PDFs per
+worker are in flight, so memory stays flat however large the selection.
+"""
+import hashlib
+import logging
+import os
+import zipfile
+from collections import Counter, deque
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .dashboard_service import get_student_data_version, get_student_data_versions
+from .models import AcademicPerformance, Achievement, Certificate, Projects, student
+from .process_pool import process_pool
+from .skills_service import domain_counts, technology_counts
+
+
+PORTFOLIO_STUDENT_FIELDS = ('pk', 'username', 'roll_no', 'first_name', 'last_name', 'dept', 'year', 'email', 'current_cgpa')
+
+# PDFs queued per worker before the writer waits for the oldest one
+_RENDER_WINDOW = 4
+
+
+def verification_code(username, data_version):
+    # Tied to the data the portfolio shows, so a cached copy keeps a valid code
+    data = f"{username}_{data_version}"
+    return hashlib.md5(data.encode()).hexdigest()[:8]
+
+
+def portfolio_stamp(student_obj, generated=None):
+    """
+    Generation time and verification code of a portfolio page rendered now;
+    kept out of the cached page context so they are never served stale.
+    """
+    return {
+        'generated_date': generated or timezone.now(),
+        'verification_code': verification_code(student_obj.username, get_student_data_version(student_obj.pk)),
+    }
+
+
+def portfolio_students(dept=None, year=None, section=None):
+    """Students of a dept/year/section selection, in roll number order"""
+    students = student.objects.filter(is_superuser=False)
+    if dept:
+        students = students.filter(dept=dept)
+    if year:
+        students = students.filter(year=year)
+    if section:
+        students = students.filter(section=section)
+    return students.order_by('roll_no')
+
+
+def collect_portfolio_data(students, generated=None):
+    """
+    Plain (picklable) portfolio dicts for `students`, in queryset order, in
+    four queries plus a lookup of their data versions for the verification
+    codes. `generated` is the time printed on the PDFs.
+    """
+    generated = generated or timezone.now()
+
+    latest_records = {}
+    records = (
+        AcademicPerformance.objects.filter(student__in=students)
+        .order_by('student_id', '-year', '-semester')
+        .values_list('student_id', 'cgpa')
+    )
+    for student_id, cgpa in records:
+        latest_records.setdefault(student_id, cgpa)
+
+    achievements = {
+        row.pop('student_id'): row
+        for row in Achievement.objects.filter(student__in=students, status='approved')
+        .values('student_id')
+        .annotate(total_achievements=Count('pk'), total_points=Sum('points_awarded'))
+        .order_by()
+    }
+    projects = {
+        row.pop('student_id'): row
+        for row in Projects.contributors.through.objects.filter(student__in=students)
+        .values('student_id')
+        .annotate(
+            total_projects=Count('projects_id', distinct=True),
+            completed_projects=Count('projects_id', distinct=True, filter=Q(projects__status='Completed')),
+        )
+        .order_by()
+    }
+
+    rows = list(students.values(*PORTFOLIO_STUDENT_FIELDS))
+    versions = get_student_data_versions([row['pk'] for row in rows])
+
+    portfolios = []
+    for row in rows:
+        student_id = row.pop('pk')
+        achievement_row = achievements.get(student_id, {})
+        project_row = projects.get(student_id, {})
+        portfolios.append({
+            **row,
+            'student_id': student_id,
+            'current_cgpa': latest_records[student_id] if student_id in latest_records else row['current_cgpa'],
+            'total_achievements': achievement_row.get('total_achievements', 0),
+            'total_points': achievement_row.get('total_points') or 0,
+            'total_projects': project_row.get('total_projects', 0),
+            'completed_projects': project_row.get('completed_projects', 0),
+            'generated_date': generated,
+            'verification_code': verification_code(row['username'], versions[student_id]),
+        })
+    return portfolios
+
+
+def _split_skills(text):
+    return [skill.strip() for skill in text.split(',')] if text else []
+
+
+def assemble_portfolio(student_obj):
+    """
+    Portfolio page sections of one student, in seven queries however many
+    records they have: the latest academic record, approved achievements
+    with their categories, projects with their technologies (two),
+    certificates, and the skills_service technology and domain rankings. The result holds model instances but no lazy relations,
+    so it pickles and renders without further queries. The generation time
+    and verification code come from portfolio_stamp().
+    """
+    latest_record = AcademicPerformance.objects.filter(student=student_obj).order_by('-year', '-semester').first()
+    achievements = list(
+        Achievement.objects.filter(student=student_obj, status='approved').select_related('category')
+    )
+    projects = list(Projects.objects.filter(contributors=student_obj).prefetch_related('technologies'))
+    certificates = list(Certificate.objects.filter(rollno=student_obj))
+
+    completed = [project for project in projects if project.status == 'Completed']
+    # Ranked as on the dashboard and in the NAAC report
+    technologies = [name for name, _ in technology_counts(student_obj)]
+    technical_domains = [name for name, _ in domain_counts(student_obj, category='technical')]
+
+    return {
+        'academic_summary': {
+            'current_cgpa': latest_record.cgpa if latest_record else student_obj.current_cgpa,
+            'total_credits': latest_record.total_credits if latest_record else student_obj.total_credits,
+            'current_year': student_obj.year,
+            'department': student_obj.dept,
+            'class_rank': latest_record.class_rank if latest_record else None,
+            'attendance': latest_record.attendance_percentage if latest_record else None,
+        },
+        'achievement_summary': {
+            'total_achievements': len(achievements),
+            'total_points': sum(achievement.points_awarded or 0 for achievement in achievements),
+            'categories': dict(sorted(Counter(achievement.category.name for achievement in achievements).items())),
+            'recent_achievements': sorted(achievements, key=lambda a: a.achievement_date, reverse=True)[:5],
+        },
+        'project_highlights': {
+            'total_projects': len(projects),
+            'completed_projects': len(completed),
+            'technologies_used': technologies,
+            'featured_projects': sorted(completed, key=lambda project: project.pk, reverse=True)[:3],
+        },
+        'skill_matrix': {
+            'technical': technical_domains + _split_skills(student_obj.technical_skills),
+            'programming': technologies,
+            'certifications': [],
+            'soft_skills': _split_skills(student_obj.soft_skills),
+        },
+        'certification_summary': {
+            'total_certificates': len(certificates),
+            'by_category': dict(Counter(cert.category for cert in certificates).most_common()),
+            'recent_certifications': sorted(certificates, key=lambda cert: cert.uploaded_at, reverse=True)[:5],
+            'top_providers': dict(Counter(cert.source for cert in certificates).most_common()),
+        },
+    }
+
+
+def portfolio_filename(portfolio):
+    return f"portfolio_{portfolio['username']}.pdf"
+
+
+def render_portfolio_pdf(portfolio):
+    """PDF bytes of one portfolio dict from collect_portfolio_data"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+    styles = getSampleStyleSheet()
+    story = []
+    name = f"{portfolio['first_name']} {portfolio['last_name']}"
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=1,  # Center alignment
+        textColor=colors.HexColor('#2E86AB')
+    )
+    story.append(Paragraph(f"Academic Portfolio - {name}", title_style))
+    story.append(Spacer(1, 12))
+
+    # Student Information
+    student_info = [
+        ['Name:', name],
+        ['Roll Number:', portfolio['roll_no']],
+        ['Department:', portfolio['dept']],
+        ['Year:', str(portfolio['year'])],
+        ['Email:', portfolio['email']],
+        ['Current CGPA:', str(portfolio['current_cgpa'] or 'N/A')],
+    ]
+
+    student_table = Table(student_info, colWidths=[2*inch, 3*inch])
+    student_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    story.append(student_table)
+    story.append(Spacer(1, 20))
+
+    # Achievement Summary
+    story.append(Paragraph("Achievement Summary", styles['Heading2']))
+    story.append(Paragraph(f"Total Achievements: {portfolio['total_achievements']}", styles['Normal']))
+    story.append(Paragraph(f"Total Points Earned: {portfolio['total_points']}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Project Summary
+    story.append(Paragraph("Project Portfolio", styles['Heading2']))
+    story.append(Paragraph(f"Total Projects: {portfolio['total_projects']}", styles['Normal']))
+    story.append(Paragraph(f"Completed Projects: {portfolio['completed_projects']}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Verification
+    story.append(Spacer(1, 20))
+    story.append(Paragraph(f"Verification Code: {portfolio['verification_code']}", styles['Normal']))
+    story.append(Paragraph(f"Generated on: {portfolio['generated_date'].strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def portfolio_workers():
+    """Pool size for PDF rendering off the request path; PORTFOLIO_PDF_WORKERS=0 sizes it to the CPUs"""
+    return settings.PORTFOLIO_PDF_WORKERS or os.cpu_count() or 1
+
+
+def _rendered(portfolio, render):
+    try:
+        return render()
+    except Exception:
+        logging.exception(f"Error rendering portfolio of {portfolio['username']}")
+        return None
+
+
+def render_portfolios(portfolios, workers=1):
+    """
+    Yield (portfolio, PDF bytes) in input order, rendering up to `workers`
+    PDFs at once; a portfolio that fails to render is logged and yields None.
+    """
+    if workers <= 1:
+        for portfolio in portfolios:
+            yield portfolio, _rendered(portfolio, lambda: render_portfolio_pdf(portfolio))
+        return
+
+    # Processes sidestep the GIL
+    with process_pool(workers) as pool:
+        pending = deque()
+        for portfolio in portfolios:
+            pending.append((portfolio, pool.submit(render_portfolio_pdf, portfolio)))
+            if len(pending) >= workers * _RENDER_WINDOW:
+                done, future = pending.popleft()
+                yield done, _rendered(done, future.result)
+        while pending:
+            done, future = pending.popleft()
+            yield done, _rendered(done, future.result)
+
+
+class _ZipChunks:
+    """Write-only, unseekable sink for zipfile; drain() hands back what was written"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_portfolio_zip(portfolios, workers=1, progress=None):
+    """Yield a ZIP of the portfolios' PDFs chunk by chunk, one chunk per PDF"""
+    sink = _ZipChunks()
+    total = len(portfolios)
+    # PDF streams are already compressed
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for done, (portfolio, pdf) in enumerate(render_portfolios(portfolios, workers), 1):
+            if pdf is not None:
+                info = zipfile.ZipInfo(portfolio_filename(portfolio), portfolio['generated_date'].timetuple()[:6])
+                archive.writestr(info, pdf)
+                yield sink.drain()
+            if progress:
+                progress(done * 100 / total)
+    yield sink.drain()
@@ -0,0 +1,36 @@
+"""
+Process pools for report rendering
+
+The report worker runs jobs on threads and holds open database
+connections, so its pools spawn fresh interpreters rather than fork it: a
+forked child could inherit a lock held by another thread, or share the
+parent's connection. A spawned process sets up Django before it loads
+anything from the app, which is also why this module imports nothing from
+it.
+"""
+import importlib
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+
+def _init_process(initializer, payload):
+    django.setup()
+    if initializer:
+        module, name = initializer.rsplit('.', 1)
+        getattr(importlib.import_module(module), name)(*pickle.loads(payload))
+
+
+def process_pool(workers, initializer=None, initargs=()):
+    """
+    ProcessPoolExecutor of `workers` spawned processes with Django set up.
+    `initializer` is the dotted path of a function each process calls with
+    `initargs`; they are pickled here and only loaded after setup, so they
+    may hold app objects.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_process, initargs=(initializer, pickle.dumps(initargs)),
+    )
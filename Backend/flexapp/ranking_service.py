@@ -0,0 +1,117 @@
+"""
+Cohort ranking service
+
+Ranks a student against their dept/year cohort. The whole cohort's
+certificate, project and approved-achievement counts are loaded with one
+grouped query per metric, sorted, and cached under a per-cohort version
+stamp. A percentile lookup is then a bisect over the cached array.
+Signal handlers bump the version, kept in the database (see data_versions),
+whenever a cohort member's data changes.
+"""
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .data_versions import bump_version, get_version
+from .models import Achievement, Certificate, Projects, student
+
+
+RANKING_METRICS = ('certificates', 'projects', 'achievements')
+RANKING_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+def _version_key(dept, year):
+    return f"cohort:{dept}:{year}"
+
+
+def get_cohort_version(dept, year):
+    return get_version(_version_key(dept, year))
+
+
+def bump_cohort_version(dept, year):
+    bump_version(_version_key(dept, year))
+
+
+def bump_cohort_version_for_student(student_id):
+    """Invalidate the cached rankings of the cohort a student belongs to"""
+    if not student_id:
+        return
+    cohort = student.objects.filter(pk=student_id).values_list('dept', 'year').first()
+    if cohort:
+        bump_cohort_version(*cohort)
+
+
+def _grouped_counts(queryset, key):
+    return dict(queryset.values(key).annotate(n=Count('pk')).values_list(key, 'n'))
+
+
+def build_cohort_arrays(dept, year):
+    """Return {metric: sorted list of per-student counts} for a dept/year cohort"""
+    peer_ids = list(student.objects.filter(dept=dept, year=year).values_list('pk', flat=True))
+
+    counts = {
+        'certificates': _grouped_counts(
+            Certificate.objects.filter(rollno__dept=dept, rollno__year=year), 'rollno_id'
+        ),
+        'projects': _grouped_counts(
+            Projects.contributors.through.objects.filter(student__dept=dept, student__year=year),
+            'student_id'
+        ),
+        'achievements': _grouped_counts(
+            Achievement.objects.filter(student__dept=dept, student__year=year, status='approved'),
+            'student_id'
+        ),
+    }
+
+    return {
+        metric: sorted(counts[metric].get(peer_id, 0) for peer_id in peer_ids)
+        for metric in RANKING_METRICS
+    }
+
+
+class CohortRanking:
+    """Percentile lookups against one dept/year cohort"""
+
+    def __init__(self, dept, year):
+        self.dept = dept
+        self.year = year
+        self._arrays = None
+
+    @property
+    def arrays(self):
+        if self._arrays is None:
+            version = get_cohort_version(self.dept, self.year)
+            key = f"cohort_ranking:arrays:{self.dept}:{self.year}:{version}"
+            self._arrays = cache.get(key)
+            if self._arrays is None:
+                self._arrays = build_cohort_arrays(self.dept, self.year)
+                cache.set(key, self._arrays, RANKING_CACHE_TIMEOUT)
+        return self._arrays
+
+    @property
+    def size(self):
+        return len(self.arrays['certificates'])
+
+    def percentile(self, metric, value):
+        """Share of the cohort with a strictly lower count, as an int 0-100"""
+        values = self.arrays[metric]
+        if not values:
+            return 50
+        return int(bisect_left(values, value) / len(values) * 100)
+
+
+def get_cohort_ranking(student_obj, metric_values):
+    """
+    Build the comparative ranking block for a student.
+
+    metric_values maps each of RANKING_METRICS to the student's own count.
+    """
+    ranking = CohortRanking(student_obj.dept, student_obj.year)
+    return {
+        metric: {
+            'student': metric_values[metric],
+            'percentile': ranking.percentile(metric, metric_values[metric]),
+        }
+        for metric in RANKING_METRICS
+    }
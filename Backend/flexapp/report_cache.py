@@ -0,0 +1,161 @@
+"""
+Content-addressed cache for generated reports
+
+A generated report file is stored on disk under the SHA-256 of (report
+type, normalized student selection, parameters, report data version).
+Signal handlers bump the data version whenever a student or any record that
+feeds a report changes, so an unchanged request is served straight from
+disk and a changed one can never match a stale entry; old entries are
+simply never asked for again and age out. The version is a shared stamp in
+the database (see data_versions), so the web processes and the report
+worker agree on it, and it only moves once the change has committed.
+
+Entries are evicted least recently used first once the cache grows past
+REPORT_CACHE_MAX_BYTES; a hit refreshes the entry's mtime.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse
+
+from .data_versions import bump_version, get_version
+from .report_jobs import write_response
+
+
+_VERSION_KEY = 'reports'
+
+
+def get_report_data_version():
+    return get_version(_VERSION_KEY)
+
+
+def bump_report_data_version():
+    """Invalidate every cached report, once the transaction commits"""
+    bump_version(_VERSION_KEY)
+
+
+def normalize_selection(roll_numbers):
+    """A selection of roll numbers in canonical form; None or empty means everyone"""
+    if not roll_numbers:
+        return None
+    return sorted({str(roll_no).strip() for roll_no in roll_numbers})
+
+
+def report_cache_key(report_type, selection=None, params=None):
+    raw = json.dumps(
+        [report_type, normalize_selection(selection), params or {}, get_report_data_version()],
+        sort_keys=True, cls=DjangoJSONEncoder,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _entry_dir(key):
+    return os.path.join(settings.REPORT_CACHE_ROOT, key[:2], key)
+
+
+def cached_report(key):
+    """(path, filename) of a cached report, marking it recently used, or None"""
+    directory = _entry_dir(key)
+    try:
+        filename = os.listdir(directory)[0]
+        os.utime(directory)
+    except (FileNotFoundError, IndexError):
+        return None
+    return os.path.join(directory, filename), filename
+
+
+def store_report(key, response):
+    """Write a report response into the cache and return (path, filename)"""
+    os.makedirs(os.path.dirname(_entry_dir(key)), exist_ok=True)
+    staging = tempfile.mkdtemp(dir=settings.REPORT_CACHE_ROOT, prefix='.staging-')
+    try:
+        _, filename = write_response(response, staging)
+        # Publish atomically; a concurrent build of the same key keeps the first copy
+        os.rename(staging, _entry_dir(key))
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if cached_report(key) is None:
+            raise
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    evict_reports()
+    return cached_report(key)
+
+
+def _entries(root):
+    for prefix in os.listdir(root):
+        if prefix.startswith('.'):
+            continue
+        for key in os.listdir(os.path.join(root, prefix)):
+            directory = os.path.join(root, prefix, key)
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(directory))
+                yield os.stat(directory).st_mtime, size, directory
+            except FileNotFoundError:
+                continue
+
+
+def evict_lru(root, max_bytes):
+    """
+    Delete least recently used entries of a <root>/<prefix>/<entry>/ file
+    cache until it fits in max_bytes; an entry's mtime is its last use
+    """
+    if not os.path.isdir(root):
+        return 0
+    entries = sorted(_entries(root))
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, directory in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+        evicted += 1
+    return evicted
+
+
+def evict_reports(max_bytes=None):
+    """Delete least recently used reports until the cache fits in max_bytes"""
+    max_bytes = settings.REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    return evict_lru(settings.REPORT_CACHE_ROOT, max_bytes)
+
+
+def cached_report_response(report_type, selection, params, build):
+    """
+    Serve a report from the cache, calling build() for the HttpResponse and
+    caching its content on a miss. Error responses are passed through
+    uncached; X-Report-Cache tells whether the file came from the cache.
+    """
+    key = report_cache_key(report_type, selection, params)
+    entry = cached_report(key)
+    status = 'hit'
+    if entry is None:
+        status = 'miss'
+        response = build()
+        if response.status_code >= 400:
+            return response
+        try:
+            entry = store_report(key, response)
+        except OSError:
+            # The cache is an optimization; an unwritable disk must not break the report
+            logging.exception(f"Could not cache {report_type} report")
+            return build()
+        if entry is None:
+            # Larger than the whole cache, so evicted straight away
+            return build()
+
+    path, filename = entry
+    try:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+    except FileNotFoundError:
+        # Evicted between lookup and open
+        return build()
+    response['X-Report-Cache'] = status
+    return response
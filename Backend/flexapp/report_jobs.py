@@ -0,0 +1,173 @@
+"""
+Background report jobs
+
+Heavy reports (NAAC workbooks, compliance data, bulk exports) are queued as
+ReportJob rows and built by the `run_report_worker` management command, so
+they neither hold a web worker for minutes nor run into proxy timeouts.
+
+A report type maps to a builder, `builder(params, progress)`, which returns
+the same HttpResponse the interactive view would send; the worker writes
+its content under REPORT_JOB_ROOT. Workers claim queued jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so several of them can share the queue,
+and each runs at most REPORT_JOB_CONCURRENCY jobs at a time.
+
+A worker refreshes heartbeat_at on its running jobs every poll. Jobs left
+running by a worker that was killed stop getting heartbeats, and the next
+worker to poll puts them back in the queue (see requeue_stale_jobs).
+"""
+import logging
+import os
+import re
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ReportJob
+
+
+# Report type -> dotted path of its builder
+REPORT_BUILDERS = {
+    'naac_workbook': 'flexapp.views.naac_workbook_job',
+    'compliance': 'flexapp.views.compliance_job',
+    'export': 'flexapp.views.export_job',
+    'portfolios': 'flexapp.views.portfolios_job',
+}
+
+_FILENAME = re.compile(r'filename="?([^";]+)"?')
+
+
+def job_owner(user):
+    """Owner key of a user; faculty and students have separate primary keys"""
+    return f"{user._meta.model_name}:{user.pk}"
+
+
+def can_access_job(user, job):
+    return user.is_superuser or job.owner == job_owner(user)
+
+
+def submit_job(report_type, params, user):
+    if report_type not in REPORT_BUILDERS:
+        raise ValueError(f'Unknown report type: {report_type}')
+    return ReportJob.objects.create(report_type=report_type, params=params or {}, owner=job_owner(user))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_job(worker):
+    """Mark the oldest queued job as running and return it, or None"""
+    with transaction.atomic():
+        job = (
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(status='queued')
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        # Guarded update: backends without row locks (SQLite) still hand a job out once
+        now = timezone.now()
+        claimed = ReportJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', worker=worker, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def send_heartbeat(worker):
+    """Mark every job `worker` is running as still alive"""
+    ReportJob.objects.filter(status='running', worker=worker).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale_jobs():
+    """
+    Requeue running jobs whose worker stopped sending heartbeats, failing
+    those already claimed REPORT_JOB_MAX_ATTEMPTS times. Returns
+    (requeued, failed) counts.
+    """
+    now = timezone.now()
+    stale = ReportJob.objects.filter(status='running').filter(
+        Q(heartbeat_at__lt=now - timedelta(seconds=settings.REPORT_JOB_STALE_AFTER))
+        | Q(heartbeat_at__isnull=True)
+    )
+    failed = stale.filter(attempts__gte=settings.REPORT_JOB_MAX_ATTEMPTS).update(
+        status='failed', error='The report worker stopped responding', finished_at=now
+    )
+    requeued = stale.update(status='queued', worker='', progress=0, started_at=None, heartbeat_at=None)
+    if requeued or failed:
+        logging.warning(f"Requeued {requeued} and failed {failed} report job(s) abandoned by their worker")
+    return requeued, failed
+
+
+def _progress_callback(job):
+    last = [job.progress]
+
+    def progress(percent):
+        percent = max(0, min(int(percent), 99))
+        if percent != last[0]:
+            last[0] = percent
+            ReportJob.objects.filter(pk=job.pk).update(progress=percent)
+
+    return progress
+
+
+def write_response(response, directory):
+    """Write a builder's response to `directory`, returning (path, filename)"""
+    if response.status_code >= 400:
+        raise RuntimeError(f'Report builder returned HTTP {response.status_code}')
+    match = _FILENAME.search(response.get('Content-Disposition', ''))
+    filename = os.path.basename(match.group(1)) if match else 'report'
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    try:
+        with open(path, 'wb') as output:
+            if response.streaming:
+                for chunk in response.streaming_content:
+                    output.write(chunk)
+            else:
+                output.write(response.content)
+    finally:
+        response.close()
+    return path, filename
+
+
+def run_job(job):
+    """Build a claimed job's report and record the outcome on the row"""
+    # A job requeued while this worker looked dead belongs to whoever claimed it next
+    claimed = ReportJob.objects.filter(pk=job.pk, status='running', worker=job.worker)
+    try:
+        builder = import_string(REPORT_BUILDERS[job.report_type])
+        response = builder(job.params, _progress_callback(job))
+        path, filename = write_response(response, os.path.join(settings.REPORT_JOB_ROOT, str(job.pk)))
+    except Exception as e:
+        logging.exception(f"Report job {job.pk} failed")
+        claimed.update(status='failed', error=str(e), finished_at=timezone.now())
+        return False
+
+    claimed.update(
+        status='completed', progress=100, output_path=path, filename=filename, finished_at=timezone.now()
+    )
+    return True
+
+
+def job_status(job):
+    return {
+        'id': job.pk,
+        'report_type': job.report_type,
+        'status': job.status,
+        'progress': job.progress,
+        'filename': job.filename,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
@@ -0,0 +1,322 @@
+"""
+Model signal handlers that keep derived data in sync with its sources
+"""
+from django.db.models import DEFERRED
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .models import (
+    AcademicPerformance, Achievement, AchievementCategory, ApprovalWorkflow, Certificate, ExportTombstone,
+    Faculty, LeetCode, PlacementOffer, Projects, Technology, student
+)
+from .compliance_service import mark_compliance_stale, student_compliance_changed
+from .dashboard_service import bump_student_data_version
+from .delta_export import touch_exported_rows
+from .facet_index import refresh_student_facets
+from .metrics_service import (
+    create_student_metrics, refresh_student_metrics, sync_profile_completion
+)
+from .ranking_service import bump_cohort_version, bump_cohort_version_for_student
+from .report_cache import bump_report_data_version
+
+
+# Values each handler compares on save, snapshotted when an instance is loaded
+ACHIEVEMENT_SNAPSHOTS = {'_loaded_compliance': ('status', 'category_id')}
+STUDENT_SNAPSHOTS = {
+    '_loaded_cohort': ('dept', 'year'),
+    '_loaded_facets': ('dept', 'year', 'section', 'mentor_id'),
+    '_loaded_export_names': ('username', 'first_name', 'roll_no'),
+    '_loaded_compliance': ('admission_year', 'dept', 'current_cgpa', 'graduation_status'),
+}
+CATEGORY_SNAPSHOTS = {'_loaded_name': ('name',)}
+
+
+def take_snapshots(instance, snapshots):
+    # Reading a deferred field here would load it through another instance,
+    # whose post_init would do the same; such fields are DEFERRED instead
+    for name, fields in snapshots.items():
+        setattr(instance, name, tuple(instance.__dict__.get(field, DEFERRED) for field in fields))
+
+
+def resolve_snapshots(sender, instance, snapshots):
+    """Replace DEFERRED snapshot values with the stored ones, in one query"""
+    if instance._state.adding or instance.pk is None:
+        return
+    missing = {
+        field
+        for name, fields in snapshots.items()
+        for field, value in zip(fields, getattr(instance, name))
+        if value is DEFERRED
+    }
+    if not missing:
+        return
+    stored = sender._base_manager.filter(pk=instance.pk).values(*missing).first() or {}
+    for name, fields in snapshots.items():
+        loaded = getattr(instance, name)
+        setattr(instance, name, tuple(
+            stored.get(field) if value is DEFERRED else value for field, value in zip(fields, loaded)
+        ))
+
+
+def student_data_changed(student_id, *metric_groups, ranked=False):
+    """Refresh everything derived from one student's records"""
+    if metric_groups:
+        refresh_student_metrics(student_id, *metric_groups)
+    if {'certificates', 'projects'} & set(metric_groups):
+        refresh_student_facets(student_id)
+    bump_student_data_version(student_id)
+    bump_report_data_version()
+    if ranked:
+        bump_cohort_version_for_student(student_id)
+
+
+@receiver([post_save, post_delete], sender=Certificate)
+def certificate_changed(sender, instance, created=True, **kwargs):
+    student_data_changed(instance.rollno_id, 'certificates', ranked=True)
+    # Compliance counts certificates, not their details; deletes come without `created`
+    if created:
+        student_compliance_changed(instance.rollno_id)
+
+
+@receiver(post_init, sender=Achievement)
+def achievement_loaded(sender, instance, **kwargs):
+    take_snapshots(instance, ACHIEVEMENT_SNAPSHOTS)
+
+
+@receiver(pre_save, sender=Achievement)
+def achievement_saving(sender, instance, **kwargs):
+    resolve_snapshots(sender, instance, ACHIEVEMENT_SNAPSHOTS)
+
+
+@receiver([post_save, post_delete], sender=Achievement)
+def achievement_changed(sender, instance, created=True, **kwargs):
+    student_data_changed(instance.student_id, 'achievements', ranked=True)
+    # Compliance counts approved achievements and events by category
+    compliance = (instance.status, instance.category_id)
+    if created or compliance != instance._loaded_compliance:
+        student_compliance_changed(instance.student_id)
+    instance._loaded_compliance = compliance
+
+
+@receiver([post_save, post_delete], sender=PlacementOffer)
+def placement_offer_changed(sender, instance, created=True, **kwargs):
+    student_data_changed(instance.student_id, 'placements')
+    # Compliance counts placed students, not offer details
+    if created:
+        student_compliance_changed(instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=ApprovalWorkflow)
+def approval_workflow_changed(sender, instance, **kwargs):
+    student_data_changed(instance.student_id, 'approvals')
+
+
+@receiver([post_save, post_delete], sender=LeetCode)
+def leetcode_changed(sender, instance, **kwargs):
+    student_data_changed(instance.rollno_id)
+
+
+@receiver([post_save, post_delete], sender=AcademicPerformance)
+def academic_record_changed(sender, instance, **kwargs):
+    student_data_changed(instance.student_id)
+
+
+@receiver(m2m_changed, sender=Projects.contributors.through)
+def project_contributors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # pk_set is not provided on clear, so remember who is being removed
+        if reverse:
+            instance._metrics_student_ids = [instance.pk]
+            instance._export_project_ids = list(instance.projects.values_list('pk', flat=True))
+        else:
+            instance._metrics_student_ids = list(instance.contributors.values_list('pk', flat=True))
+        return
+
+    if action in ('post_add', 'post_remove'):
+        student_ids = [instance.pk] if reverse else list(pk_set or [])
+        project_ids = list(pk_set or []) if reverse else [instance.pk]
+    elif action == 'post_clear':
+        student_ids = getattr(instance, '_metrics_student_ids', [])
+        project_ids = getattr(instance, '_export_project_ids', []) if reverse else [instance.pk]
+    else:
+        return
+
+    touch_exported_rows(Projects.objects.filter(pk__in=project_ids))
+    for student_id in student_ids:
+        student_data_changed(student_id, 'projects', ranked=True)
+        student_compliance_changed(student_id)
+
+
+@receiver(m2m_changed, sender=Projects.technologies.through)
+def project_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    through = Projects.contributors.through.objects
+    if action == 'pre_clear' and reverse:
+        # Clearing a technology: pk_set is not provided, so remember its projects' contributors
+        instance._metrics_student_ids = set(
+            through.filter(projects__technologies=instance).values_list('student_id', flat=True)
+        )
+        instance._export_project_ids = list(instance.projects.values_list('pk', flat=True))
+        return
+
+    if action in ('post_add', 'post_remove'):
+        contributors = through.filter(projects__in=pk_set) if reverse else through.filter(projects=instance)
+        student_ids = set(contributors.values_list('student_id', flat=True))
+        project_ids = list(pk_set or []) if reverse else [instance.pk]
+    elif action == 'post_clear':
+        student_ids = (
+            getattr(instance, '_metrics_student_ids', set()) if reverse
+            else set(through.filter(projects=instance).values_list('student_id', flat=True))
+        )
+        project_ids = getattr(instance, '_export_project_ids', []) if reverse else [instance.pk]
+    else:
+        return
+
+    touch_exported_rows(Projects.objects.filter(pk__in=project_ids))
+    for student_id in student_ids:
+        student_data_changed(student_id)
+        refresh_student_facets(student_id)
+
+
+@receiver(post_save, sender=Projects)
+def project_changed(sender, instance, created, **kwargs):
+    # A new project has no contributors yet; m2m_changed covers them
+    if created:
+        return
+    for student_id in instance.contributors.values_list('pk', flat=True):
+        student_data_changed(student_id, 'projects')
+
+
+@receiver(pre_delete, sender=Projects)
+def project_pre_delete(sender, instance, **kwargs):
+    instance._metrics_student_ids = list(instance.contributors.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Projects)
+def project_post_delete(sender, instance, **kwargs):
+    for student_id in getattr(instance, '_metrics_student_ids', []):
+        student_data_changed(student_id, 'projects', ranked=True)
+        student_compliance_changed(student_id)
+
+
+@receiver(post_delete, sender=Achievement)
+@receiver(post_delete, sender=Certificate)
+@receiver(post_delete, sender=PlacementOffer)
+@receiver(post_delete, sender=Projects)
+def export_row_deleted(sender, instance, **kwargs):
+    # Lets `?since=` exports report the deletion
+    ExportTombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk)
+
+
+@receiver(post_init, sender=student)
+def student_loaded(sender, instance, **kwargs):
+    take_snapshots(instance, STUDENT_SNAPSHOTS)
+
+
+@receiver(pre_save, sender=student)
+def student_saving(sender, instance, update_fields=None, **kwargs):
+    resolve_snapshots(sender, instance, STUDENT_SNAPSHOTS)
+    # Completion is only ever computed here, when the profile is written;
+    # student.save() adds it to update_fields whenever a counted field is saved
+    if update_fields and 'profile_completion_percentage' not in update_fields:
+        return
+    instance.calculate_profile_completion()
+
+
+@receiver(post_save, sender=student)
+def student_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Login only touches last_login; nothing derived depends on it
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    if created:
+        create_student_metrics(instance)
+    else:
+        sync_profile_completion(instance)
+    # Profile fields appear in the cached dashboard and portfolio
+    bump_student_data_version(instance.pk)
+
+    # Incremental exports of the student's records print these names
+    export_names = (instance.username, instance.first_name, instance.roll_no)
+    if not created and export_names != getattr(instance, '_loaded_export_names', export_names):
+        touch_exported_rows(Achievement.objects.filter(student=instance))
+        touch_exported_rows(Certificate.objects.filter(rollno=instance))
+        touch_exported_rows(PlacementOffer.objects.filter(student=instance))
+    instance._loaded_export_names = export_names
+    bump_report_data_version()
+
+    # Rankings only change when cohort membership does
+    cohort = (instance.dept, instance.year)
+    loaded_cohort = getattr(instance, '_loaded_cohort', None)
+    if created or cohort != loaded_cohort:
+        bump_cohort_version(*cohort)
+        if loaded_cohort and not created:
+            bump_cohort_version(*loaded_cohort)
+    instance._loaded_cohort = cohort
+
+    # The faculty facet index only tracks dept, year, section and mentor
+    facets = (instance.dept, instance.year, instance.section, instance.mentor_id)
+    if created or facets != getattr(instance, '_loaded_facets', None):
+        refresh_student_facets(instance.pk)
+    instance._loaded_facets = facets
+
+    # Scope, CGPA and graduation status feed the compliance snapshot of the student's scope
+    compliance = (instance.admission_year, instance.dept, instance.current_cgpa, instance.graduation_status)
+    loaded = getattr(instance, '_loaded_compliance', None)
+    if created or compliance != loaded:
+        mark_compliance_stale(*compliance[:2])
+        if loaded and not created and loaded[:2] != compliance[:2]:
+            mark_compliance_stale(*loaded[:2])
+    instance._loaded_compliance = compliance
+
+
+@receiver(pre_delete, sender=student)
+def student_deleting(sender, instance, **kwargs):
+    # Deferred fields can no longer be loaded once the row is gone
+    resolve_snapshots(sender, instance, STUDENT_SNAPSHOTS)
+
+
+@receiver(post_delete, sender=student)
+def student_deleted(sender, instance, **kwargs):
+    bump_cohort_version(*instance._loaded_cohort)
+    refresh_student_facets(instance.pk)
+    bump_report_data_version()
+    mark_compliance_stale(*instance._loaded_compliance[:2])
+
+
+@receiver([post_save, post_delete], sender=Technology)
+@receiver([post_save, post_delete], sender=AchievementCategory)
+def report_lookup_changed(sender, **kwargs):
+    # Reports print technology and category names
+    bump_report_data_version()
+
+
+@receiver(post_init, sender=AchievementCategory)
+def achievement_category_loaded(sender, instance, **kwargs):
+    take_snapshots(instance, CATEGORY_SNAPSHOTS)
+
+
+@receiver(pre_save, sender=AchievementCategory)
+def achievement_category_saving(sender, instance, **kwargs):
+    resolve_snapshots(sender, instance, CATEGORY_SNAPSHOTS)
+
+
+@receiver(post_save, sender=AchievementCategory)
+def achievement_category_saved(sender, instance, created, **kwargs):
+    if not created and (instance.name,) != instance._loaded_name:
+        achievements = Achievement.objects.filter(category=instance)
+        # Incremental achievement exports print the category name
+        touch_exported_rows(achievements)
+        # Compliance classifies events by category name
+        scopes = achievements.values_list('student__admission_year', 'student__dept').distinct()
+        for scope in scopes.order_by():
+            mark_compliance_stale(*scope)
+    instance._loaded_name = (instance.name,)
+
+
+@receiver([post_save, post_delete], sender=Faculty)
+def faculty_changed(sender, update_fields=None, **kwargs):
+    # NAAC sheets print mentor names; logins do not change them
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_report_data_version()
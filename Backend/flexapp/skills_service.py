@@ -0,0 +1,58 @@
+"""
+Skills aggregation service
+
+Ranks the technologies students used in their projects and the domains of
+their certificates. Each ranking is one grouped query over Technology or
+Certificate.domain, for a single student or any set of students (see activity_service for accepted scopes).
+
+Technology counts are per project: a project counts once for each of its
+technologies however many of its contributors are in scope.
+"""
+from django.db.models import Count
+
+from .activity_service import scope_filter
+from .models import Certificate, Technology
+
+
+def technology_counts(scope=None, limit=None):
+    """[(technology name, count)] ranked by usage, most used first"""
+    # One filter() so the scope and the count share a single join through the contributors
+    contributors = scope_filter('projects__contributors', scope) or {'projects__contributors__isnull': False}
+    rows = (
+        Technology.objects.filter(**contributors)
+        .annotate(count=Count('projects', distinct=True))
+        .order_by('-count', 'name')
+        .values_list('name', 'count')
+    )
+    return list(rows[:limit] if limit else rows)
+
+
+def domain_counts(scope=None, category=None, limit=None):
+    """[(certificate domain, count)] ranked by certificate count"""
+    certificates = (
+        Certificate.objects.filter(**scope_filter('rollno', scope))
+        .exclude(domain__isnull=True)
+        .exclude(domain='')
+    )
+    if category:
+        certificates = certificates.filter(category=category)
+    rows = (
+        certificates
+        .values('domain')
+        .annotate(count=Count('pk'))
+        .order_by('-count', 'domain')
+        .values_list('domain', 'count')
+    )
+    return list(rows[:limit] if limit else rows)
+
+
+def skill_distribution(scope=None, limit=10):
+    """
+    Technical certificate domains and project technologies merged into one
+    ranked list: [{'skill': name, 'count': n}, ...]
+    """
+    skills = dict(domain_counts(scope, category='technical'))
+    for name, count in technology_counts(scope):
+        skills[name] = skills.get(name, 0) + count
+    ranked = sorted(skills.items(), key=lambda item: (-item[1], item[0]))
+    return [{'skill': name, 'count': count} for name, count in ranked[:limit]]
@@ -1,3 +1,838 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from flexapp.compliance_service import refresh_compliance_snapshots, refresh_stale_compliance_snapshots
+from flexapp.dashboard_service import bump_student_data_version, get_student_data_version
+from flexapp.delta_export import WATERMARK_HEADER, delta_export, parse_watermark
+from flexapp.facet_index import FacetIndex, iter_bits
+from flexapp.flexon_cache import (
+    cached_translation, clear_translation_cache, normalize_query, popular_queries, store_translation,
+)
+from flexapp.flexon_plan import QueryPlanError, compile_plan, run_plan
+from flexapp.grid_service import filter_grid_students, iter_selection_rows
+from flexapp.metrics_service import rebuild_all_metrics, recalculate_profile_completion
+from flexapp.models import (
+    Achievement, AchievementCategory, Certificate, ComplianceSnapshot, FacetIndexChange, Faculty, FlexonQuery,
+    LeetCode, Projects, ReportJob, Technology, student,
+)
+from flexapp.naac_report import collect_naac_data
+from flexapp.nba_outcomes import assess_cohort, nba_thresholds, outcome_features
+from flexapp.portfolio_service import (
+    assemble_portfolio, collect_portfolio_data, iter_portfolio_zip, portfolio_stamp, portfolio_students,
+)
+from flexapp.ranking_service import get_cohort_version
+from flexapp.report_cache import cached_report_response
+from flexapp.report_jobs import claim_job, requeue_stale_jobs, send_heartbeat
+from flexapp.skills_service import technology_counts
+from flexapp.views import run_flexon_query
+
+
+class AssemblePortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='portfolio', roll_no='PF0001', first_name='Port', last_name='Folio', password='!',
+            dept='CSE', year=3, section='A', technical_skills='Django, SQL', soft_skills='Speaking',
+        )
+        cls.category = AchievementCategory.objects.create(name='Hackathon')
+        cls.technologies = [Technology.objects.create(name=name) for name in ('Python', 'React', 'Go')]
+
+    def add_records(self, count):
+        for n in range(count):
+            Achievement.objects.create(
+                student=self.student, submitted_by=self.student, category=self.category, title=f'Win {n}',
+                description='Won', achievement_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=n),
+                status='approved', points_awarded=10,
+            )
+            project = Projects.objects.create(
+                title=f'Project {n}', description='Built', status='Completed', year_and_sem='III-I',
+            )
+            project.contributors.add(self.student)
+            project.technologies.add(*self.technologies[:n % 3 + 1])
+            Certificate.objects.create(
+                rollno=self.student, title=f'Course {n}', source='Coursera', domain='Web',
+                category='technical', year_and_sem='III-I',
+            )
+
+    def fresh_student(self):
+        # Reloaded so nothing is served from a cached relation
+        return student.objects.get(pk=self.student.pk)
+
+    def test_query_count_does_not_grow_with_records(self):
+        self.add_records(1)
+        student_obj = self.fresh_student()
+        with self.assertNumQueries(7):
+            assemble_portfolio(student_obj)
+
+        self.add_records(20)
+        student_obj = self.fresh_student()
+        with self.assertNumQueries(7):
+            portfolio = assemble_portfolio(student_obj)
+
+        # Rendering the sections needs nothing further from the database
+        with self.assertNumQueries(0):
+            for achievement in portfolio['achievement_summary']['recent_achievements']:
+                achievement.category.name
+            for project in portfolio['project_highlights']['featured_projects']:
+                [tech.name for tech in project.technologies.all()]
+
+    def test_sections(self):
+        self.add_records(4)
+        portfolio = assemble_portfolio(self.fresh_student())
+
+        achievements = portfolio['achievement_summary']
+        self.assertEqual(achievements['total_achievements'], 4)
+        self.assertEqual(achievements['total_points'], 40)
+        self.assertEqual(achievements['categories'], {'Hackathon': 4})
+        self.assertEqual([a.title for a in achievements['recent_achievements']], ['Win 3', 'Win 2', 'Win 1', 'Win 0'])
+
+        projects = portfolio['project_highlights']
+        self.assertEqual((projects['total_projects'], projects['completed_projects']), (4, 4))
+        self.assertEqual(projects['technologies_used'], ['Python', 'React', 'Go'])
+        self.assertEqual(len(projects['featured_projects']), 3)
+
+        skills = portfolio['skill_matrix']
+        self.assertEqual(skills['technical'], ['Web', 'Django', 'SQL'])
+        self.assertEqual(skills['soft_skills'], ['Speaking'])
+
+        certifications = portfolio['certification_summary']
+        self.assertEqual(certifications['total_certificates'], 4)
+        self.assertEqual(certifications['by_category'], {'technical': 4})
+        self.assertEqual(certifications['top_providers'], {'Coursera': 4})
+
+    def test_verification_code_follows_data_version(self):
+        code = portfolio_stamp(self.student)['verification_code']
+        batch = collect_portfolio_data(student.objects.filter(pk=self.student.pk))
+        # The page and the PDFs agree, and the code does not change with the date
+        self.assertEqual(batch[0]['verification_code'], code)
+        later = timezone.now() + datetime.timedelta(days=3)
+        self.assertEqual(portfolio_stamp(self.student, later)['verification_code'], code)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_records(1)
+        self.assertNotEqual(portfolio_stamp(self.student)['verification_code'], code)
+
+
+class PortfolioBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for n in (3, 1, 2):
+            student.objects.create(
+                username=f'batch{n}', roll_no=f'PB000{n}', first_name='Batch', last_name=str(n), password='!',
+                dept='CSE', year=4, section='B',
+            )
+        cls.faculty = Faculty.objects.create(username='batchfaculty', dept='CSE')
+
+    def zip_of(self, workers=1):
+        progress = []
+        portfolios = collect_portfolio_data(portfolio_students('CSE', 4, 'B'))
+        chunks = list(iter_portfolio_zip(portfolios, workers, progress.append))
+        # One chunk per PDF, then the central directory
+        self.assertEqual(len(chunks), len(portfolios) + 1)
+        self.assertEqual(progress[-1], 100)
+        return zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+
+    def test_zip_holds_each_portfolio_in_selection_order(self):
+        archive = self.zip_of()
+        self.assertEqual(archive.namelist(), ['portfolio_batch1.pdf', 'portfolio_batch2.pdf', 'portfolio_batch3.pdf'])
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b'%PDF'))
+
+    def test_pooled_zip_matches_serial_order(self):
+        self.assertEqual(self.zip_of(workers=2).namelist(), self.zip_of().namelist())
+
+    def test_download_queues_a_job(self):
+        self.client.force_login(self.faculty, backend='flexapp.auth_backends.FacultyBackend')
+        response = self.client.get('/portfolio/batch/', {'dept': 'CSE', 'year': '4'})
+        job = ReportJob.objects.get()
+        self.assertRedirects(response, f'/reports/jobs/{job.pk}/', fetch_redirect_response=False)
+        self.assertEqual((job.report_type, job.params), ('portfolios', {'dept': 'CSE', 'year': '4'}))
+
+        response = self.client.get('/portfolio/batch/', {'dept': 'ECE'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+
+class StudentDataVersionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='versioned', roll_no='DV0001', first_name='Data', last_name='Version', password='!',
+            dept='CSE', year=2, section='A',
+        )
+
+    def test_bump_applies_on_commit(self):
+        before = get_student_data_version(self.student.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_student_data_version(self.student.pk)
+            # Not visible until the transaction commits
+            self.assertEqual(get_student_data_version(self.student.pk), before)
+        self.assertNotEqual(get_student_data_version(self.student.pk), before)
+
+    def test_record_change_bumps_owner(self):
+        before = get_student_data_version(self.student.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificate.objects.create(
+                rollno=self.student, title='Course', source='Coursera', category='technical', year_and_sem='II-I',
+            )
+        self.assertNotEqual(get_student_data_version(self.student.pk), before)
+
+
+class DeferredStudentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='deferred', roll_no='DF0001', first_name='Def', last_name='Erred', password='!',
+            dept='CSE', year=2, section='A', current_cgpa=8.1,
+        )
+
+    def test_deferred_fields_load(self):
+        partial = student.objects.only('roll_no').get(pk=self.student.pk)
+        self.assertEqual(partial.dept, 'CSE')
+        self.assertEqual(student.objects.defer('current_cgpa', 'dept').get(pk=self.student.pk).year, 2)
+        partial.refresh_from_db(fields=['section'])
+        self.assertEqual(partial.section, 'A')
+
+    def test_saving_deferred_instance_sees_the_old_cohort(self):
+        before = get_cohort_version('CSE', 2)
+        partial = student.objects.only('roll_no').get(pk=self.student.pk)
+        partial.dept = 'ECE'
+        with self.captureOnCommitCallbacks(execute=True):
+            partial.save()
+        self.assertNotEqual(get_cohort_version('CSE', 2), before)
+
+        before = get_cohort_version('ECE', 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.objects.only('roll_no').get(pk=self.student.pk).delete()
+        self.assertNotEqual(get_cohort_version('ECE', 2), before)
+
+
+class ProfileCompletionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='complete', roll_no='PC0001', first_name='Pro', last_name='File', password='!',
+            dept='CSE', year=2, section='A',
+        )
+
+    def stored_completion(self):
+        return student.objects.values_list('profile_completion_percentage', flat=True).get(pk=self.student.pk)
+
+    def test_partial_save_of_counted_field(self):
+        before = self.stored_completion()
+        self.student.phone = '9999999999'
+        self.student.save(update_fields=['phone'])
+        self.assertEqual(self.stored_completion(), before + 5)
+
+    def test_commands_write_back_stale_completion(self):
+        expected = self.stored_completion()
+        for rebuild in (recalculate_profile_completion, rebuild_all_metrics):
+            student.objects.filter(pk=self.student.pk).update(profile_completion_percentage=0)
+            rebuild(student.objects.filter(pk=self.student.pk))
+            self.assertEqual(self.stored_completion(), expected)
+
+
+class TechnologyCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [
+            student.objects.create(
+                username=f'team{n}', roll_no=f'TC000{n}', first_name='Team', last_name=str(n), password='!',
+                dept='CSE' if n < 3 else 'ECE', year=3, section='A',
+            )
+            for n in range(4)
+        ]
+        python, react = Technology.objects.create(name='Python'), Technology.objects.create(name='React')
+        Technology.objects.create(name='Unused')
+        team_project = Projects.objects.create(title='Team', description='Built', status='Completed', year_and_sem='III-I')
+        team_project.contributors.add(*cls.students)
+        team_project.technologies.add(python, react)
+        solo_project = Projects.objects.create(title='Solo', description='Built', status='Completed', year_and_sem='III-I')
+        solo_project.contributors.add(cls.students[3])
+        solo_project.technologies.add(python)
+
+    def test_project_counts_once_whatever_its_contributors(self):
+        self.assertEqual(technology_counts(), [('Python', 2), ('React', 1)])
+        self.assertEqual(technology_counts({'dept': 'CSE'}), [('Python', 1), ('React', 1)])
+        self.assertEqual(technology_counts(self.students[3]), [('Python', 2), ('React', 1)])
+        self.assertEqual(technology_counts(limit=1), [('Python', 2)])
+
+    def test_naac_report_and_portfolio_use_the_same_counts(self):
+        cse = student.objects.filter(dept='CSE')
+        self.assertEqual(collect_naac_data(cse).technology_usage, [('Python', 1), ('React', 1)])
+        everyone = collect_naac_data(student.objects.all())
+        self.assertEqual(everyone.technology_usage, technology_counts())
+        self.assertEqual(assemble_portfolio(self.students[3])['skill_matrix']['programming'], ['Python', 'React'])
+
+
+class FacetIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [
+            student.objects.create(
+                username=f'facet{n}', roll_no=f'FI000{n}', first_name='Facet', last_name=str(n), password='!',
+                dept='CSE', year=n + 1, section='A',
+            )
+            for n in range(3)
+        ]
+        Certificate.objects.create(
+            rollno=cls.students[0], title='Course', source='NPTEL', category='technical', year_and_sem='I-I',
+        )
+
+    def ids(self, mask):
+        return set(iter_bits(mask))
+
+    def test_sync_replays_changes_logged_elsewhere(self):
+        index = FacetIndex().build()
+        moved = self.students[1]
+        # As another process would: the row changes and a change is logged, no local patch
+        student.objects.filter(pk=moved.pk).update(dept='ECE')
+        FacetIndexChange.objects.create(student_id=moved.pk)
+        self.assertEqual(self.ids(index.match({'dept': ['ECE']})), set())
+
+        index.sync()
+        self.assertEqual(self.ids(index.match({'dept': ['ECE']})), {moved.pk})
+        self.assertEqual(self.ids(index.match({'dept': ['CSE']})), {self.students[0].pk, self.students[2].pk})
+        # Nothing new: no rows to re-read
+        with self.assertNumQueries(1):
+            index.sync()
+
+    def test_student_save_logs_change_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[2].section = 'B'
+            self.students[2].save()
+            self.assertFalse(FacetIndexChange.objects.exists())
+        self.assertEqual(list(FacetIndexChange.objects.values_list('student_id', flat=True)), [self.students[2].pk])
+
+    def test_large_matches_are_filtered_in_sql(self):
+        index = FacetIndex().build()
+        params = {'dept': ['CSE'], 'provider': ['NPTEL']}
+        by_ids = filter_grid_students(params, facet_index=index)
+        with mock.patch('flexapp.grid_service.GRID_ID_FILTER_LIMIT', 0):
+            in_sql = filter_grid_students(params, facet_index=index)
+        self.assertIn('EXISTS', str(in_sql.query))
+        self.assertEqual(set(by_ids.values_list('pk', flat=True)), {self.students[0].pk})
+        self.assertEqual(set(in_sql.values_list('pk', flat=True)), {self.students[0].pk})
+
+
+@override_settings(REPORT_JOB_STALE_AFTER=60, REPORT_JOB_MAX_ATTEMPTS=2)
+class StaleReportJobTests(TestCase):
+    def setUp(self):
+        ReportJob.objects.create(report_type='export', owner='faculty:1')
+
+    def abandon(self, job):
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - datetime.timedelta(minutes=5))
+
+    def test_dead_worker_jobs_are_requeued_then_failed(self):
+        job = claim_job('dead:1')
+        send_heartbeat('dead:1')
+        self.assertEqual(requeue_stale_jobs(), (0, 0))
+
+        self.abandon(job)
+        self.assertEqual(requeue_stale_jobs(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), ('queued', ''))
+
+        self.abandon(claim_job('dead:2'))
+        self.assertEqual(requeue_stale_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+
+class ReportCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='reported', roll_no='RC0001', first_name='Re', last_name='Port', password='!',
+            dept='CSE', year=2, section='A',
+        )
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.enterContext(override_settings(REPORT_CACHE_ROOT=root.name))
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        response = HttpResponse(f'build {self.builds}')
+        response['Content-Disposition'] = 'attachment; filename="report.txt"'
+        return response
+
+    def fetch(self, selection=None):
+        response = cached_report_response('test', selection, {}, self.build)
+        content = b''.join(response.streaming_content).decode()
+        response.close()
+        return response['X-Report-Cache'], content
+
+    def test_served_from_cache_until_data_changes(self):
+        self.assertEqual(self.fetch(), ('miss', 'build 1'))
+        self.assertEqual(self.fetch(), ('hit', 'build 1'))
+        # Selections are normalized, so the same students in another order share an entry
+        self.assertEqual(self.fetch(['B', 'A ']), ('miss', 'build 2'))
+        self.assertEqual(self.fetch(['A', 'B', 'A']), ('hit', 'build 2'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificate.objects.create(
+                rollno=self.student, title='Course', source='NPTEL', category='technical', year_and_sem='II-I',
+            )
+            # Uncommitted changes do not invalidate yet
+            self.assertEqual(self.fetch(), ('hit', 'build 1'))
+        self.assertEqual(self.fetch(), ('miss', 'build 3'))
+
+
+@override_settings(EXPORT_WATERMARK_LAG=0)
+class DeltaExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='delta', roll_no='DE0001', first_name='Del', last_name='Ta', password='!',
+            dept='CSE', year=2, section='A',
+        )
+
+    def export(self, since):
+        response = delta_export(
+            Certificate.objects.all(), ['rollno__first_name', 'title'], 'certificates', since, 'json'
+        )
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        return rows, parse_watermark(response[WATERMARK_HEADER])
+
+    def add_certificate(self, title):
+        return Certificate.objects.create(
+            rollno=self.student, title=title, source='NPTEL', category='technical', year_and_sem='II-I',
+        )
+
+    def test_changes_and_tombstones_since_watermark(self):
+        kept = self.add_certificate('Kept')
+        dropped = self.add_certificate('Dropped')
+        rows, watermark = self.export(timezone.now() - datetime.timedelta(minutes=1))
+        self.assertEqual([(row['id'], row['deleted']) for row in rows], [(kept.pk, False), (dropped.pk, False)])
+
+        dropped_id = dropped.pk
+        dropped.delete()
+        rows, watermark = self.export(watermark)
+        self.assertEqual([(row['id'], row['deleted']) for row in rows], [(dropped_id, True)])
+
+        # Nothing changed since
+        rows, watermark = self.export(watermark)
+        self.assertEqual(rows, [])
+
+        # A rename changes what the student's certificates export
+        self.student.first_name = 'Delia'
+        self.student.save()
+        rows, watermark = self.export(watermark)
+        self.assertEqual([(row['id'], row['rollno__first_name']) for row in rows], [(kept.pk, 'Delia')])
+
+
+class ComplianceSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = student.objects.create(
+            username='compliant', roll_no='CS0001', first_name='Com', last_name='Pliant', password='!',
+            dept='CSE', year=2, section='A', admission_year=2023, current_cgpa=7.5,
+        )
+        refresh_compliance_snapshots([2023])
+
+    def snapshot(self):
+        return ComplianceSnapshot.objects.get(admission_year=2023, dept='CSE')
+
+    def test_changes_mark_scope_stale_for_background_refresh(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.current_cgpa = 8.5
+            self.student.save()
+        snapshot = self.snapshot()
+        # Nothing is recomputed in the request that made the change
+        self.assertIsNotNone(snapshot.stale_since)
+        self.assertEqual(snapshot.metrics['students_above_8_cgpa'], 0)
+
+        self.assertEqual(refresh_stale_compliance_snapshots(), 1)
+        snapshot = self.snapshot()
+        self.assertIsNone(snapshot.stale_since)
+        self.assertEqual(snapshot.metrics['students_above_8_cgpa'], 1)
+        self.assertEqual(refresh_stale_compliance_snapshots(), 0)
+
+    def test_only_compliance_fields_mark_scope_stale(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            certificate = Certificate.objects.create(
+                rollno=self.student, title='Course', source='NPTEL', category='technical', year_and_sem='II-I',
+            )
+        refresh_stale_compliance_snapshots()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.phone = '9999999999'
+            self.student.save()
+            certificate.title = 'Renamed course'
+            certificate.save()
+        self.assertIsNone(self.snapshot().stale_since)
+
+    def test_new_scope_and_repeated_refreshes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student.objects.create(
+                username='newscope', roll_no='CS0002', first_name='New', last_name='Scope', password='!',
+                dept='ECE', year=1, section='A', admission_year=2023,
+            )
+        placeholder = ComplianceSnapshot.objects.get(admission_year=2023, dept='ECE')
+        self.assertIsNone(placeholder.computed_at)
+
+        # Upserted, so refreshing the same scopes again cannot collide
+        self.assertEqual(refresh_compliance_snapshots([2023]), 2)
+        self.assertEqual(refresh_compliance_snapshots([2023]), 2)
+        self.assertEqual(
+            ComplianceSnapshot.objects.get(admission_year=2023, dept='ECE').metrics['total_students'], 1
+        )
+
+
+@override_settings(FLEXON_TRANSLATION_CACHE_SIZE=2)
+class FlexonTranslationCacheTests(TestCase):
+    plan = {'model': 'student', 'filters': [['dept', 'exact', 'CSE']]}
+
+    def setUp(self):
+        clear_translation_cache()
+        self.addCleanup(clear_translation_cache)
+
+    def test_normalization(self):
+        self.assertEqual(normalize_query('Show me ALL the students  in CSE, please!'), 'students in cse')
+        self.assertEqual(normalize_query('list students in cse'), 'students in cse')
+        # Negations, comparisons and tech names are what is asked, so they stay
+        self.assertEqual(normalize_query('students not in CSE'), 'students not in cse')
+        self.assertEqual(normalize_query('cgpa >= 8 and C++ or node.js.'), 'cgpa >= 8 and c++ or node.js')
+        self.assertEqual(normalize_query('cgpa != 8'), 'cgpa != 8')
+        self.assertEqual(normalize_query('Show me all!'), '')
+
+    def test_hits_are_counted_and_served_from_the_lru(self):
+        self.assertIsNone(cached_translation('students in CSE'))
+        store_translation('Show students in CSE', self.plan)
+
+        with self.assertNumQueries(1):
+            # Only the hit count is written; the plan comes from the LRU
+            self.assertEqual(cached_translation('list the students in cse?'), self.plan)
+        self.assertEqual(popular_queries(), [{'query': 'Show students in CSE', 'hit_count': 2}])
+
+        clear_translation_cache()
+        with self.assertNumQueries(2):
+            self.assertEqual(cached_translation('students in CSE'), self.plan)
+
+    def test_lru_evicts_least_recently_used(self):
+        for question in ('students in cse', 'students in ece', 'students in mech'):
+            store_translation(question, self.plan)
+        # The oldest fell out of the two-entry LRU but is still read from the table
+        with self.assertNumQueries(2):
+            self.assertEqual(cached_translation('students in cse'), self.plan)
+        with self.assertNumQueries(1):
+            self.assertEqual(cached_translation('students in mech'), self.plan)
+
+    def test_deleted_translation_stops_being_served(self):
+        store_translation('students in cse', self.plan)
+        FlexonQuery.objects.all().delete()
+        self.assertIsNone(cached_translation('students in cse'))
+
+    def test_retired_translation_stops_being_served(self):
+        store_translation('students in cse', self.plan)
+        # As another process retiring it would, leaving this LRU alone
+        FlexonQuery.objects.update(plan=None)
+        self.assertIsNone(cached_translation('students in cse'))
+        self.assertEqual(FlexonQuery.objects.get().hit_count, 1)
+
+
+class FlexonPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [
+            student.objects.create(
+                username=f'plan{n}', roll_no=f'PL{n:04d}', first_name=f'Plan{n}', password='!', dept='CSE', year=3,
+            )
+            for n in range(3)
+        ]
+        python, react = Technology.objects.create(name='Python'), Technology.objects.create(name='React')
+        for n in range(2):
+            project = Projects.objects.create(
+                title=f'Project {n}', description='Built', status='Completed', year_and_sem='III-I',
+            )
+            project.contributors.add(cls.students[0])
+            project.technologies.add(python, react)
+
+    def assertRejected(self, plan, message):
+        with self.assertRaisesRegex(QueryPlanError, message):
+            compile_plan(plan)
+
+    def test_paths_outside_the_whitelist_are_rejected(self):
+        self.assertRejected({'model': 'User'}, 'Unknown model')
+        self.assertRejected({'model': 'student', 'columns': ['password']}, "'password' is not available")
+        self.assertRejected({'model': 'student', 'filters': {'mentor__password': 'x'}}, "'password' is not available")
+        self.assertRejected({'model': 'student', 'group_by': ['projects__title']}, 'can match several rows')
+
+    def test_only_whitelisted_single_lookups(self):
+        self.assertRejected({'model': 'student', 'filters': {'dept__regex': '.*'}}, 'Unsupported lookup')
+        self.assertRejected({'model': 'student', 'filters': {'roll_no__lower__exact': 'x'}}, 'Unsupported lookup')
+        self.assertRejected({'model': 'student', 'filters': {'dept__exact__in': ['CSE']}}, 'Unsupported lookup')
+
+    def test_annotations_follow_one_to_many_relation(self):
+        self.assertRejected({'model': 'student', 'annotations': {
+            'technologies': {'function': 'count', 'field': 'projects__technologies'},
+        }}, 'follows 2 to-many relations')
+        self.assertRejected({'model': 'student', 'annotations': {'python': {
+            'function': 'count', 'field': 'projects', 'filter': {'projects__technologies__name': 'Python'},
+        }}}, 'follows 2 to-many relations')
+
+        # Filtering before the count limits it to the matching projects, each counted once
+        rows = run_plan(compile_plan({
+            'model': 'student',
+            'filters': {'projects__technologies__name__icontains': 'python'},
+            'annotations': {'python_projects': {'function': 'count', 'field': 'projects', 'distinct': True}},
+            'columns': ['roll_no', 'python_projects'],
+        }))
+        self.assertEqual(rows, [{'roll_no': 'PL0000', 'python_projects': 2}])
+
+    def test_rows_joined_through_to_many_filters_appear_once(self):
+        rows = run_plan(compile_plan({
+            'model': 'student', 'filters': {'projects__technologies__name__in': ['Python', 'React']},
+            'columns': ['roll_no'],
+        }))
+        self.assertEqual(rows, [{'roll_no': 'PL0000'}])
+
+    @override_settings(FLEXON_QUERY_MAX_ROWS=2)
+    def test_limit_is_capped(self):
+        rows = run_plan(compile_plan({'model': 'student', 'columns': ['roll_no'], 'limit': 50, 'ordering': ['roll_no']}))
+        self.assertEqual(rows, [{'roll_no': 'PL0000'}, {'roll_no': 'PL0001'}])
+        self.assertRejected({'model': 'student', 'limit': 0}, 'Limit must be a positive number')
+
+    def test_plan_is_stored_only_after_it_runs(self):
+        plan = {'model': 'student', 'columns': ['roll_no']}
+        clear_translation_cache()
+        self.addCleanup(clear_translation_cache)
+        with mock.patch('flexapp.views.generate_plan_from_query', return_value=plan), \
+                mock.patch('flexapp.views.run_plan', side_effect=QueryPlanError('The query took too long')):
+            with self.assertRaises(QueryPlanError):
+                run_flexon_query('students')
+        self.assertFalse(FlexonQuery.objects.exists())
+
+        with mock.patch('flexapp.views.generate_plan_from_query', return_value=plan):
+            _, rows, cached = run_flexon_query('students')
+        self.assertEqual((len(rows), cached), (3, False))
+        self.assertEqual(cached_translation('students'), plan)
+
+
+class NbaOutcomeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [
+            student.objects.create(
+                username=f'nba{n}', roll_no=f'NB000{n}', first_name='Nba', last_name=str(n), password='!',
+                dept='EEE', year=4, section='A', current_cgpa=7 + n,
+            )
+            for n in range(4)
+        ]
+        first, second, third, _ = cls.students
+        for category in ('technical', 'technical'):
+            cls.certificate(first, category)
+        cls.certificate(second, 'foreign_language')
+        for _ in range(3):
+            cls.certificate(third, 'co_curricular')
+
+        team = Projects.objects.create(title='Team', description='Built', status='Completed', year_and_sem='IV-I')
+        team.contributors.add(first, second)
+        solo = Projects.objects.create(title='Solo', description='Built', status='In_progress', year_and_sem='IV-I')
+        solo.contributors.add(third)
+
+        research = AchievementCategory.objects.create(name='Research Paper')
+        Achievement.objects.create(
+            student=first, submitted_by=first, category=research, title='Paper', description='Published',
+            achievement_date=datetime.date(2024, 1, 1), status='approved', points_awarded=10,
+        )
+
+    @staticmethod
+    def certificate(owner, category):
+        Certificate.objects.create(rollno=owner, title='Course', source='NPTEL', category=category, year_and_sem='IV-I')
+
+    def cohort(self):
+        return student.objects.filter(dept='EEE')
+
+    def test_one_query_however_large_the_cohort(self):
+        with self.assertNumQueries(1):
+            assess_cohort(self.cohort())
+        for n in range(4, 20):
+            owner = student.objects.create(
+                username=f'nba{n}', roll_no=f'NB00{n:02d}', first_name='Nba', password='!', dept='EEE', year=4,
+            )
+            self.certificate(owner, 'technical')
+        with self.assertNumQueries(1):
+            self.assertEqual(assess_cohort(self.cohort())['students'], 20)
+
+    def test_attainment_of_a_hand_built_cohort(self):
+        features = outcome_features(self.cohort())
+        self.assertEqual(features['team_projects'].tolist(), [1, 1, 0, 0])
+        self.assertEqual(features['completed_projects'].tolist(), [1, 1, 0, 0])
+        self.assertEqual(features['research_achievements'].tolist(), [1, 0, 0, 0])
+
+        report = assess_cohort(self.cohort())
+        self.assertEqual(report['students'], 4)
+        self.assertEqual(report['program_outcomes'], {
+            'engineering_knowledge': 25.0,
+            'problem_analysis': 25.0,
+            'design_solutions': 50.0,
+            'research_skills': 25.0,
+            'modern_tools': 0.0,
+            'professional_ethics': 25.0,
+            'communication': 50.0,
+            'project_management': 50.0,
+            'lifelong_learning': 25.0,
+        })
+        self.assertEqual(report['assessment_data']['project_assessment']['team_project_rate'], 50.0)
+        self.assertEqual(report['assessment_data']['continuous_assessment']['students_above_8_cgpa'], 3)
+
+    @override_settings(NBA_OUTCOME_THRESHOLDS={'project_management': {'team_projects': 2}})
+    def test_thresholds_from_settings(self):
+        self.assertEqual(assess_cohort(self.cohort())['program_outcomes']['project_management'], 0.0)
+        # The argument overrides the setting
+        report = assess_cohort(self.cohort(), {'project_management': {'team_projects': 1}})
+        self.assertEqual(report['program_outcomes']['project_management'], 50.0)
+
+    @override_settings(NBA_OUTCOME_THRESHOLDS={'research_skills': {'papers': 1}})
+    def test_unknown_feature_in_settings_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'papers'):
+            nba_thresholds()
+
+
+class SelectionExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Created out of roll number order
+        cls.students = {
+            roll_no: student.objects.create(
+                username=roll_no.lower(), roll_no=roll_no, first_name=f'Sel {roll_no}', password='!',
+                dept='CSE', year=2, section='C',
+            )
+            for roll_no in ('SE0003', 'SE0001', 'SE0004', 'SE0002')
+        }
+        first, second = cls.students['SE0001'], cls.students['SE0003']
+        for owner, category, title in (
+            (first, 'technical', 'AWS'), (first, 'foreign_language', 'German'), (first, 'technical', 'Azure'),
+            (first, 'co_curricular', 'Debate'), (second, 'foreign_language', 'French'),
+        ):
+            Certificate.objects.create(rollno=owner, title=title, source='NPTEL', category=category, year_and_sem='II-I')
+        shared = Projects.objects.create(title='Shared', description='Built', status='Completed', year_and_sem='II-I')
+        shared.contributors.add(first, second)
+        solo = Projects.objects.create(title='Solo', description='Built', status='Completed', year_and_sem='II-I')
+        solo.contributors.add(first)
+        LeetCode.objects.create(rollno=first, TotalProblems=120)
+
+    def test_rows_in_four_queries_by_roll_number(self):
+        with self.assertNumQueries(4):
+            rows = list(iter_selection_rows(student.objects.filter(dept='CSE', section='C')))
+        self.assertEqual([row[0] for row in rows], ['SE0001', 'SE0002', 'SE0003', 'SE0004'])
+        self.assertEqual(rows[0], ['SE0001', 'Sel SE0001', 'CSE', 'C', 2, 120, 'Shared,Solo', 'German', 'AWS,Azure'])
+        self.assertEqual(rows[1], ['SE0002', 'Sel SE0002', 'CSE', 'C', 2, None, '', '', ''])
+        self.assertEqual(rows[2][6:], ['Shared', 'French', ''])
+
+    def test_download_is_in_roll_number_order(self):
+        response = self.client.post('/download', json.dumps(['SE0004', 'SE0001', 'SE0003']), content_type='application/json')
+        sheet = openpyxl.load_workbook(io.BytesIO(response.getvalue())).active
+        self.assertEqual(
+            [row[0] for row in sheet.iter_rows(values_only=True)], ['Roll No', 'SE0001', 'SE0003', 'SE0004']
+        )
+
+
+class FacultyGridApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(username='gridfaculty', first_name='Mentor', default_year=3, default_section='B')
+        python = Technology.objects.create(name='Python')
+        # (roll_no, dept, year, section, LeetCode total, certificate provider)
+        for roll_no, dept, year, section, solved, provider in (
+            ('GA01', 'CSE', 3, 'B', 200, 'NPTEL'),
+            ('GA02', 'CSE', 3, 'B', 200, 'Coursera'),
+            ('GA03', 'ECE', 3, 'A', 200, None),
+            ('GA04', 'ECE', 2, 'B', 50, None),
+            ('GA05', 'CSE', 2, 'A', None, None),
+        ):
+            owner = student.objects.create(
+                username=roll_no.lower(), roll_no=roll_no, first_name=f'Grid {roll_no}', password='!',
+                dept=dept, year=year, section=section, mentor=cls.faculty if dept == 'CSE' else None,
+            )
+            if solved is not None:
+                LeetCode.objects.create(rollno=owner, TotalProblems=solved)
+            if provider:
+                Certificate.objects.create(
+                    rollno=owner, title='Course', source=provider, domain='Cloud', category='technical',
+                    year_and_sem='III-I',
+                )
+        project = Projects.objects.create(title='Grid', description='Built', status='Completed', year_and_sem='III-I')
+        project.contributors.add(student.objects.get(roll_no='GA01'))
+        project.technologies.add(python)
+
+    def setUp(self):
+        # A fresh process-wide facet index for this test's data
+        self.enterContext(mock.patch('flexapp.facet_index._index', None))
+        self.client.force_login(self.faculty, backend='flexapp.auth_backends.FacultyBackend')
+
+    def get(self, **params):
+        response = self.client.get('/faculty/api/students', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def roll_numbers(self, **params):
+        return sorted(row['roll_no'] for row in self.get(**params)['results'])
+
+    def test_filters(self):
+        self.assertEqual(self.roll_numbers(dept='CSE', year='3'), ['GA01', 'GA02'])
+        self.assertEqual(self.roll_numbers(dept=['CSE', 'ECE'], section='A'), ['GA03', 'GA05'])
+        self.assertEqual(self.roll_numbers(provider=['NPTEL', 'Coursera']), ['GA01', 'GA02'])
+        self.assertEqual(self.roll_numbers(technology='Python', status='Completed'), ['GA01'])
+        self.assertEqual(self.roll_numbers(mentor='Mentor', year='2'), ['GA05'])
+        self.assertEqual(self.roll_numbers(q='ga0', min_leetcode='100'), ['GA01', 'GA02', 'GA03'])
+        self.assertEqual(self.roll_numbers(min_certificates='1', min_projects='1'), ['GA01'])
+        self.assertEqual(self.client.get('/faculty/api/students', {'min_leetcode': 'many'}).status_code, 400)
+
+    def test_cursor_is_stable_across_tied_sort_keys(self):
+        seen = []
+        page = self.get(sort='-leetcode', limit='2')
+        self.assertEqual(page['total'], 5)
+        while True:
+            seen += [row['roll_no'] for row in page['results']]
+            if not page['next_cursor']:
+                break
+            page = self.get(sort='-leetcode', limit='2', cursor=page['next_cursor'])
+            # Only the first page carries totals and facets
+            self.assertNotIn('total', page)
+        # Ties on the sort key fall back to the primary key, in the same direction
+        self.assertEqual(seen, ['GA03', 'GA02', 'GA01', 'GA04', 'GA05'])
+
+        seen = []
+        page = self.get(sort='leetcode', limit='2')
+        while True:
+            seen += [row['roll_no'] for row in page['results']]
+            if not page['next_cursor']:
+                break
+            page = self.get(sort='leetcode', limit='2', cursor=page['next_cursor'])
+        self.assertEqual(seen, ['GA05', 'GA04', 'GA01', 'GA02', 'GA03'])
+
+    def test_facet_counts(self):
+        page = self.get(dept='CSE')
+        self.assertEqual(page['total'], 3)
+        self.assertEqual(page['facets']['year'], [[3, 2], [2, 1]])
+        self.assertEqual(page['facets']['section'], [['B', 2], ['A', 1]])
+        self.assertEqual(page['facets']['provider'], [['Coursera', 1], ['NPTEL', 1]])
+        self.assertEqual(page['facets']['technology'], [['Python', 1]])
+
+        # Search is not in the index, so totals come from the SQL match
+        page = self.get(q='GA0', min_leetcode='100')
+        self.assertEqual(page['total'], 3)
+        self.assertEqual(page['facets']['dept'], [['CSE', 2], ['ECE', 1]])
+
+    def test_dashboard_lands_on_the_faculty_cohort(self):
+        response = self.client.get('/faculty')
+        self.assertEqual(response.context['default_filters'], {'year': 3, 'section': 'B'})
+
+        self.faculty.default_year = None
+        self.faculty.save()
+        response = self.client.get('/faculty')
+        self.assertEqual(response.context['default_filters'], {'section': 'B'})
@@ -7,13 +7,16 @@ urlpatterns = [
     path('login',views.CustomLogin,name="login"),
     path('logout', views.CustomLogout, name="logout"),
     path('dashboard', views.dashboard, name="dashboard"),
+    path('dashboard/sections/<str:section>', views.dashboard_section, name="dashboard_section"),
     # path('updateLeet/<int:count>',views.UpdateLeet, name="updateLeet"),
     # path('register', views.register, name="register"),
     path('create-project', views.create_project, name="create_project"),
     path('add-certification', views.add_certification, name="add_certification"),
     path('faculty', views.faculty, name="faculty"),
+    path('faculty/api/students', views.faculty_students_api, name="faculty_students_api"),
     path('coordinator/dashboard/', views.coordinator_dashboard, name='coordinator_dashboard'),
     path('student/<str:rollno>', views.studentView, name="studentView"),
+    path('student/<str:rollno>/sections/<str:section>', views.dashboard_section, name="student_dashboard_section"),
     path('edit_project', views.edit_project, name="edit_project"),
     path('delete_project/<int:primary_key>', views.delete_project,name="delete_project"),
     path('delete_certification/<int:primary_key>', views.delete_certification, name="delete_certification"),
@@ -85,16 +88,24 @@ urlpatterns = [
     path('export/achievements/<str:format_type>/', views.export_achievements_data, name='export_achievements'),
     path('export/certificates/<str:format_type>/', views.export_certificates_data, name='export_certificates'),
     path('export/projects/<str:format_type>/', views.export_projects_data, name='export_projects'),
+    path('export/placements/<str:format_type>/', views.export_placements_data, name='export_placements'),
     
     # Portfolio Generation URLs
     path('portfolio/generate/', views.generate_portfolio, name='generate_portfolio'),
+    path('portfolio/batch/', views.download_portfolios, name='download_portfolios'),
     
     # Compliance Reports URLs
     path('reports/compliance/', views.compliance_reports, name='compliance_reports'),
+    path('reports/compliance/refresh/', views.refresh_compliance_snapshot, name='refresh_compliance_snapshot'),
     
     # NAAC Report Generation
     path('reports/naac/generate/', views.generate_naac_report, name='generate_naac_report'),
     
+    # Background Report Jobs
+    path('reports/jobs/', views.submit_report_job, name='submit_report_job'),
+    path('reports/jobs/<int:job_id>/', views.report_job_status, name='report_job_status'),
+    path('reports/jobs/<int:job_id>/download/', views.report_job_download, name='report_job_download'),
+    
     # REST API URLs
     path('', include('flexapp.api_urls')),
 ]
@@ -6,9 +6,9 @@ from django.utils import timezone
 from .forms import *
 import logging
 from django.contrib.auth.decorators import login_required
-from .models import Projects, Certificate, student, LeetCode, Faculty,FillOutForm, FillOutField, student, Technology, AuditLog, Achievement, AchievementCategory, ApprovalWorkflow, AcademicPerformance, EnhancedNotification, NotificationTemplate, PlacementOffer
+from .models import Projects, Certificate, student, LeetCode, Faculty,FillOutForm, FillOutField, student, Technology, AuditLog, Achievement, AchievementCategory, ApprovalWorkflow, AcademicPerformance, EnhancedNotification, NotificationTemplate, PlacementOffer, ReportJob
 import requests
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 import json
 from django.views.decorators.csrf import csrf_exempt
 from django.core import serializers
@@ -26,7 +26,36 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .serializers import StudentSerializer, ProjectSerializer, CertificateSerializer, TechnologySerializer
-from django.db.models import F, Sum, Count, Avg
+from .metrics_service import get_student_metrics
+from .ranking_service import get_cohort_ranking, get_cohort_version
+from .activity_service import get_activity_series
+from .grid_service import (
+    GRID_MAX_PAGE_SIZE, GRID_PAGE_SIZE, SELECTION_EXPORT_HEADERS, filter_grid_students, grid_facet_filters,
+    grid_page, has_sql_only_filters, iter_selection_rows,
+)
+from .facet_index import get_facet_index, mask_of
+from .streaming_export import EXPORT_CHUNK_SIZE, streaming_export
+from .delta_export import WATERMARK_HEADER, delta_export, export_cutoff, format_watermark, parse_watermark
+from .xlsx_export import xlsx_response
+from .naac_report import build_naac_workbook, naac_report_workers
+from .nba_outcomes import assess_cohort, nba_thresholds
+from .compliance_service import compliance_summary, refresh_compliance_snapshots
+from .portfolio_cache import cached_portfolio_context, cached_portfolio_pdf, portfolio_etag
+from .portfolio_service import (
+    assemble_portfolio, collect_portfolio_data, iter_portfolio_zip, portfolio_stamp, portfolio_students,
+    portfolio_workers, render_portfolio_pdf,
+)
+from .report_cache import cached_report_response
+from .report_jobs import can_access_job, job_status, submit_job
+from .skills_service import skill_distribution
+from .dashboard_service import DASHBOARD_SECTIONS, dashboard_etag, get_dashboard_payload
+from .flexon_cache import cached_translation, popular_queries, store_translation
+from .flexon_plan import LOOKUPS, QueryPlanError, compile_plan, describe_schema, max_rows, run_plan
+from django.db.models import F, Sum, Count, Avg, Max
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import condition, require_POST
 from .forms import PlacementOfferForm
 from django.utils import timezone
 from datetime import timedelta
@@ -273,71 +302,103 @@ def create_certificate_api(request):
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+def build_dashboard_payload(student):
+    """Build the cacheable part of the student dashboard"""
+    # Precomputed counters (kept current by signals)
+    metrics = get_student_metrics(student)
+    
+    # Get achievements with approval status
+    achievements = Achievement.objects.filter(student=student).order_by('-submission_date')
+    
+    # Ensure we are querying the correct model field
+    projects = Projects.objects.filter(contributors=student)
+    
+    # Get certificates by category from a single query
+    certificates_by_category = {category: [] for category, _ in Certificate.CATEGORY_CHOICES}
+    for certificate in Certificate.objects.filter(rollno=student):
+        certificates_by_category.setdefault(certificate.category, []).append(certificate)
+    
+    # Debug: Log certificate counts
+    logging.info(f"Certificates for {student}: Technical={metrics.technical_certificates}, "
+                f"Foreign={metrics.foreign_language_certificates}, "
+                f"Co-curricular={metrics.co_curricular_certificates}, "
+                f"Extra-curricular={metrics.extra_curricular_certificates}")
+    
+    # Get LeetCode stats (unsaved zero stats until the first sync)
+    leetcode_data = LeetCode.objects.filter(rollno=student).first() or LeetCode(rollno=student)
+    
+    # Calculate chart series
+    try:
+        monthly_activity = get_monthly_activity(student)
+        skill_distribution = get_skill_distribution(student)
+    except Exception as e:
+        # Handle any aggregation errors
+        logging.error(f"Error calculating analytics: {e}")
+        monthly_activity = []
+        skill_distribution = {}
+    
+    return {
+        'achievements': serializers.serialize('python', achievements),
+        'achievements_summary': metrics.achievements_summary(),
+        'achievement_points': metrics.achievement_points,
+        'projects': serializers.serialize('python', projects),
+        'projects_length': metrics.total_projects,
+        'projects_summary': metrics.projects_summary(),
+        'certificates': {
+            category: serializers.serialize('python', certificates)
+            for category, certificates in certificates_by_category.items()
+        },
+        'certificate_counts': metrics.certificates_by_category(),
+        'leetcode_data': leetcode_data,
+        'placement_offers': list(PlacementOffer.objects.filter(student=student)),
+        'pending_approvals': metrics.pending_approvals,
+        'monthly_activity': monthly_activity,
+        'skill_distribution': skill_distribution,
+        'ranking_values': {
+            'certificates': metrics.total_certificates,
+            'projects': metrics.total_projects,
+            'achievements': metrics.approved_achievements,
+        },
+    }
+
+
+def _to_json(data):
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def get_academic_trend(academic_records):
+    """CGPA/SGPA trend over the last 6 semesters"""
+    return [
+        {
+            'semester': f"{record.year}-{record.semester}",
+            'cgpa': float(record.cgpa) if record.cgpa else 0,
+            'sgpa': float(record.sgpa) if record.sgpa else 0,
+            'credits': record.credits_earned,
+        }
+        for record in academic_records[:6]
+    ]
+
+
 def getStudentDetails(student):
     try:
-        # Calculate profile completion
-        profile_completion = student.calculate_profile_completion()
-        student.save()
+        # Maintained at write time by the student pre_save hook
+        profile_completion = student.profile_completion_percentage
         
         # Get academic performance
         academic_records = AcademicPerformance.objects.filter(student=student).order_by('-year', '-semester')
         latest_academic = academic_records.first() if academic_records.exists() else None
         
-        # Get achievements with approval status
-        achievements = Achievement.objects.filter(student=student).order_by('-submission_date')
-        achievements_summary = {
-            'total': achievements.count(),
-            'approved': achievements.filter(status='approved').count(),
-            'pending': achievements.filter(status='pending').count(),
-            'rejected': achievements.filter(status='rejected').count(),
-        }
-        
-        # Ensure we are querying the correct model field
-        projects = Projects.objects.filter(contributors=student)
-        
-        # Get certificates by category
-        technical_certificates = Certificate.objects.filter(rollno=student, category="technical")
-        foreign_language_certificates = Certificate.objects.filter(rollno=student, category="foreign_language")
-        co_curricular_certificates = Certificate.objects.filter(rollno=student, category="co_curricular")
-        extra_curricular_certificates = Certificate.objects.filter(rollno=student, category="extra_curricular")
-        
-        # Debug: Log certificate counts
-        logging.info(f"Certificates for {student}: Technical={technical_certificates.count()}, "
-                    f"Foreign={foreign_language_certificates.count()}, "
-                    f"Co-curricular={co_curricular_certificates.count()}, "
-                    f"Extra-curricular={extra_curricular_certificates.count()}")
-        
-        # Get projects summary
-        projects_summary = {
-            'total': projects.count(),
-            'completed': projects.filter(status='Completed').count(),
-            'in_progress': projects.filter(status='In_progress').count(),
-            'initialized': projects.filter(status='Initialized').count(),
-        }
-        
-        # Get LeetCode stats
-        try:
-            leetcode_data = LeetCode.objects.get(rollno=student)
-        except LeetCode.DoesNotExist:
-            leetcode_data = LeetCode.objects.create(rollno=student)
-        
-        # Get placement offers
-        placement_offers = PlacementOffer.objects.filter(student=student)
+        # Served from cache until this student's data changes
+        payload = get_dashboard_payload(student, build_dashboard_payload)
         
         # Calculate analytics for dashboard charts
         try:
-            # Avoid Sum aggregation initially, calculate manually to prevent 'mul' error
-            approved_achievements = achievements.filter(status='approved')
-            total_points = 0
-            for achievement in approved_achievements:
-                if achievement.points_awarded:
-                    total_points += achievement.points_awarded
-                    
             analytics = {
-                'achievement_points': total_points,
-                'monthly_activity': get_monthly_activity(student),
-                'skill_distribution': get_skill_distribution(student),
-                'comparative_ranking': get_comparative_ranking(student),
+                'achievement_points': payload['achievement_points'],
+                'monthly_activity': payload['monthly_activity'],
+                'skill_distribution': payload['skill_distribution'],
+                # Peers' data changes independently, so rank against the live cohort
+                'comparative_ranking': get_cohort_ranking(student, payload['ranking_values']),
             }
         except Exception as e:
             # Handle any aggregation errors
@@ -350,14 +411,7 @@ def getStudentDetails(student):
             }
         
         # Add academic trend data
-        analytics['academic_trend'] = []
-        for record in academic_records[:6]:  # Last 6 semesters
-            analytics['academic_trend'].append({
-                'semester': f"{record.year}-{record.semester}",
-                'cgpa': float(record.cgpa) if record.cgpa else 0,
-                'sgpa': float(record.sgpa) if record.sgpa else 0,
-                'credits': record.credits_earned,
-            })
+        analytics['academic_trend'] = get_academic_trend(academic_records)
 
         return {
             "name": student.first_name,
@@ -369,30 +423,27 @@ def getStudentDetails(student):
             'profile_completion': profile_completion,
             'academic_records': academic_records,
             'latest_academic': latest_academic,
-            'achievements': serializers.serialize('json', achievements),
-            'achievements_summary': achievements_summary,
+            'achievements': _to_json(payload['achievements']),
+            'achievements_summary': payload['achievements_summary'],
             'achievement_points': analytics.get('achievement_points', 0),  # Add achievement_points at top level
-            'projects': serializers.serialize('json', projects),
-            'projects_length': len(projects),
-            'projects_summary': projects_summary,
-            'technical_certificates': serializers.serialize('json', technical_certificates),
-            'foreign_language_certificates': serializers.serialize('json', foreign_language_certificates),
-            'co_curricular_certificates': serializers.serialize('json', co_curricular_certificates),
-            'extra_curricular_certificates': serializers.serialize('json', extra_curricular_certificates),
-            'leetcode_data': leetcode_data,
-            'placement_offers': placement_offers,
+            'projects': _to_json(payload['projects']),
+            'projects_length': payload['projects_length'],
+            'projects_summary': payload['projects_summary'],
+            'technical_certificates': _to_json(payload['certificates']['technical']),
+            'foreign_language_certificates': _to_json(payload['certificates']['foreign_language']),
+            'co_curricular_certificates': _to_json(payload['certificates']['co_curricular']),
+            'extra_curricular_certificates': _to_json(payload['certificates']['extra_curricular']),
+            'leetcode_data': payload['leetcode_data'],
+            'placement_offers': payload['placement_offers'],
             'analytics': analytics,
-            'pending_approvals': ApprovalWorkflow.objects.filter(
-                student=student, 
-                current_status__in=['pending', 'under_review']
-            ).count(),
+            'pending_approvals': payload['pending_approvals'],
             'recent_notifications': EnhancedNotification.objects.filter(
                 recipient_student=student,
                 is_read=False
             )[:5],
             # Keep old keys for backward compatibility
-            'Technical': serializers.serialize('json', technical_certificates),
-            'Foreign_languages': serializers.serialize('json', foreign_language_certificates)
+            'Technical': _to_json(payload['certificates']['technical']),
+            'Foreign_languages': _to_json(payload['certificates']['foreign_language'])
         }
     except Exception as e:
         logging.error(f"Error in getStudentDetails: {e}")
@@ -401,152 +452,126 @@ def getStudentDetails(student):
 
 def get_monthly_activity(student):
     """Get monthly activity data for the last 12 months"""
-    from datetime import timedelta
-    
-    end_date = timezone.now()
-    start_date = end_date - timedelta(days=365)
-    
-    # Get activity counts by month
-    activities = []
-    
-    for i in range(12):
-        # Calculate proper month boundaries
-        target_month = now.month - i
-        target_year = now.year
-        
-        # Handle year rollover
-        while target_month <= 0:
-            target_month += 12
-            target_year -= 1
-        
-        # Create proper timezone-aware month boundaries
-        month_start = timezone.datetime(target_year, target_month, 1, tzinfo=now.tzinfo)
-        
-        # Calculate next month for end boundary
-        if target_month == 12:
-            next_month = 1
-            next_year = target_year + 1
-        else:
-            next_month = target_month + 1
-            next_year = target_year
-            
-        month_end = timezone.datetime(next_year, next_month, 1, tzinfo=now.tzinfo)
-        
-        # Count various activities for this month
-        certificates = Certificate.objects.filter(
-            rollno=student,
-            uploaded_at__gte=month_start,
-            uploaded_at__lt=month_end
-        ).count()
-        
-        achievements = Achievement.objects.filter(
-            student=student,
-            submission_date__gte=month_start,
-            submission_date__lt=month_end
-        ).count()
-        
-        activities.append({
-            'month': month_start.strftime('%b %Y'),
-            'certificates': certificates,
-            'achievements': achievements,
-            'total': certificates + achievements
-        })
-    
-    return activities
+    return get_activity_series(student)
 
 
 def get_skill_distribution(student_obj):
     """Get skill distribution from certificates and projects"""
-    skills = {}
-    
-    # Get skills from technical certificates
-    tech_certs = Certificate.objects.filter(rollno=student_obj, category='technical')
-    for cert in tech_certs:
-        if cert.domain:
-            skills[cert.domain] = skills.get(cert.domain, 0) + 1
-    
-    # Get technologies from projects
-    projects = Projects.objects.filter(contributors=student_obj)
-    for project in projects:
-        for tech in project.technologies.all():
-            skills[tech.name] = skills.get(tech.name, 0) + 1
-    
-    # Convert to list of dictionaries for frontend
-    return [{'skill': k, 'count': v} for k, v in sorted(skills.items(), key=lambda x: x[1], reverse=True)[:10]]
+    return skill_distribution(student_obj)
 
 
 def get_comparative_ranking(student_obj):
-    """Get student's ranking compared to peers"""
-    
-    # Get all students in same department and year
-    peers = student.objects.filter(dept=student_obj.dept, year=student_obj.year)
-    
-    # Calculate various metrics
-    cert_count = Certificate.objects.filter(rollno=student_obj).count()
-    project_count = Projects.objects.filter(contributors=student_obj).count()
-    achievement_count = Achievement.objects.filter(student=student_obj, status='approved').count()
-    
+    """Get student's ranking compared to dept/year peers"""
+    metrics = get_student_metrics(student_obj)
+    return get_cohort_ranking(student_obj, {
+        'certificates': metrics.total_certificates,
+        'projects': metrics.total_projects,
+        'achievements': metrics.approved_achievements,
+    })
+
+
+def _dashboard_shell_context(student_obj, section_url_name, *url_args):
+    """Context for the dashboard shell; sections are fetched by the page"""
+    from .models import AchievementCategory
     return {
-        'certificates': {
-            'student': cert_count,
-            'percentile': calculate_percentile(peers, cert_count, 'certificates')
+        'student': student_obj,
+        'leetcode_user': student_obj.leetcode_user,
+        'profile_completion': student_obj.profile_completion_percentage,
+        'achievement_categories': AchievementCategory.objects.filter(is_active=True),
+        'section_urls': {
+            section: reverse(section_url_name, args=[*url_args, section])
+            for section in DASHBOARD_SECTIONS
         },
-        'projects': {
-            'student': project_count,
-            'percentile': calculate_percentile(peers, project_count, 'projects')
-        },
-        'achievements': {
-            'student': achievement_count,
-            'percentile': calculate_percentile(peers, achievement_count, 'achievements')
-        }
     }
 
 
-def calculate_percentile(peers, student_value, metric_type):
-    """Calculate percentile ranking for a student"""
-    if not peers.exists():
-        return 50
-    
-    # Simple percentile calculation
-    better_count = 0
-    total_count = peers.count()
-    
-    for peer in peers:
-        if metric_type == 'certificates':
-            peer_value = Certificate.objects.filter(rollno=peer).count()
-        elif metric_type == 'projects':
-            peer_value = Projects.objects.filter(contributors=peer).count()
-        elif metric_type == 'achievements':
-            peer_value = Achievement.objects.filter(student=peer, status='approved').count()
-        else:
-            peer_value = 0
-        
-        if student_value > peer_value:
-            better_count += 1
-    
-    return int((better_count / total_count) * 100) if total_count > 0 else 50
-
-
 @login_required
 def dashboard(request):
     try:
-        context = getStudentDetails(request.user)
-        
-        # Add achievement categories for the modal form
-        from .models import AchievementCategory
-        context['achievement_categories'] = AchievementCategory.objects.filter(is_active=True)
-        
+        context = _dashboard_shell_context(request.user, 'dashboard_section')
         response = render(request, 'dashboard.html', context)
-        # Add cache control headers to prevent caching issues
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
+        # Sections are validated with ETags; browsers must still revalidate the shell
+        response['Cache-Control'] = 'private, no-cache'
         return response
     except Exception as e:
         logging.error(f"Error in dashboard: {e}")
         return HttpResponse("An error occurred.")
 
 
+def _dashboard_section_student(request, rollno=None):
+    """Resolve (and memoise on the request) whose dashboard a section belongs to"""
+    if not hasattr(request, '_dashboard_student'):
+        if rollno is None:
+            request._dashboard_student = request.user if isinstance(request.user, student) else None
+        elif request.user.type() == "Faculty":
+            request._dashboard_student = student.objects.filter(roll_no=rollno).first()
+        else:
+            request._dashboard_student = None
+    return request._dashboard_student
+
+
+def _dashboard_section_etag(request, section, rollno=None):
+    student_obj = _dashboard_section_student(request, rollno)
+    if student_obj is None or section not in DASHBOARD_SECTIONS:
+        return None
+    if section == 'notifications':
+        unread = EnhancedNotification.objects.filter(recipient_student=student_obj, is_read=False)
+        return dashboard_etag(student_obj, section, *unread.aggregate(n=Count('id'), last=Max('id')).values())
+    if section == 'analytics':
+        # Percentiles also move when peers' data changes
+        return dashboard_etag(student_obj, section, get_cohort_version(student_obj.dept, student_obj.year))
+    return dashboard_etag(student_obj, section)
+
+
+def get_dashboard_section(student_obj, section):
+    """JSON-ready data for one dashboard section"""
+    if section == 'notifications':
+        return {
+            'notifications': list(
+                EnhancedNotification.objects.filter(recipient_student=student_obj, is_read=False)
+                .order_by('-send_at')
+                .values('id', 'title', 'message', 'notification_type', 'priority',
+                        'action_url', 'action_text', 'send_at')[:5]
+            )
+        }
+
+    payload = get_dashboard_payload(student_obj, build_dashboard_payload)
+    if section == 'certificates':
+        return {'certificates': payload['certificates'], 'counts': payload['certificate_counts']}
+    if section == 'projects':
+        return {'projects': payload['projects'], 'summary': payload['projects_summary']}
+    if section == 'achievements':
+        return {'achievements': payload['achievements'], 'summary': payload['achievements_summary']}
+
+    academic_records = AcademicPerformance.objects.filter(student=student_obj).order_by('-year', '-semester')
+    return {
+        'projects_length': payload['projects_length'],
+        'achievement_points': payload['achievement_points'],
+        'total_certificates': sum(payload['certificate_counts'].values()),
+        'pending_approvals': payload['pending_approvals'],
+        'profile_completion': student_obj.profile_completion_percentage,
+        'monthly_activity': payload['monthly_activity'],
+        'skill_distribution': payload['skill_distribution'],
+        'comparative_ranking': get_cohort_ranking(student_obj, payload['ranking_values']),
+        'academic_trend': get_academic_trend(academic_records),
+    }
+
+
+@login_required
+@condition(etag_func=_dashboard_section_etag)
+def dashboard_section(request, section, rollno=None):
+    """One lazily loaded dashboard section, revalidated with If-None-Match"""
+    student_obj = _dashboard_section_student(request, rollno)
+    if student_obj is None:
+        return JsonResponse({'error': 'Not authorized'}, status=403)
+    if section not in DASHBOARD_SECTIONS:
+        return JsonResponse({'error': 'Unknown section'}, status=404)
+
+    response = JsonResponse(get_dashboard_section(student_obj, section))
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 # Achievement Management Views
 @login_required
 def add_achievement(request):
@@ -580,10 +605,7 @@ def add_achievement(request):
             
             messages.success(request, f'Achievement "{achievement.title}" has been submitted for approval!')
             
-            # Redirect to dashboard with cache busting parameter
-            from django.urls import reverse
-            import time
-            return redirect(f"{reverse('dashboard')}?t={int(time.time())}")
+            return redirect('dashboard')
             
         except Exception as e:
             logging.error(f"Error adding achievement: {e}")
@@ -918,13 +940,15 @@ def export_student_data(request):
     
     try:
         if data_type == 'students':
-            data = export_students_data(export_format)
+            data = export_students_data(request, export_format)
         elif data_type == 'achievements':
-            data = export_achievements_data(export_format)
+            data = export_achievements_data(request, export_format)
         elif data_type == 'certificates':
-            data = export_certificates_data(export_format)
+            data = export_certificates_data(request, export_format)
         elif data_type == 'projects':
-            data = export_projects_data(export_format)
+            data = export_projects_data(request, export_format)
+        elif data_type == 'placements':
+            data = export_placements_data(request, export_format)
         else:
             return HttpResponse("Invalid data type", status=400)
         
@@ -935,85 +959,84 @@ def export_student_data(request):
         return HttpResponse("Error exporting data", status=500)
 
 
+def _wants_gzip(request):
+    # Background jobs call the exporters without a request
+    return request is not None and request.GET.get('gzip') in ('1', 'true', 'yes')
+
+
+def _stream_format(format_type):
+    # Anything other than CSV has always been served as JSON
+    return 'csv' if format_type == 'csv' else 'json'
+
+
+def _incremental_export(request, queryset, fields, filename, format_type):
+    """Full export, or only what changed after ?since=<watermark>; see delta_export"""
+    since = request.GET.get('since') if request is not None else None
+    if since is None:
+        cutoff = export_cutoff()
+        response = streaming_export(
+            queryset.order_by('pk'), fields, filename, _stream_format(format_type), compress=_wants_gzip(request)
+        )
+        response[WATERMARK_HEADER] = format_watermark(cutoff)
+        return response
+
+    try:
+        since = parse_watermark(since)
+    except ValueError as e:
+        return HttpResponse(str(e), status=400)
+    return delta_export(queryset, fields, filename, since, _stream_format(format_type), compress=_wants_gzip(request))
+
+
 def export_students_data(request, format_type):
     """Export students data"""
-    students = student.objects.all().values(
+    if request is not None and 'since' in request.GET:
+        return HttpResponse("Incremental export is not available for students", status=400)
+
+    fields = [
         'username', 'first_name', 'last_name', 'email', 'dept', 'year', 'section',
         'current_cgpa', 'total_credits', 'profile_completion_percentage'
-    )
-    
-    if format_type == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="students.csv"'
-        
-        df = pd.DataFrame(list(students))
-        df.to_csv(response, index=False)
-        return response
+    ]
     
-    elif format_type == 'excel':
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="students.xlsx"'
-        
-        df = pd.DataFrame(list(students))
-        df.to_excel(response, index=False)
-        return response
+    if format_type == 'excel':
+        rows = student.objects.order_by('pk').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return xlsx_response(rows, fields, 'students.xlsx')
     
-    elif format_type == 'json':
-        return JsonResponse(list(students), safe=False)
+    return streaming_export(
+        student.objects.order_by('pk'), fields, 'students', _stream_format(format_type), compress=_wants_gzip(request)
+    )
 
 
 def export_achievements_data(request, format_type):
     """Export achievements data"""
-    achievements = Achievement.objects.select_related('student', 'category').values(
+    fields = [
         'student__username', 'student__first_name', 'category__name',
         'title', 'description', 'status', 'points_awarded', 'submission_date'
-    )
-    
-    if format_type == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="achievements.csv"'
-        
-        df = pd.DataFrame(list(achievements))
-        df.to_csv(response, index=False)
-        return response
-    
-    return JsonResponse(list(achievements), safe=False)
-
+    ]
+    return _incremental_export(request, Achievement.objects.all(), fields, 'achievements', format_type)
 
 
 def export_certificates_data(request, format_type):
     """Export certificates data"""
-    certificates = Certificate.objects.select_related('rollno').values(
-        'rollno__username', 'rollno__first_name', 'title', 'category', 
+    fields = [
+        'rollno__username', 'rollno__first_name', 'title', 'category',
         'source', 'domain', 'year_and_sem', 'uploaded_at'
-    )
-    
-    if format_type == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="certificates.csv"'
-        
-        df = pd.DataFrame(list(certificates))
-        df.to_csv(response, index=False)
-        return response
-    
-    return JsonResponse(list(certificates), safe=False)
+    ]
+    return _incremental_export(request, Certificate.objects.all(), fields, 'certificates', format_type)
 
 
 def export_projects_data(request, format_type):
     """Export projects data"""
-    projects = Projects.objects.select_related().values(
-        'title', 'description', 'status', 'year_and_sem', 'github_link'
-    )
-    
-    if format_type == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="projects.csv"'
-        
-        df = pd.DataFrame(list(projects))
-        df.to_csv(response, index=False)
-        return response
-    
-    return JsonResponse(list(projects), safe=False)
+    fields = ['title', 'description', 'status', 'year_and_sem', 'github_link']
+    return _incremental_export(request, Projects.objects.all(), fields, 'projects', format_type)
+
+
+def export_placements_data(request, format_type):
+    """Export placement offers data"""
+    fields = [
+        'student__roll_no', 'student__first_name', 'company', 'package',
+        'offer_date', 'placement_year', 'placement_type', 'accepted'
+    ]
+    return _incremental_export(request, PlacementOffer.objects.all(), fields, 'placements', format_type)
 
 
 # Portfolio Generation System
@@ -1021,26 +1044,13 @@ def export_projects_data(request, format_type):
 def generate_portfolio(request):
     """Generate student portfolio in PDF/Web format"""
     try:
-        student_data = getStudentDetails(request.user)
-        
-        # Calculate portfolio metrics
-        portfolio_data = {
-            'student': request.user,
-            'academic_summary': get_academic_summary(request.user),
-            'achievement_summary': get_achievement_summary(request.user),
-            'project_highlights': get_project_highlights(request.user),
-            'skill_matrix': get_skill_matrix(request.user),
-            'certifications': get_certification_summary(request.user),
-            'generated_date': timezone.now(),
-            'verification_code': generate_verification_code(request.user)
-        }
+        if request.GET.get('format', 'web') == 'pdf':
+            return generate_pdf_portfolio(request, request.user)
         
-        format_type = request.GET.get('format', 'web')
+        # Reused from disk until the student's data changes
+        portfolio_data = cached_portfolio_context(request.user, lambda: build_portfolio_context(request.user))
         
-        if format_type == 'pdf':
-            return generate_pdf_portfolio(portfolio_data)
-        else:
-            return render(request, 'portfolio.html', portfolio_data)
+        return render(request, 'portfolio.html', {**portfolio_data, **portfolio_stamp(request.user), 'student': request.user})
             
     except Exception as e:
         logging.error(f"Error generating portfolio: {e}")
@@ -1048,200 +1058,29 @@ def generate_portfolio(request):
         return redirect('dashboard')
 
 
-def get_academic_summary(student_obj):
-    """Get academic performance summary"""
-    latest_record = AcademicPerformance.objects.filter(student=student_obj).order_by('-year', '-semester').first()
-    
-    return {
-        'current_cgpa': latest_record.cgpa if latest_record else student_obj.current_cgpa,
-        'total_credits': latest_record.total_credits if latest_record else student_obj.total_credits,
-        'current_year': student_obj.year,
-        'department': student_obj.dept,
-        'class_rank': latest_record.class_rank if latest_record else None,
-        'attendance': latest_record.attendance_percentage if latest_record else None
-    }
-
-
-def get_achievement_summary(student_obj):
-    """Get achievements summary"""
-    achievements = Achievement.objects.filter(student=student_obj, status='approved')
-    
-    # Calculate total points manually to avoid aggregation issues
-    total_points = 0
-    for achievement in achievements:
-        if achievement.points_awarded:
-            total_points += achievement.points_awarded
-    
-    summary = {
-        'total_achievements': achievements.count(),
-        'total_points': total_points,
-        'categories': {},
-        'recent_achievements': achievements.order_by('-achievement_date')[:5]
-    }
-    
-    # Group by category
-    for achievement in achievements:
-        category = achievement.category.name
-        if category not in summary['categories']:
-            summary['categories'][category] = 0
-        summary['categories'][category] += 1
-    
-    return summary
-
-
-def get_project_highlights(student_obj):
-    """Get project highlights"""
-    projects = Projects.objects.filter(contributors=student_obj)
-    
-    return {
-        'total_projects': projects.count(),
-        'completed_projects': projects.filter(status='Completed').count(),
-        'technologies_used': list(set([tech.name for project in projects for tech in project.technologies.all()])),
-        'featured_projects': projects.filter(status='Completed').order_by('-id')[:3]
-    }
-
-
-def get_skill_matrix(student_obj):
-    """Get comprehensive skill matrix"""
-    skills = {
-        'technical': [],
-        'programming': [],
-        'certifications': [],
-        'soft_skills': []
-    }
-    
-    # Technical skills from projects
-    projects = Projects.objects.filter(contributors=student_obj)
-    for project in projects:
-        for tech in project.technologies.all():
-            if tech.name not in skills['programming']:
-                skills['programming'].append(tech.name)
-    
-    # Skills from certificates
-    certs = Certificate.objects.filter(rollno=student_obj, category='technical')
-    for cert in certs:
-        if cert.domain and cert.domain not in skills['technical']:
-            skills['technical'].append(cert.domain)
-    
-    # Skills from student profile
-    if student_obj.technical_skills:
-        skills['technical'].extend([skill.strip() for skill in student_obj.technical_skills.split(',')])
-    
-    if student_obj.soft_skills:
-        skills['soft_skills'] = [skill.strip() for skill in student_obj.soft_skills.split(',')]
-    
-    return skills
-
-
-def get_certification_summary(student_obj):
-    """Get certification summary"""
-    certs = Certificate.objects.filter(rollno=student_obj)
-    
-    summary = {
-        'total_certificates': certs.count(),
-        'by_category': {},
-        'recent_certifications': certs.order_by('-uploaded_at')[:5],
-        'top_providers': {}
-    }
-    
-    # Group by category
-    for cert in certs:
-        if cert.category not in summary['by_category']:
-            summary['by_category'][cert.category] = 0
-        summary['by_category'][cert.category] += 1
-        
-        if cert.source not in summary['top_providers']:
-            summary['top_providers'][cert.source] = 0
-        summary['top_providers'][cert.source] += 1
-    
-    return summary
-
-
-def generate_verification_code(student_obj):
-    """Generate unique verification code for portfolio"""
-    import hashlib
-    
-    data = f"{student_obj.username}_{timezone.now().strftime('%Y%m%d')}"
-    return hashlib.md5(data.encode()).hexdigest()[:8]
+def build_portfolio_context(student_obj):
+    """Portfolio page context without the student itself; plain enough to pickle"""
+    return assemble_portfolio(student_obj)
 
 
-def generate_pdf_portfolio(portfolio_data):
+def generate_pdf_portfolio(request, student_obj):
     """Generate PDF portfolio using reportlab"""
     try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        from io import BytesIO
-        
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-        
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=1,  # Center alignment
-            textColor=colors.HexColor('#2E86AB')
+        etag = portfolio_etag(student_obj)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        
+        def render_pdf():
+            return render_portfolio_pdf(collect_portfolio_data(student.objects.filter(pk=student_obj.pk))[0])
+        
+        # Rendered once per version of the student's data, then served from disk
+        response = FileResponse(
+            open(cached_portfolio_pdf(student_obj, render_pdf), 'rb'),
+            as_attachment=True, filename=f'portfolio_{student_obj.username}.pdf', content_type='application/pdf',
         )
-        story.append(Paragraph(f"Academic Portfolio - {portfolio_data['student'].first_name} {portfolio_data['student'].last_name}", title_style))
-        story.append(Spacer(1, 12))
-        
-        # Student Information
-        student_info = [
-            ['Name:', f"{portfolio_data['student'].first_name} {portfolio_data['student'].last_name}"],
-            ['Roll Number:', portfolio_data['student'].roll_no],
-            ['Department:', portfolio_data['student'].dept],
-            ['Year:', str(portfolio_data['student'].year)],
-            ['Email:', portfolio_data['student'].email],
-            ['Current CGPA:', str(portfolio_data['academic_summary']['current_cgpa'] or 'N/A')],
-        ]
-        
-        student_table = Table(student_info, colWidths=[2*inch, 3*inch])
-        student_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(student_table)
-        story.append(Spacer(1, 20))
-        
-        # Achievement Summary
-        story.append(Paragraph("Achievement Summary", styles['Heading2']))
-        achievement_data = portfolio_data['achievement_summary']
-        story.append(Paragraph(f"Total Achievements: {achievement_data['total_achievements']}", styles['Normal']))
-        story.append(Paragraph(f"Total Points Earned: {achievement_data['total_points']}", styles['Normal']))
-        story.append(Spacer(1, 12))
-        
-        # Project Summary
-        story.append(Paragraph("Project Portfolio", styles['Heading2']))
-        project_data = portfolio_data['project_highlights']
-        story.append(Paragraph(f"Total Projects: {project_data['total_projects']}", styles['Normal']))
-        story.append(Paragraph(f"Completed Projects: {project_data['completed_projects']}", styles['Normal']))
-        story.append(Spacer(1, 12))
-        
-        # Verification
-        story.append(Spacer(1, 20))
-        story.append(Paragraph(f"Verification Code: {portfolio_data['verification_code']}", styles['Normal']))
-        story.append(Paragraph(f"Generated on: {portfolio_data['generated_date'].strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-        
-        doc.build(story)
-        buffer.seek(0)
-        
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="portfolio_{portfolio_data["student"].username}.pdf"'
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
         return response
         
     except ImportError:
@@ -1253,6 +1092,36 @@ def generate_pdf_portfolio(portfolio_data):
         return redirect('dashboard')
 
 
+def portfolio_selection(params):
+    """Students of a batch portfolio request ({'dept', 'year', 'section'}, all optional)"""
+    return portfolio_students(params.get('dept'), params.get('year'), params.get('section'))
+
+
+def portfolios_response(students, progress=None, workers=1):
+    """Streamed ZIP of the students' portfolio PDFs, rendered serially unless given workers; run as a report job"""
+    portfolios = collect_portfolio_data(students)
+    response = StreamingHttpResponse(iter_portfolio_zip(portfolios, workers, progress), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="portfolios_{timezone.now():%Y%m%d_%H%M%S}.zip"'
+    return response
+
+
+@login_required
+def download_portfolios(request):
+    """
+    Queue the batch portfolio ZIP of a dept/year/section selection and
+    redirect to the job's status; rendering a section takes too long for a
+    web request.
+    """
+    if not request.user.is_superuser and request.user.type() != "Faculty":
+        return HttpResponse("Unauthorized", status=403)
+
+    params = {key: request.GET[key] for key in ('dept', 'year', 'section') if request.GET.get(key)}
+    if not portfolio_selection(params).exists():
+        return JsonResponse({'error': 'No students match the selection'}, status=400)
+    job = submit_job('portfolios', params, request.user)
+    return redirect('report_job_status', job.pk)
+
+
 # Compliance and Accreditation Reports
 @login_required
 def compliance_reports(request):
@@ -1261,11 +1130,12 @@ def compliance_reports(request):
         return HttpResponse("Unauthorized", status=403)
     
     report_type = request.GET.get('type', 'naac')
-    year = request.GET.get('year', timezone.now().year)
+    year = _compliance_year(request.GET.get('year'))
     
     try:
         if report_type == 'naac':
-            data = generate_naac_report(year)
+            # Read from the precomputed snapshots; see compliance_service
+            data = compliance_summary(year)
         elif report_type == 'nba':
             data = generate_nba_report(year)
         elif report_type == 'aicte':
@@ -1279,6 +1149,10 @@ def compliance_reports(request):
             'report_type': report_type,
             'year': year,
             'data': data,
+            'activity_trend': get_activity_series(
+                {'admission_year': year},
+                sources=('certificates', 'achievements', 'placements')
+            ),
             'generated_at': timezone.now()
         })
         
@@ -1288,197 +1162,39 @@ def compliance_reports(request):
         return redirect('admin_dashboard')
 
 
-def generate_naac_report(year):
-    """Generate NAAC compliance report"""
-    total_students = student.objects.filter(admission_year=year).count()
-    
-    # Student participation metrics
-    participation_metrics = {
-        'total_students': total_students,
-        'students_with_achievements': Achievement.objects.filter(
-            student__admission_year=year, 
-            status='approved'
-        ).values('student').distinct().count(),
-        'students_with_certifications': Certificate.objects.filter(
-            rollno__admission_year=year
-        ).values('rollno').distinct().count(),
-        'students_with_projects': Projects.objects.filter(
-            contributors__admission_year=year
-        ).values('contributors').distinct().count(),
-    }
-    
-    # Calculate participation percentages
-    participation_metrics['achievement_participation_rate'] = (
-        participation_metrics['students_with_achievements'] / total_students * 100
-    ) if total_students > 0 else 0
-    
-    participation_metrics['certification_participation_rate'] = (
-        participation_metrics['students_with_certifications'] / total_students * 100
-    ) if total_students > 0 else 0
-    
-    # Quality metrics
-    quality_metrics = {
-        'avg_cgpa': student.objects.filter(admission_year=year).aggregate(
-            Avg('current_cgpa')
-        )['current_cgpa__avg'] or 0,
-        'students_above_8_cgpa': student.objects.filter(
-            admission_year=year, 
-            current_cgpa__gte=8.0
-        ).count(),
-        'placement_rate': calculate_placement_rate(year),
-    }
-    
-    # Co-curricular activities
-    cocurricular_metrics = {
-        'technical_events': Achievement.objects.filter(
-            student__admission_year=year,
-            category__name__icontains='technical'
-        ).count(),
-        'cultural_events': Achievement.objects.filter(
-            student__admission_year=year,
-            category__name__icontains='cultural'
-        ).count(),
-        'sports_events': Achievement.objects.filter(
-            student__admission_year=year,
-            category__name__icontains='sports'
-        ).count(),
-    }
-    
-    return {
-        'participation_metrics': participation_metrics,
-        'quality_metrics': quality_metrics,
-        'cocurricular_metrics': cocurricular_metrics,
-        'year': year
-    }
+def _compliance_year(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return timezone.now().year
+
+
+@login_required
+@require_POST
+def refresh_compliance_snapshot(request):
+    """Recompute the NAAC compliance snapshots of one admission year"""
+    if not request.user.is_superuser and request.user.type() != "Faculty":
+        return HttpResponse("Unauthorized", status=403)
+
+    year = _compliance_year(request.POST.get('year'))
+    refresh_compliance_snapshots([year])
+    messages.success(request, f'Compliance metrics for {year} recomputed.')
+    return redirect(f"{reverse('compliance_reports')}?type=naac&year={year}")
 
 
 def generate_nba_report(year):
     """Generate NBA outcome-based education report"""
-    students = student.objects.filter(admission_year=year)
-    
-    # Program Outcomes assessment
-    program_outcomes = {
-        'engineering_knowledge': assess_engineering_knowledge(students),
-        'problem_analysis': assess_problem_analysis(students),
-        'design_solutions': assess_design_solutions(students),
-        'research_skills': assess_research_skills(students),
-        'modern_tools': assess_modern_tools(students),
-        'professional_ethics': assess_professional_ethics(students),
-        'communication': assess_communication_skills(students),
-        'project_management': assess_project_management(students),
-        'lifelong_learning': assess_lifelong_learning(students),
-    }
-    
-    # Course outcomes mapping
-    course_outcomes = map_course_outcomes(students)
-    
-    # Assessment methods
-    assessment_data = {
-        'continuous_assessment': get_continuous_assessment_data(students),
-        'project_assessment': get_project_assessment_data(students),
-        'industry_assessment': get_industry_assessment_data(students),
-    }
+    cohort = assess_cohort(student.objects.filter(admission_year=year))
     
     return {
-        'program_outcomes': program_outcomes,
-        'course_outcomes': course_outcomes,
-        'assessment_data': assessment_data,
+        'program_outcomes': cohort['program_outcomes'],
+        # Courses are not recorded, so there is nothing to map outcomes onto yet
+        'course_outcomes': {},
+        'assessment_data': cohort['assessment_data'],
+        'students': cohort['students'],
         'year': year
     }
 
-
-def calculate_placement_rate(year):
-    """Calculate placement rate for given year"""
-    total_students = student.objects.filter(
-        admission_year=year,
-        graduation_status='current'
-    ).count()
-    
-    placed_students = PlacementOffer.objects.filter(
-        student__admission_year=year
-    ).values('student').distinct().count()
-    
-    return (placed_students / total_students * 100) if total_students > 0 else 0
-
-
-# Helper functions for NBA assessment
-def assess_engineering_knowledge(students):
-    """Assess engineering knowledge through technical certifications and projects"""
-    total = students.count()
-    if total == 0:
-        return 0
-    
-    qualified = 0
-    for student in students:
-        tech_certs = Certificate.objects.filter(rollno=student, category='technical').count()
-        projects = Projects.objects.filter(contributors=student).count()
-        
-        # Criteria: At least 2 technical certifications OR 3 completed projects
-        if tech_certs >= 2 or projects >= 3:
-            qualified += 1
-    
-    return (qualified / total) * 100
-
-
-def assess_problem_analysis(students):
-    """Assess problem analysis through project complexity and research"""
-    total = students.count()
-    if total == 0:
-        return 0
-    
-    qualified = 0
-    for student in students:
-        complex_projects = Projects.objects.filter(
-            contributors=student,
-            status='Completed'
-        ).count()
-        
-        research_achievements = Achievement.objects.filter(
-            student=student,
-            category__name__icontains='research',
-            status='approved'
-        ).count()
-        
-        if complex_projects >= 2 or research_achievements >= 1:
-            qualified += 1
-    
-    return (qualified / total) * 100
-
-
-# Continue with other assessment functions...
-def assess_design_solutions(students):
-    return 75  # Placeholder
-
-def assess_research_skills(students):
-    return 70  # Placeholder
-
-def assess_modern_tools(students):
-    return 80  # Placeholder
-
-def assess_professional_ethics(students):
-    return 85  # Placeholder
-
-def assess_communication_skills(students):
-    return 75  # Placeholder
-
-def assess_project_management(students):
-    return 70  # Placeholder
-
-def assess_lifelong_learning(students):
-    return 90  # Placeholder
-
-def map_course_outcomes(students):
-    return {}  # Placeholder
-
-def get_continuous_assessment_data(students):
-    return {}  # Placeholder
-
-def get_project_assessment_data(students):
-    return {}  # Placeholder
-
-def get_industry_assessment_data(students):
-    return {}  # Placeholder
-
 def generate_aicte_report(year):
     """Generate AICTE compliance report"""
     return {'message': 'AICTE report coming soon'}
@@ -1767,12 +1483,7 @@ def add_certification(request):
                 return redirect('dashboard')
             
             messages.success(request, f"{category.replace('_', ' ').title()} certificate added successfully!")
-            # Add a timestamp to prevent caching issues
-            from django.urls import reverse
-            from django.http import HttpResponseRedirect
-            import time
-            dashboard_url = reverse('dashboard')
-            return HttpResponseRedirect(f"{dashboard_url}?t={int(time.time())}")
+            return redirect('dashboard')
             
         return render(request, 'dashboard.html')
     except Exception as e:
@@ -2045,58 +1756,16 @@ def faculty(request):
         # Get department choices
         departments = [choice[0] for choice in student.DEPT_CHOICES]
 
-        studentData = list(
-            student.objects.filter(is_superuser=False)
-            .annotate(
-                project_count=Count('projects', distinct=True),
-                certificate_count=Count('certificates', distinct=True)
-            )
-            .values(
-                'roll_no', 'first_name', 'dept', 'year', 'section',
-                'studentrollno__TotalProblems',  # double-check this name
-                'project_count', 'certificate_count', 'mentor__first_name'
-            )
-        )
-        
-        # Add additional information to each student
-        for student_data in studentData:
-            student_obj = student.objects.get(roll_no=student_data['roll_no'])
-            
-            # Certificate provider information
-            student_certificates = Certificate.objects.filter(rollno=student_obj)
-            student_providers = []
-            student_domains = []
-            student_cert_categories = []
-            
-            for cert in student_certificates:
-                if cert.source:
-                    student_providers.append(cert.source)
-                if cert.domain:
-                    student_domains.append(cert.domain)
-                student_cert_categories.append(cert.category)
-            
-            student_data['certificate_providers'] = list(set(student_providers))
-            student_data['domains'] = list(set(student_domains))
-            student_data['certificate_categories'] = list(set(student_cert_categories))
-            
-            # Technology information from projects only (certificates don't have technologies field)
-            student_technologies = []
-            
-            # Get technologies from projects
-            student_projects = Projects.objects.filter(contributors=student_obj)
-            for project in student_projects:
-                project_techs = project.technologies.all().values_list('name', flat=True)
-                student_technologies.extend(project_techs)
-            
-            student_data['technologies'] = list(set(student_technologies))
-            
-            # Project status information
-            student_project_statuses = list(student_projects.values_list('status', flat=True))
-            student_data['project_statuses'] = list(set(student_project_statuses))
-            
+        # Rows are fetched page by page from faculty_students_api; land on the
+        # faculty member's own cohort
+        default_filters = {}
+        if getattr(request.user, 'default_year', None):
+            default_filters['year'] = request.user.default_year
+        if getattr(request.user, 'default_section', None):
+            default_filters['section'] = request.user.default_section
         
         return render(request, 'faculty_dashboard.html', {
-            'studentData': studentData,
+            'default_filters': default_filters,
             'certificate_providers': all_providers,
             'technologies': technologies,
             'domains': domains,
@@ -2109,6 +1778,43 @@ def faculty(request):
     except Exception as e:
         logging.error(f"Error in faculty: {e}")
         return HttpResponse("An error occurred.")
+@login_required
+def faculty_students_api(request):
+    """
+    Filtered, sorted, keyset-paginated faculty grid with facet counts.
+
+    Filters: dept, year, section, mentor, provider, domain, technology,
+    category, status (repeat a parameter to OR values), q, min_leetcode,
+    min_projects, min_certificates. Paging: sort, cursor, limit.
+    """
+    if request.user.type() != "Faculty":
+        return JsonResponse({'error': 'Not authorized'}, status=403)
+
+    try:
+        limit = min(int(request.GET.get('limit') or GRID_PAGE_SIZE), GRID_MAX_PAGE_SIZE)
+        index = get_facet_index()
+        students_qs = filter_grid_students(request.GET, facet_index=index)
+        rows, next_cursor = grid_page(
+            students_qs,
+            sort=request.GET.get('sort') or 'roll_no',
+            cursor=request.GET.get('cursor'),
+            limit=limit,
+        )
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'error': f'Invalid parameter: {e}'}, status=400)
+
+    response = {'results': rows, 'next_cursor': next_cursor}
+    # Totals and facets only change with the filters, so only the first page carries them
+    if not request.GET.get('cursor'):
+        if has_sql_only_filters(request.GET):
+            matching = mask_of(students_qs.values_list('pk', flat=True))
+        else:
+            matching = index.match(grid_facet_filters(request.GET))
+        response['total'] = matching.bit_count()
+        response['facets'] = index.facet_counts(matching)
+    return JsonResponse(response)
+
+
 ############################### DEMO #############################
 from django.shortcuts import render, redirect
 from .forms import CertificateForm
@@ -2339,37 +2045,9 @@ def leetcode_request(request, leetcode_user):
 
 def download_request(request):
     try:
-        list = request.body
-        list = json.loads(list)
-        students = student.objects.filter(roll_no__in=list)
-        data = []
-        for stu in students:
-            leetcode = LeetCode.objects.get(rollno=stu)
-            technical = Certificate.objects.filter(rollno=stu, category="Technical")
-            foreign = Certificate.objects.filter(rollno=stu, category="Foreign Language")
-            projects = Projects.objects.filter(rollno=stu)
-            data.append({
-                'Roll No': stu.roll_no,
-                'Student Name': stu.first_name,
-                'Department': stu.dept,
-                'Section': stu.section,
-                'Year': stu.year,
-                'Total Count': leetcode.TotalProblems,
-                'Projects': ",".join([project.title for project in projects]),
-                'Foreign Languages': ",".join([project.title for project in foreign]),
-                'Technical Certificates': ",".join([project.title for project in technical]),
-            })
-
-        df = pd.DataFrame(data)
-
-        # Create a response object and specify the content type for Excel
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename=students.xlsx'
-
-        # Write the DataFrame to the response object as an Excel file
-        df.to_excel(response, index=False)
-
-        return response
+        roll_numbers = json.loads(request.body)
+        rows = iter_selection_rows(student.objects.filter(roll_no__in=roll_numbers))
+        return xlsx_response(rows, SELECTION_EXPORT_HEADERS, 'students.xlsx')
     except Exception as e:
         logging.error(f"Error in download_request: {e}")
         return HttpResponse("An error occurred.")
@@ -2377,7 +2055,9 @@ def download_request(request):
 def studentView(request, rollno):
     try:
         if request.user.type() == "Faculty":
-            context = getStudentDetails(student.objects.get(roll_no=rollno))
+            context = _dashboard_shell_context(
+                student.objects.get(roll_no=rollno), 'student_dashboard_section', rollno
+            )
             return render(request, 'dashboard.html', context=context)
         return HttpResponse("<h1>You are not authorized to view this page. Redirecting...</h1>\n<script>setTimeout( () => {window.location.href='/';}, 2000)</script>")
     except Exception as e:
@@ -2585,19 +2265,7 @@ def student_profile(request):
         # Save changes if any fields were updated
         if updated_fields:
             try:
-                # Update profile completion percentage
-                total_fields = 20  # Total number of profile fields
-                filled_fields = sum([
-                    1 for field in [
-                        user.first_name, user.username, user.email, user.personal_email,
-                        user.phone, user.date_of_birth, user.roll_no, user.dept,
-                        user.year, user.section, user.current_cgpa, user.admission_year,
-                        user.leetcode_user, user.githublink, user.linkedin_url, user.portfolio_url,
-                        user.technical_skills, user.career_interests, user.guardian_name, user.address
-                    ] if field and str(field).strip() not in ['', 'Username']
-                ])
-                user.profile_completion_percentage = int((filled_fields / total_fields) * 100)
-                
+                # Profile completion is recalculated by the pre_save hook
                 user.save()
                 messages.success(request, f"Profile updated successfully! {len(updated_fields)} field(s) changed.")
             except Exception as e:
@@ -2689,6 +2357,7 @@ def placement_dashboard(request):
         proj_data = proj_data.filter(domain__icontains=domain)
 
     context = {
+        'activity_trend': get_activity_series(sources=('placements', 'certificates', 'achievements')),
         'leetcode_data': list(leetcode_data.values('rollno__dept').annotate(avg_total=Avg('TotalProblems'))),
         'cert_data': list(cert_data.values('rollno__dept', 'category').annotate(count=Count('id'))),
         'proj_data': list(proj_data.values('year_and_sem').annotate(total=Count('id'))),
@@ -3085,185 +2754,161 @@ from django.views.decorators.csrf import csrf_exempt
 from django.db.models import Count, Q
 import traceback
 
-def generate_orm_from_query(query):
+_gemini_model = None
+
+
+def get_gemini_model():
+    """The Gemini client, configured once per process"""
+    global _gemini_model
+    if _gemini_model is None:
+        import google.generativeai as genai
+        import os
+        from django.conf import settings
+        
+        genai.configure(api_key=getattr(settings, 'GEMINI_API_KEY', os.environ.get('GEMINI_API_KEY')))
+        _gemini_model = genai.GenerativeModel('gemini-pro')
+    return _gemini_model
+
+
+def generate_plan_from_query(query):
     """
-    Advanced query-to-ORM mapping using Google Gemini AI.
-    Converts natural language queries to Django ORM strings with better accuracy.
+    Natural-language query to a JSON query plan (see flexon_plan) using Google Gemini AI.
+    Raises when Gemini is unavailable or does not return JSON; the plan itself
+    is validated when it is compiled.
+    """
+    model = get_gemini_model()
+    
+    # The plan whitelist is the schema the model is told about
+    prompt = f"""
+    Convert this question about college records into a JSON query plan.
+    
+    Models and the fields a plan may use; follow relations with double underscores
+    (e.g. projects__technologies__name):
+    {describe_schema()}
+    
+    Plan keys, all optional except "model":
+    - "model": one of the models above
+    - "filters" / "exclude": {{"field__lookup": value}}, lookups: {', '.join(sorted(LOOKUPS))}
+    - "any": a list of filter objects, any one of which may match
+    - "annotations": {{"alias": {{"function": "count|sum|avg|max|min", "field": "...", "distinct": true, "filter": {{...}}}}}};
+      filters and ordering may use the aliases; an annotation's field and filter may follow at most one
+      to-many relation (e.g. projects__status, not projects__technologies__name)
+    - "group_by": fields to group by; columns and ordering may then only use these and the aliases
+    - "columns": fields to return
+    - "ordering": fields or aliases, "-" prefix for descending
+    - "limit": number of rows, at most {max_rows()}
+    
+    Example plans:
+    - {{"model": "student", "filters": {{"dept": "CSE"}}, "ordering": ["roll_no"]}}
+    - {{"model": "LeetCode", "ordering": ["-TotalProblems"], "limit": 10}}
+    - {{"model": "student", "group_by": ["dept"], "annotations": {{"total": {{"function": "count", "field": "id"}}}}}}
+    
+    Return ONLY the JSON object, no explanations.
+    
+    Query: {query}
+    Plan:
     """
-    import google.generativeai as genai
-    import os
-    from django.conf import settings
     
-    try:
-        # Configure Gemini AI
-        genai.configure(api_key=getattr(settings, 'GEMINI_API_KEY', os.environ.get('GEMINI_API_KEY')))
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Database schema context for better ORM generation
-        schema_context = """
-        Available Django Models and their fields:
-        
-        1. student (Main student model):
-           - roll_no, name, email, dept, year, sem, phone, mentor
-           - Related: projects, certificate, leetcode, placementoffer
-        
-        2. Projects:
-           - rollno (FK to student), title, description, github_link, year, sem
-           - Related: technologies (M2M with Technology)
-        
-        3. Certificate:
-           - rollno (FK to student), title, source, course_provider, category, year, sem
-        
-        4. LeetCode:
-           - rollno (FK to student), TotalProblems, Easy, Medium, Hard
-        
-        5. Technology:
-           - name (unique technology name like 'Python', 'Java', etc.)
-        
-        6. Placement:
-           - rollno (FK to student), company, package, status
-        
-        7. PlacementOffer:
-           - rollno (FK to student), company, package, offer_type
-        
-        8. Faculty:
-           - name, email, department, designation
-        
-        Common Django ORM patterns:
-        - Filtering: Model.objects.filter(field__condition=value)
-        - Annotations: Model.objects.annotate(alias=Count/Sum/Avg('related_field'))
-        - Ordering: .order_by('field') or .order_by('-field') for descending
-        - Relationships: Use double underscore __ for foreign keys
-        - Aggregation functions: Count, Sum, Avg, Max, Min
-        - Q objects for complex queries: Q(condition1) & Q(condition2)
-        
-        Important: Only generate READ-ONLY ORM queries. No create, update, delete operations.
-        """
-        
-        prompt = f"""
-        {schema_context}
-        
-        Convert this natural language query to Django ORM code:
-        "{query}"
-        
-        Requirements:
-        1. Return ONLY the ORM query string, no explanations
-        2. Use proper Django ORM syntax
-        3. Handle relationships correctly with double underscores
-        4. Apply appropriate filters, annotations, and ordering
-        5. Limit results to 50 records maximum using [:50] if needed
-        6. Use select_related() for foreign keys when appropriate
-        7. Use prefetch_related() for many-to-many relationships when needed
-        
-        Example outputs:
-        - "student.objects.filter(dept='CSE').order_by('roll_no')[:50]"
-        - "LeetCode.objects.select_related('rollno').order_by('-TotalProblems')[:10]"
-        - "Projects.objects.prefetch_related('technologies').filter(technologies__name__icontains='python')"
-        
-        Query: {query}
-        ORM:
-        """
-        
-        response = model.generate_content(prompt)
-        orm_query = response.text.strip()
-        
-        # Clean up the response - remove any markdown formatting or extra text
-        if '```' in orm_query:
-            import re
-            code_blocks = re.findall(r'```(?:python)?\s*(.*?)\s*```', orm_query, re.DOTALL)
-            if code_blocks:
-                orm_query = code_blocks[0].strip()
-        
-        # Remove any leading/trailing quotes
-        orm_query = orm_query.strip('"\'')
-        
-        # Validate that it's a proper ORM query
-        if not orm_query or not any(model in orm_query for model in ['student.objects', 'Projects.objects', 'Certificate.objects', 'LeetCode.objects', 'Placement.objects', 'Technology.objects', 'Faculty.objects']):
-            raise ValueError("Invalid ORM query generated")
-        
-        return orm_query
-        
-    except Exception as e:
-        print(f"Gemini AI error: {e}")
-        # Fallback to basic keyword matching if Gemini fails
-        return _generate_fallback_orm(query)
+    response = model.generate_content(prompt)
+    plan = response.text.strip()
+    
+    # Clean up the response - remove any markdown formatting or extra text
+    if '```' in plan:
+        import re
+        code_blocks = re.findall(r'```(?:json)?\s*(.*?)\s*```', plan, re.DOTALL)
+        if code_blocks:
+            plan = code_blocks[0].strip()
+    
+    return json.loads(plan)
 
-def _generate_fallback_orm(query):
+def _generate_fallback_plan(query):
     """
-    Fallback query generation when Gemini AI is unavailable.
+    Fallback query plans when Gemini AI is unavailable.
     """
     query_lower = query.lower()
     
     # Basic query patterns
     if 'top' in query_lower and 'leetcode' in query_lower:
-        return "LeetCode.objects.select_related('rollno').order_by('-TotalProblems')[:10]"
+        return {'model': 'LeetCode', 'ordering': ['-TotalProblems'], 'limit': 10}
     
     elif 'students' in query_lower and 'python' in query_lower and 'projects' in query_lower:
-        return "student.objects.annotate(python_projects=Count('projects', filter=Q(projects__technologies__name__icontains='python'))).filter(python_projects__gt=0)[:50]"
+        # The filter comes before the count, so only the matching projects are counted
+        return {
+            'model': 'student',
+            'filters': {'projects__technologies__name__icontains': 'python'},
+            'annotations': {'python_projects': {'function': 'count', 'field': 'projects', 'distinct': True}},
+            'ordering': ['-python_projects'],
+        }
     
     elif 'placement' in query_lower and 'offers' in query_lower:
-        return "student.objects.annotate(offer_count=Count('placementoffer')).filter(offer_count__gt=0)[:50]"
+        return {
+            'model': 'student',
+            'annotations': {'offer_count': {'function': 'count', 'field': 'placement_offers'}},
+            'filters': {'offer_count__gt': 0},
+            'ordering': ['-offer_count'],
+        }
     
     elif 'cloud' in query_lower and ('cert' in query_lower or 'certificate' in query_lower):
-        return "Certificate.objects.filter(Q(source__icontains='cloud') | Q(title__icontains='cloud'))[:50]"
+        return {'model': 'Certificate', 'any': [{'source__icontains': 'cloud'}, {'title__icontains': 'cloud'}]}
     
-    elif 'placement' in query_lower and 'stats' in query_lower:
-        return "student.objects.values('dept').annotate(total=Count('id'), placed=Count('placementoffer')).order_by('dept')"
+    elif 'placement' in query_lower and ('stats' in query_lower or 'statistics' in query_lower):
+        return {
+            'model': 'student',
+            'group_by': ['dept'],
+            'annotations': {
+                'total': {'function': 'count', 'field': 'id', 'distinct': True},
+                'placed': {'function': 'count', 'field': 'placement_offers__student', 'distinct': True},
+            },
+            'ordering': ['dept'],
+        }
     
     elif 'students' in query_lower and 'projects' in query_lower:
-        return "student.objects.annotate(project_count=Count('projects')).filter(project_count__gt=0)[:50]"
+        return {
+            'model': 'student',
+            'annotations': {'project_count': {'function': 'count', 'field': 'projects'}},
+            'filters': {'project_count__gt': 0},
+        }
     
     elif 'certificates' in query_lower:
-        return "Certificate.objects.select_related('rollno').order_by('-id')[:50]"
+        return {'model': 'Certificate', 'ordering': ['-id']}
     
     elif 'leetcode' in query_lower:
-        return "LeetCode.objects.select_related('rollno').order_by('-TotalProblems')[:50]"
+        return {'model': 'LeetCode', 'ordering': ['-TotalProblems']}
     
     elif 'projects' in query_lower:
-        return "Projects.objects.select_related('rollno').prefetch_related('technologies').order_by('-id')[:50]"
+        return {'model': 'Projects', 'ordering': ['-id']}
     
     elif 'students' in query_lower:
-        return "student.objects.all().order_by('roll_no')[:50]"
+        return {'model': 'student', 'ordering': ['roll_no']}
     
     else:
-        return "student.objects.all()[:20]"
+        return {'model': 'student', 'limit': 20}
 
 
-def _normalize_orm_line(orm_line: str, model_aliases: dict) -> str:
+def run_flexon_query(query):
     """
-    Rewrite '<Alias>.objects' -> '<actual>.objects' using ONLY the provided model_aliases.
-    Adds singular/plural + case variants at runtime without mutating model_aliases.
+    (compiled plan, rows, served from cache) for a question. Gemini plans
+    are cached once they have compiled and run; keyword fallbacks are not,
+    so an outage does not pin them. QueryPlanError explains a plan that was
+    rejected or could not run.
     """
-    if not orm_line:
-        return orm_line
-
-    import re
+    plan = cached_translation(query)
+    if plan:
+        compiled = compile_plan(plan)
+        return compiled, run_plan(compiled), True
     
-    # Build an expanded lookup without changing the original dict
-    expanded = {}
-    for alias, actual in model_aliases.items():
-        variants = {alias, alias.lower(), alias.capitalize()}
-
-        # add singular/plural variants
-        if alias.endswith('s'):
-            singular = alias[:-1]
-            variants.update({singular, singular.lower(), singular.capitalize()})
-        else:
-            plural = alias + 's'
-            variants.update({plural, plural.lower(), plural.capitalize()})
-
-        for v in variants:
-            expanded[v] = actual  # all map to the same "actual"
-
-    # Replace ONLY tokens that are used as '<name>.objects'
-    pattern = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\.objects")
-
-    def repl(m):
-        name = m.group(1)
-        actual = expanded.get(name) or expanded.get(name.lower())
-        return f"{actual}.objects" if actual else m.group(0)
-
-    return pattern.sub(repl, orm_line)
+    try:
+        plan = generate_plan_from_query(query)
+    except Exception as e:
+        print(f"Gemini AI error: {e}")
+        # Fallback to basic keyword matching if Gemini fails
+        compiled = compile_plan(_generate_fallback_plan(query))
+        return compiled, run_plan(compiled), False
+    
+    compiled = compile_plan(plan)
+    rows = run_plan(compiled)
+    store_translation(query, plan)
+    return compiled, rows, False
 
 
 @csrf_exempt
@@ -3273,120 +2918,53 @@ def flexon_dashboard(request):
         clarification = ''
         results = []
         columns = []
+        cached = False
 
-        # Step 1: Generate ORM from query (returns a string)
-        orm_line = generate_orm_from_query(query)
-
-        # Step 2: Normalize model references using the GIVEN model_aliases (unchanged)
-        model_aliases = {
-            'Student': 'student',
-            'Faculty': 'Faculty',
-            'Projects': 'Projects',
-            'Certificate': 'Certificate',
-            'LeetCode': 'LeetCode',
-            'Placement': 'Placement',
-            'Technology': 'Technology',
-        }
-        orm_line = _normalize_orm_line(orm_line, model_aliases) if orm_line else None
-
-        # Step 3: Safety check (read-only)
-        unsafe_keywords = [
-            'create', 'update', 'delete', 'save',
-            'bulk_create', 'bulk_update', 'remove', 'clear', 'set'
-        ]
-        if not orm_line:
-            clarification = "Couldn't generate a valid ORM query."
-        elif any(kw in orm_line.lower() for kw in unsafe_keywords):
-            clarification = "Unsafe ORM operation detected. Only read-only queries are allowed."
-        else:
-            try:
-                # Step 4: Evaluate safely
-                from .models import Faculty, Technology, Placement
-                from django.db import models as django_models
-                
-                safe_globals = {
-                    '__builtins__': {},  # lock down builtins
-                    # models/modules
-                    'models': django_models,
-                    'Count': Count,
-                    'Q': Q,
-                    # model classes available to the ORM line
-                    'student': student,
-                    'Faculty': Faculty,
-                    'Projects': Projects,
-                    'Certificate': Certificate,
-                    'LeetCode': LeetCode,
-                    'Placement': Placement,
-                    'Technology': Technology,
-                    'PlacementOffer': PlacementOffer,
-                }
-                print(f"Executing ORM: {orm_line}")
-
-                queryset = eval(orm_line, safe_globals, {})
-
-                # Step 5: Normalize results to list-of-dicts and build columns
-                from django.db.models import QuerySet
-                
-                def as_dicts_from_instances(qs):
-                    model = qs.model
-                    field_names = [f.name for f in model._meta.concrete_fields]
-                    return list(qs.values(*field_names))
-
-                if isinstance(queryset, dict):
-                    # Aggregate: {'count': X, ...}
-                    results = [queryset]
-                    columns = list(queryset.keys())
-                elif isinstance(queryset, (list, tuple)):
-                    if queryset and isinstance(queryset[0], tuple):
-                        # values_list / tuples -> map to col_1, col_2...
-                        col_names = [f"col_{i+1}" for i in range(len(queryset[0]))]
-                        results = [dict(zip(col_names, row)) for row in queryset[:50]]
-                        columns = col_names
-                    elif queryset and hasattr(queryset[0], '__class__'):
-                        # list of model instances
-                        model = queryset[0].__class__
-                        field_names = [f.name for f in model._meta.concrete_fields]
-                        results = [ {fn: getattr(obj, fn) for fn in field_names} for obj in queryset[:50] ]
-                        columns = field_names
-                    else:
-                        results = []
-                        columns = []
-                elif isinstance(queryset, QuerySet):
-                    # If caller already used .values(), don't double-process
-                    try:
-                        sample = queryset[:1]
-                        # If it's a ValuesQuerySet, converting to list gives dicts
-                        if sample and isinstance(list(sample)[0], dict):
-                            results = list(queryset)[:50]
-                        else:
-                            results = as_dicts_from_instances(queryset)[:50]
-                    except Exception:
-                        # fallback to values() anyway
-                        results = list(queryset.values())[:50]
-
-                    columns = list(results[0].keys()) if results else []
-                else:
-                    # Any other scalar/object -> wrap it
-                    results = [{"result": queryset}]
-                    columns = ["result"]
-
-            except Exception as e:
-                clarification = f"Error executing ORM: {e}"
-                traceback.print_exc()
+        # Translate to a whitelisted query plan (cached by question), then run it
+        # within the row and time limits; plans only ever read
+        try:
+            compiled, results, cached = run_flexon_query(query)
+            columns = list(compiled.columns)
+        except QueryPlanError as e:
+            clarification = str(e)
+        except Exception as e:
+            clarification = f"Error executing query: {e}"
+            traceback.print_exc()
 
         return JsonResponse({
             'clarification': clarification,
             'results': results,
             'columns': columns,
-            'chart': None
+            'chart': None,
+            'cached': cached,
         })
 
-    return render(request, 'flexon_dashboard.html')
+    return render(request, 'flexon_dashboard.html', {'popular_queries': popular_queries()})
 
 
 ########################### NAAC Report Generation ###########################
 from django.views.decorators.http import require_POST
 
+def naac_report_students(data):
+    """Students covered by a NAAC report request ({'students': [...], 'include_all': bool})"""
+    selected_students = data.get('students', [])
+    include_all = data.get('include_all', False)
+    if include_all or not selected_students:
+        return student.objects.filter(is_superuser=False)
+    return student.objects.filter(roll_no__in=selected_students)
+
+
+def naac_report_selection(data):
+    """Roll numbers selected for a NAAC report, or None for every student"""
+    if data.get('include_all', False):
+        return None
+    return data.get('students') or None
+
+
+def naac_report_filename():
+    return f'NAAC_Report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+
+
 @csrf_exempt
 @require_POST
 def generate_naac_report(request):
@@ -3394,96 +2972,17 @@ def generate_naac_report(request):
     try:
         # Parse request data
         data = json.loads(request.body)
-        selected_students = data.get('students', [])
-        include_all = data.get('include_all', False)
-        
-        # Get student queryset
-        if include_all or not selected_students:
-            students_queryset = student.objects.filter(is_superuser=False)
-        else:
-            students_queryset = student.objects.filter(roll_no__in=selected_students)
+        students_queryset = naac_report_students(data)
         
         # Verify we have students to process
         if not students_queryset.exists():
             return JsonResponse({'error': 'No students found to generate report'}, status=400)
         
-        # Create Excel workbook
-        wb = openpyxl.Workbook()
-        
-        # Remove default sheet
-        if wb.active:
-            wb.remove(wb.active)
-        
-        # Generate basic student summary sheet first - this is essential
-        try:
-            generate_student_summary_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Critical error in student summary: {e}")
-            # Create a simple fallback sheet
-            ws = wb.create_sheet(title="Student Data")
-            ws.cell(row=1, column=1, value="Roll Number")
-            ws.cell(row=1, column=2, value="Name")
-            ws.cell(row=1, column=3, value="Department")
-            
-            for row, student_obj in enumerate(students_queryset, 2):
-                ws.cell(row=row, column=1, value=getattr(student_obj, 'roll_no', 'N/A'))
-                ws.cell(row=row, column=2, value=f"{getattr(student_obj, 'first_name', '')} {getattr(student_obj, 'last_name', '')}".strip())
-                ws.cell(row=row, column=3, value=getattr(student_obj, 'dept', 'N/A'))
-        
-        # Try to generate other sheets, but don't fail if there are issues
-        try:
-            generate_academic_performance_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating academic performance sheet: {e}")
-        
-        try:
-            generate_projects_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating projects sheet: {e}")
-        
-        try:
-            generate_certifications_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating certifications sheet: {e}")
-        
-        try:
-            generate_achievements_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating achievements sheet: {e}")
-        
-        try:
-            generate_placement_analytics_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating placement analytics sheet: {e}")
-        
-        try:
-            generate_skills_analytics_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating skills analytics sheet: {e}")
-        
-        try:
-            generate_naac_metrics_sheet(wb, students_queryset)
-        except Exception as e:
-            print(f"Error generating NAAC metrics sheet: {e}")
-        
-        # Ensure we have at least one sheet
-        if len(wb.worksheets) == 0:
-            ws = wb.create_sheet(title="Error")
-            ws.cell(row=1, column=1, value="Error: No data could be generated")
-        
-        # Create a BytesIO object to save the workbook
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # Create response
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # Served from the report cache when nothing has changed since the last build
+        return cached_report_response(
+            'naac_workbook', naac_report_selection(data), {},
+            lambda: build_naac_workbook(students_queryset).response(naac_report_filename()),
         )
-        response['Content-Disposition'] = f'attachment; filename="NAAC_Report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx"'
-        
-        return response
         
     except Exception as e:
         import traceback
@@ -3491,468 +2990,101 @@ def generate_naac_report(request):
         print(error_msg)  # For debugging
         return JsonResponse({'error': error_msg}, status=500)
 
-def generate_student_summary_sheet(wb, students_queryset):
-    """Generate student summary sheet for NAAC report"""
-    ws = wb.create_sheet(title="Student Summary")
-    
-    # Headers
-    headers = [
-        'Roll Number', 'Name', 'Department', 'Year', 'Section', 'Email',
-        'CGPA', 'Projects Count', 'Certificates Count', 'Achievements Count',
-        'LeetCode Problems', 'Mentor', 'Phone', 'GitHub Link'
-    ]
-    
-    # Apply header styling
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        try:
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="2F75B5", end_color="2F75B5", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-        except Exception as e:
-            # If styling fails, just set the value
-            pass
-    
-    # Data rows
-    for row, student_obj in enumerate(students_queryset, 2):
-        try:
-            # Get counts with error handling
-            projects_count = 0
-            certificates_count = 0
-            achievements_count = 0
-            
-            try:
-                projects_count = Projects.objects.filter(contributors=student_obj).count()
-            except:
-                pass
-            
-            try:
-                certificates_count = Certificate.objects.filter(rollno=student_obj).count()
-            except:
-                pass
-            
-            try:
-                achievements_count = Achievement.objects.filter(student=student_obj).count()
-            except:
-                pass
-            
-            # Get LeetCode count
-            leetcode_count = 0
-            try:
-                if hasattr(student_obj, 'studentrollno') and student_obj.studentrollno:
-                    leetcode_count = student_obj.studentrollno.TotalProblems or 0
-            except:
-                pass
-            
-            # Get mentor info safely
-            mentor_name = 'N/A'
-            try:
-                if student_obj.mentor:
-                    mentor_name = f"{student_obj.mentor.first_name} {student_obj.mentor.last_name}".strip()
-            except:
-                pass
-            
-            data = [
-                getattr(student_obj, 'roll_no', 'N/A'),
-                f"{getattr(student_obj, 'first_name', '')} {getattr(student_obj, 'last_name', '')}".strip() or 'N/A',
-                getattr(student_obj, 'dept', 'N/A'),
-                getattr(student_obj, 'year', 'N/A'),
-                getattr(student_obj, 'section', 'N/A'),
-                getattr(student_obj, 'email', 'N/A'),
-                getattr(student_obj, 'current_cgpa', 'N/A') or 'N/A',
-                projects_count,
-                certificates_count,
-                achievements_count,
-                leetcode_count,
-                mentor_name,
-                getattr(student_obj, 'phone', 'N/A') or 'N/A',
-                getattr(student_obj, 'github_link', 'N/A') or 'N/A'
-            ]
-            
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col, value=value)
-                try:
-                    cell.border = Border(
-                        left=Side(style='thin'), right=Side(style='thin'),
-                        top=Side(style='thin'), bottom=Side(style='thin')
-                    )
-                    if col > 7:  # Numeric columns
-                        cell.alignment = Alignment(horizontal="center")
-                except:
-                    pass
-        except Exception as e:
-            # If there's an error with this student, add an error row
-            ws.cell(row=row, column=1, value=f"Error processing student: {str(e)}")
-    
-    # Auto-adjust column widths
-    try:
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-    except Exception as e:
-        # If auto-adjustment fails, continue without it
-        pass
+########################### Background Report Jobs ###########################
+# Builders run by `run_report_worker`: builder(params, progress) -> HttpResponse
 
-def generate_academic_performance_sheet(wb, students_queryset):
-    """Generate academic performance analytics sheet"""
-    ws = wb.create_sheet(title="Academic Performance")
-    
-    # Performance summary data
-    dept_stats = {}
-    year_stats = {}
-    
-    for student_obj in students_queryset:
-        dept = student_obj.dept
-        year = student_obj.year
-        cgpa = student_obj.current_cgpa or 0
-        
-        # Department statistics
-        if dept not in dept_stats:
-            dept_stats[dept] = {'count': 0, 'total_cgpa': 0, 'students': []}
-        dept_stats[dept]['count'] += 1
-        dept_stats[dept]['total_cgpa'] += float(cgpa) if cgpa != 'N/A' and cgpa else 0
-        dept_stats[dept]['students'].append(student_obj)
-        
-        # Year statistics
-        if year not in year_stats:
-            year_stats[year] = {'count': 0, 'total_cgpa': 0}
-        year_stats[year]['count'] += 1
-        year_stats[year]['total_cgpa'] += float(cgpa) if cgpa != 'N/A' and cgpa else 0
-    
-    # Department-wise performance
-    ws.cell(row=1, column=1, value="Department-wise Academic Performance").font = Font(size=14, bold=True)
-    headers = ['Department', 'Student Count', 'Average CGPA', 'Projects/Student', 'Certificates/Student']
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-    
-    row = 4
-    for dept, stats in dept_stats.items():
-        avg_cgpa = stats['total_cgpa'] / stats['count'] if stats['count'] > 0 else 0
-        
-        # Calculate projects and certificates per student
-        total_projects = sum(Projects.objects.filter(contributors=s).count() for s in stats['students'])
-        total_certificates = sum(Certificate.objects.filter(rollno=s).count() for s in stats['students'])
-        
-        projects_per_student = total_projects / stats['count'] if stats['count'] > 0 else 0
-        certificates_per_student = total_certificates / stats['count'] if stats['count'] > 0 else 0
-        
-        ws.cell(row=row, column=1, value=dept)
-        ws.cell(row=row, column=2, value=stats['count'])
-        ws.cell(row=row, column=3, value=round(avg_cgpa, 2))
-        ws.cell(row=row, column=4, value=round(projects_per_student, 1))
-        ws.cell(row=row, column=5, value=round(certificates_per_student, 1))
-        row += 1
-
-def generate_projects_sheet(wb, students_queryset):
-    """Generate projects analysis sheet"""
-    ws = wb.create_sheet(title="Projects Analysis")
-    
-    # Get all projects for selected students
-    all_projects = Projects.objects.filter(contributors__in=students_queryset).distinct()
-    
-    headers = [
-        'Project Title', 'Description', 'Status', 'Year/Semester', 'Contributors Count',
-        'Technologies', 'GitHub Link', 'Department'
-    ]
-    
-    # Apply header styling
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-    
-    # Data rows
-    for row, project in enumerate(all_projects, 2):
-        contributors = project.contributors.all()
-        contributor_names = ', '.join([f"{c.first_name} {c.last_name}" for c in contributors])
-        technologies = ', '.join([tech.name for tech in project.technologies.all()])
-        departments = ', '.join(list(set([c.dept for c in contributors])))
-        
-        data = [
-            project.title,
-            project.description[:100] + '...' if len(project.description) > 100 else project.description,
-            project.status,
-            project.year_and_sem,
-            contributors.count(),
-            technologies,
-            project.github_link or 'N/A',
-            departments
-        ]
-        
-        for col, value in enumerate(data, 1):
-            ws.cell(row=row, column=col, value=value)
+def naac_workbook_job(params, progress):
+    """NAAC workbook; params as posted to generate_naac_report"""
+    return cached_report_response(
+        'naac_workbook', naac_report_selection(params), {},
+        lambda: build_naac_workbook(
+            naac_report_students(params), progress, naac_report_workers()
+        ).response(naac_report_filename()),
+    )
 
-def generate_certifications_sheet(wb, students_queryset):
-    """Generate certifications analysis sheet"""
-    ws = wb.create_sheet(title="Certifications Analysis")
-    
-    try:
-        # Get all certificates for selected students
-        all_certificates = Certificate.objects.filter(rollno__in=students_queryset)
-    except Exception as e:
-        ws.cell(row=1, column=1, value=f"Error accessing certificate data: {str(e)}")
-        return
-    
-    headers = [
-        'Student Roll No', 'Student Name', 'Certificate Title', 'Category',
-        'Source/Provider', 'Domain', 'Year/Semester', 'Validity Period'
-    ]
-    
-    # Apply header styling
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        try:
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="E74C3C", end_color="E74C3C", fill_type="solid")
-        except:
-            pass
-    
-    # Data rows
-    try:
-        for row, cert in enumerate(all_certificates, 2):
-            try:
-                data = [
-                    getattr(cert.rollno, 'roll_no', 'N/A') if cert.rollno else 'N/A',
-                    f"{getattr(cert.rollno, 'first_name', '')} {getattr(cert.rollno, 'last_name', '')}".strip() if cert.rollno else 'N/A',
-                    getattr(cert, 'title', 'N/A'),
-                    cert.get_category_display() if hasattr(cert, 'get_category_display') else getattr(cert, 'category', 'N/A'),
-                    getattr(cert, 'source', 'N/A') or 'N/A',
-                    getattr(cert, 'domain', 'N/A') or 'N/A',
-                    getattr(cert, 'year_and_sem', 'N/A'),
-                    getattr(cert, 'validity_period', 'N/A') or 'N/A'
-                ]
-                
-                for col, value in enumerate(data, 1):
-                    ws.cell(row=row, column=col, value=value)
-            except Exception as e:
-                ws.cell(row=row, column=1, value=f"Error processing certificate: {str(e)}")
-    except Exception as e:
-        ws.cell(row=2, column=1, value=f"Error processing certificates: {str(e)}")
-    
-    # If no certificates found
-    if all_certificates.count() == 0:
-        ws.cell(row=2, column=1, value="No certificates found for selected students")
 
-def generate_achievements_sheet(wb, students_queryset):
-    """Generate achievements analysis sheet"""
-    ws = wb.create_sheet(title="Achievements Analysis")
-    
-    # Get all achievements for selected students
-    all_achievements = Achievement.objects.filter(student__in=students_queryset)
-    
-    headers = [
-        'Student Roll No', 'Student Name', 'Achievement Title', 'Category',
-        'Description', 'Achievement Date', 'Status', 'Points Awarded',
-        'Verification Method'
-    ]
-    
-    # Apply header styling
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="F39C12", end_color="F39C12", fill_type="solid")
-    
-    # Data rows
-    for row, achievement in enumerate(all_achievements, 2):
-        data = [
-            achievement.student.roll_no,
-            f"{achievement.student.first_name} {achievement.student.last_name}",
-            achievement.title,
-            achievement.category.name if achievement.category else 'N/A',
-            achievement.description[:100] + '...' if len(achievement.description) > 100 else achievement.description,
-            achievement.achievement_date.strftime('%Y-%m-%d') if achievement.achievement_date else 'N/A',
-            achievement.get_status_display() if hasattr(achievement, 'get_status_display') else achievement.status,
-            achievement.points_awarded or 0,
-            achievement.verification_method or 'N/A'
-        ]
-        
-        for col, value in enumerate(data, 1):
-            ws.cell(row=row, column=col, value=value)
+def compliance_job(params, progress):
+    """Compliance report data as JSON; params {'type': 'naac' | 'nba' | 'aicte' | 'nirf', 'year'}"""
+    builders = {
+        'naac': compliance_summary,
+        'nba': generate_nba_report,
+        'aicte': generate_aicte_report,
+        'nirf': generate_nirf_report,
+    }
+    report_type = params.get('type', 'nba')
+    year = _compliance_year(params.get('year'))
+    if report_type not in builders:
+        raise ValueError(f'Unsupported compliance report: {report_type}')
+
+    def build():
+        response = JsonResponse(builders[report_type](year), safe=False)
+        response['Content-Disposition'] = f'attachment; filename="{report_type}_compliance_{year}.json"'
+        return response
 
-def generate_placement_analytics_sheet(wb, students_queryset):
-    """Generate placement analytics sheet"""
-    ws = wb.create_sheet(title="Placement Analytics")
-    
-    try:
-        # Get placement data
-        placement_offers = PlacementOffer.objects.filter(student__in=students_queryset)
-    except Exception as e:
-        # If there's an error with placement data, create empty sheet with message
-        ws.cell(row=1, column=1, value="No placement data available or error accessing placement records")
-        return
-    
-    headers = [
-        'Student Roll No', 'Student Name', 'Company', 'Package (LPA)',
-        'Position', 'Placement Date', 'Department', 'Year'
-    ]
-    
-    # Apply header styling
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="8E44AD", end_color="8E44AD", fill_type="solid")
-    
-    # Data rows
-    try:
-        for row, offer in enumerate(placement_offers, 2):
-            data = [
-                offer.student.roll_no if offer.student else 'N/A',
-                f"{offer.student.first_name} {offer.student.last_name}" if offer.student else 'N/A',
-                getattr(offer, 'company_name', 'N/A'),
-                getattr(offer, 'package_lpa', 'N/A'),
-                getattr(offer, 'position', 'N/A'),
-                offer.placement_date.strftime('%Y-%m-%d') if hasattr(offer, 'placement_date') and offer.placement_date else 'N/A',
-                offer.student.dept if offer.student else 'N/A',
-                offer.student.year if offer.student else 'N/A'
-            ]
-            
-            for col, value in enumerate(data, 1):
-                ws.cell(row=row, column=col, value=value)
-    except Exception as e:
-        # If data access fails, add error message
-        ws.cell(row=2, column=1, value=f"Error accessing placement data: {str(e)}")
-    
-    # If no data, add message
-    if placement_offers.count() == 0:
-        ws.cell(row=2, column=1, value="No placement offers found for selected students")
+    params = {'type': report_type, 'year': year}
+    if report_type == 'nba':
+        # Thresholds come from settings, so a change must not hit an old report
+        params['thresholds'] = nba_thresholds()
+    return cached_report_response('compliance', None, params, build)
+
+
+def export_job(params, progress):
+    """Bulk export; params {'type': 'students' | ..., 'format': 'csv' | 'json' | 'excel'}"""
+    exporters = {
+        'students': export_students_data,
+        'achievements': export_achievements_data,
+        'certificates': export_certificates_data,
+        'projects': export_projects_data,
+        'placements': export_placements_data,
+    }
+    data_type = params.get('type', 'students')
+    if data_type not in exporters:
+        raise ValueError(f'Unsupported export: {data_type}')
+    return exporters[data_type](None, params.get('format', 'csv'))
 
-def generate_skills_analytics_sheet(wb, students_queryset):
-    """Generate skills and technology analytics sheet"""
-    ws = wb.create_sheet(title="Skills Analytics")
-    
-    # Technology usage statistics
-    tech_stats = {}
-    domain_stats = {}
-    
-    for student_obj in students_queryset:
-        # Get technologies from projects
-        student_projects = Projects.objects.filter(contributors=student_obj)
-        for project in student_projects:
-            for tech in project.technologies.all():
-                tech_stats[tech.name] = tech_stats.get(tech.name, 0) + 1
-        
-        # Get domains from certificates
-        student_certificates = Certificate.objects.filter(rollno=student_obj)
-        for cert in student_certificates:
-            if cert.domain:
-                domain_stats[cert.domain] = domain_stats.get(cert.domain, 0) + 1
-    
-    # Technology statistics
-    ws.cell(row=1, column=1, value="Technology Usage Statistics").font = Font(size=14, bold=True)
-    ws.cell(row=3, column=1, value="Technology").font = Font(bold=True)
-    ws.cell(row=3, column=2, value="Usage Count").font = Font(bold=True)
-    
-    row = 4
-    for tech, count in sorted(tech_stats.items(), key=lambda x: x[1], reverse=True):
-        ws.cell(row=row, column=1, value=tech)
-        ws.cell(row=row, column=2, value=count)
-        row += 1
-    
-    # Domain statistics
-    start_row = row + 2
-    ws.cell(row=start_row, column=1, value="Certificate Domain Statistics").font = Font(size=14, bold=True)
-    ws.cell(row=start_row + 2, column=1, value="Domain").font = Font(bold=True)
-    ws.cell(row=start_row + 2, column=2, value="Certificate Count").font = Font(bold=True)
-    
-    row = start_row + 3
-    for domain, count in sorted(domain_stats.items(), key=lambda x: x[1], reverse=True):
-        ws.cell(row=row, column=1, value=domain)
-        ws.cell(row=row, column=2, value=count)
-        row += 1
-
-def generate_naac_metrics_sheet(wb, students_queryset):
-    """Generate NAAC-specific metrics sheet"""
-    ws = wb.create_sheet(title="NAAC Metrics")
-    
-    total_students = students_queryset.count()
-    
-    # Calculate key metrics with proper error handling
+
+def portfolios_job(params, progress):
+    """Batch portfolio ZIP; params {'dept', 'year', 'section'}, all optional"""
+    return portfolios_response(portfolio_selection(params), progress, portfolio_workers())
+
+
+@login_required
+@require_POST
+def submit_report_job(request):
+    """Queue a report; body {'report_type': ..., 'params': {...}}"""
+    if not request.user.is_superuser and request.user.type() != "Faculty":
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
     try:
-        students_with_projects = 0
-        students_with_certificates = 0
-        students_with_achievements = 0
-        students_with_placements = 0
-        
-        for student_obj in students_queryset:
-            # Check projects
-            if Projects.objects.filter(contributors=student_obj).exists():
-                students_with_projects += 1
-            
-            # Check certificates
-            if Certificate.objects.filter(rollno=student_obj).exists():
-                students_with_certificates += 1
-            
-            # Check achievements
-            if Achievement.objects.filter(student=student_obj).exists():
-                students_with_achievements += 1
-            
-            # Check placements
-            if PlacementOffer.objects.filter(student=student_obj).exists():
-                students_with_placements += 1
-        
-        total_projects = Projects.objects.filter(contributors__in=students_queryset).distinct().count()
-        total_certificates = Certificate.objects.filter(rollno__in=students_queryset).count()
-        total_achievements = Achievement.objects.filter(student__in=students_queryset).count()
-        
-    except Exception as e:
-        # Fallback values if queries fail
-        students_with_projects = 0
-        students_with_certificates = 0
-        students_with_achievements = 0
-        students_with_placements = 0
-        total_projects = 0
-        total_certificates = 0
-        total_achievements = 0
-    
-    # Average calculations
-    avg_projects_per_student = total_projects / total_students if total_students > 0 else 0
-    avg_certificates_per_student = total_certificates / total_students if total_students > 0 else 0
-    avg_achievements_per_student = total_achievements / total_students if total_students > 0 else 0
-    
-    # Create metrics table
-    metrics = [
-        ["NAAC Key Performance Indicators", ""],
-        ["", ""],
-        ["Total Students", total_students],
-        ["Students with Projects", f"{students_with_projects} ({(students_with_projects/total_students*100):.1f}%)" if total_students > 0 else "0"],
-        ["Students with Certificates", f"{students_with_certificates} ({(students_with_certificates/total_students*100):.1f}%)" if total_students > 0 else "0"],
-        ["Students with Achievements", f"{students_with_achievements} ({(students_with_achievements/total_students*100):.1f}%)" if total_students > 0 else "0"],
-        ["Students with Placements", f"{students_with_placements} ({(students_with_placements/total_students*100):.1f}%)" if total_students > 0 else "0"],
-        ["", ""],
-        ["Total Projects", total_projects],
-        ["Total Certificates", total_certificates],
-        ["Total Achievements", total_achievements],
-        ["", ""],
-        ["Average Projects per Student", f"{avg_projects_per_student:.2f}"],
-        ["Average Certificates per Student", f"{avg_certificates_per_student:.2f}"],
-        ["Average Achievements per Student", f"{avg_achievements_per_student:.2f}"],
-    ]
-    
-    for row, (metric, value) in enumerate(metrics, 1):
-        ws.cell(row=row, column=1, value=metric)
-        ws.cell(row=row, column=2, value=value)
-        
-        if row == 1:  # Title row
-            ws.cell(row=row, column=1).font = Font(size=16, bold=True)
-        elif metric and value != "":  # Data rows
-            ws.cell(row=row, column=1).font = Font(bold=True)
-    
-    # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 35
-    ws.column_dimensions['B'].width = 25
+        data = json.loads(request.body or '{}')
+        job = submit_job(data.get('report_type'), data.get('params'), request.user)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        **job_status(job),
+        'status_url': reverse('report_job_status', args=[job.pk]),
+        'download_url': reverse('report_job_download', args=[job.pk]),
+    }, status=202)
 
+
+def _accessible_job(request, job_id):
+    job = get_object_or_404(ReportJob, pk=job_id)
+    if not can_access_job(request.user, job):
+        raise Http404
+    return job
+
+
+@login_required
+def report_job_status(request, job_id):
+    job = _accessible_job(request, job_id)
+    return JsonResponse({**job_status(job), 'download_url': reverse('report_job_download', args=[job.pk])})
+
+
+@login_required
+def report_job_download(request, job_id):
+    job = _accessible_job(request, job_id)
+    if job.status != 'completed':
+        return JsonResponse({'error': f'Report is {job.status}', **job_status(job)}, status=409)
+    if not os.path.exists(job.output_path):
+        return JsonResponse({'error': 'Report output is no longer available'}, status=410)
+    return FileResponse(open(job.output_path, 'rb'), as_attachment=True, filename=job.filename)
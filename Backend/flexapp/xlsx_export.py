@@ -0,0 +1,214 @@
+"""
+Constant-memory XLSX writer
+
+Wraps openpyxl's write-only mode, which streams rows to disk instead of
+keeping a cell object per value. Formatting goes through a fixed set of
+named styles registered once per workbook, so a styled cell costs a style
+reference rather than its own Font/Fill/Border objects.
+
+Write-only sheets need their column widths before the first row is written,
+so each sheet first spools its rows to a temporary file while measuring
+them, then replays them into the workbook when it is closed. The finished
+workbook is saved to another temporary file and served with FileResponse.
+openpyxl serializes rows through lxml when it is installed, which is most
+of the write time.
+
+Sheets written through XlsxSheet use constant memory. A SheetRows sheet,
+computed away from the workbook, holds all of its rows in memory until
+add_rows() writes it out, so a report assembled from SheetRows peaks at the
+size of the sheets computed but not yet written.
+"""
+import pickle
+import tempfile
+from itertools import chain
+
+import openpyxl
+from django.http import FileResponse
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+XLSX_MAX_COLUMN_WIDTH = 50
+
+_THIN = Side(style='thin')
+
+
+def _header(color, font_color='FFFFFF'):
+    return {
+        'font': Font(bold=True, color=font_color),
+        'fill': PatternFill(start_color=color, end_color=color, fill_type='solid'),
+    }
+
+
+# Style name -> NamedStyle attributes
+XLSX_STYLES = {
+    'report_title': {'font': Font(size=16, bold=True)},
+    'title': {'font': Font(size=14, bold=True)},
+    'bold': {'font': Font(bold=True)},
+    'subheader': _header('D9E1F2', font_color='000000'),
+    'header': {
+        **_header('2F75B5'),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN),
+    },
+    'header_green': _header('70AD47'),
+    'header_red': _header('E74C3C'),
+    'header_orange': _header('F39C12'),
+    'header_purple': _header('8E44AD'),
+    'cell': {'border': Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)},
+    'cell_center': {
+        'border': Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN),
+        'alignment': Alignment(horizontal='center'),
+    },
+}
+
+# Titles span several columns visually and must not widen the first one
+_UNMEASURED_STYLES = {'report_title', 'title'}
+
+
+class XlsxSheet:
+    """
+    One worksheet of an XlsxReport. Rows are lists of values, or of
+    (value, style_name) pairs for individually styled cells.
+    """
+
+    def __init__(self, worksheet, widths=None):
+        self._worksheet = worksheet
+        self._spool = tempfile.TemporaryFile()
+        self._widths = dict(enumerate(widths or (), 1))
+        self._fixed = set(self._widths)
+        self.rows = 0
+        self.closed = False
+
+    def _cells(self, values, style):
+        """(value, style) pairs of a row, widening the measured columns"""
+        row = []
+        for column, value in enumerate(values, 1):
+            if isinstance(value, tuple):
+                value, cell_style = value
+            else:
+                cell_style = style
+            row.append((value, cell_style))
+            if column not in self._fixed and value is not None and cell_style not in _UNMEASURED_STYLES:
+                self._widths[column] = max(self._widths.get(column, 0), len(str(value)))
+        return row
+
+    def append(self, values, style=None):
+        """Append a row; `style` applies to every cell without its own"""
+        pickle.dump(self._cells(values, style), self._spool, pickle.HIGHEST_PROTOCOL)
+        self.rows += 1
+
+    def blank(self, count=1):
+        for _ in range(count):
+            self.append([])
+
+    def close(self):
+        """Size the columns and replay the spooled rows into the workbook"""
+        self._flush([])
+
+    def write(self, rows):
+        """
+        Write rows that are already in memory, as (values, style) pairs,
+        after any appended ones and close the sheet. Buffered rows are
+        measured up front, so they skip the spool.
+        """
+        self._flush([self._cells(values, style) for values, style in rows])
+
+    def _spooled(self):
+        self._spool.seek(0)
+        for _ in range(self.rows):
+            yield pickle.load(self._spool)
+
+    def _flush(self, buffered):
+        if self.closed:
+            return
+        self.closed = True
+        worksheet = self._worksheet
+        for column, width in self._widths.items():
+            if column not in self._fixed:
+                width = min(width + 2, XLSX_MAX_COLUMN_WIDTH)
+            worksheet.column_dimensions[get_column_letter(column)].width = width
+
+        for row in chain(self._spooled(), buffered):
+            cells = []
+            for value, style in row:
+                if style is None:
+                    cells.append(value)
+                else:
+                    cell = WriteOnlyCell(worksheet, value)
+                    cell.style = style
+                    cells.append(cell)
+            worksheet.append(cells)
+        self._spool.close()
+
+
+class SheetRows:
+    """
+    Rows of one sheet computed away from the workbook, e.g. in a worker
+    process. Same append/blank API as XlsxSheet; XlsxReport.add_rows()
+    writes it out.
+    """
+
+    def __init__(self, title, widths=None):
+        self.title = title
+        self.widths = widths
+        self.rows = []
+
+    def append(self, values, style=None):
+        self.rows.append((list(values), style))
+
+    def blank(self, count=1):
+        for _ in range(count):
+            self.append([])
+
+
+class XlsxReport:
+    """A write-only workbook with the shared named styles registered"""
+
+    def __init__(self):
+        self.workbook = openpyxl.Workbook(write_only=True)
+        for name, attributes in XLSX_STYLES.items():
+            self.workbook.add_named_style(NamedStyle(name=name, **attributes))
+        self.sheets = []
+
+    def sheet(self, title, widths=None):
+        """
+        Add a worksheet. `widths` fixes the widths of the leading columns;
+        the rest are sized from the values written to them.
+        """
+        sheet = XlsxSheet(self.workbook.create_sheet(title=title), widths)
+        self.sheets.append(sheet)
+        return sheet
+
+    def add_rows(self, sheet_rows):
+        """Write a SheetRows buffer as a new worksheet"""
+        sheet = self.sheet(sheet_rows.title, sheet_rows.widths)
+        sheet.write(sheet_rows.rows)
+        return sheet
+
+    def save(self):
+        """Close every sheet and write the workbook to a temporary file"""
+        for sheet in self.sheets:
+            sheet.close()
+        output = tempfile.TemporaryFile()
+        self.workbook.save(output)
+        output.seek(0)
+        return output
+
+    def response(self, filename):
+        """Serve the workbook as a download; the temporary file goes with the response"""
+        return FileResponse(
+            self.save(), as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE
+        )
+
+
+def xlsx_response(rows, headers, filename, title='Sheet1', header_style='header'):
+    """Single-sheet download of an iterable of row lists under a header row"""
+    report = XlsxReport()
+    sheet = report.sheet(title)
+    sheet.append(headers, style=header_style)
+    for row in rows:
+        sheet.append(row)
+    return report.response(filename)